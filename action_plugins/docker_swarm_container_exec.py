@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Run docker_swarm_container_exec in the persistent module worker when
+homelab_module_worker is set (see homelab_worker.py)."""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.plugins.loader import action_loader
+
+
+class ActionModule(action_loader.get("homelab_worker", class_only=True)):
+    pass
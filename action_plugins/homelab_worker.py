@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Run pipelined modules in a persistent worker on the target.
+
+Every module call normally pipes an AnsiballZ payload into a fresh Python
+interpreter on the target, which unpacks the module_utils zip and imports
+ansible.module_utils again. With ``homelab_module_worker: true`` this
+action runs the module in a long-lived worker instead
+(tools/module_worker.py): the payload goes over the same (ControlPersist)
+connection to a small client started with ``python -S``, which hands it to
+the worker on a Unix socket. The worker keeps the zips and imports loaded
+and forks a child per task, so a task costs a fork instead of an
+interpreter start and the imports.
+
+The module result is parsed exactly as before. When the worker is not
+running the client reports that, the plugin starts one (the worker script
+is piped in and kept next to the socket) and tries again; if that fails,
+or the payload is not a plain AnsiballZ wrapper, the original payload is
+run as usual. Only pipelined calls are routed (pipelining on, no async, no
+``su``).
+
+Variables:
+    homelab_module_worker       enable the worker (default false)
+    homelab_module_worker_dir   socket directory on the target (default
+                                $TMPDIR/homelab-worker-<euid>)
+    homelab_module_worker_idle  seconds until an idle worker exits
+                                (default 900, like ControlPersist)
+
+Modules opt in with a one-line action plugin of their own name that
+subclasses this one (see docker_swarm_container_exec.py).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import ast
+import hashlib
+import json
+import os
+import re
+import shlex
+
+from ansible.module_utils.common.text.converters import to_bytes, to_text
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action.normal import ActionModule as NormalAction
+from ansible.utils.display import Display
+
+display = Display()
+
+WORKER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tools",
+    "module_worker.py",
+)
+UNAVAILABLE = "HOMELAB_WORKER_UNAVAILABLE"
+EX_TEMPFAIL = 75
+
+# Runs with -S on the target: stdlib only, no site import.
+CLIENT = r"""
+import json, os, socket, sys
+directory = sys.argv[1] or os.path.join(
+    os.environ.get("TMPDIR") or "/tmp", "homelab-worker-%d" % os.geteuid())
+def unavailable():
+    sys.stdout.write("HOMELAB_WORKER_UNAVAILABLE\n")
+    sys.exit(75)
+try:
+    info = os.lstat(directory)
+    if info.st_uid != os.geteuid() or info.st_mode & 0o077:
+        unavailable()
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(os.path.join(directory, "worker-%s.sock" % sys.argv[2]))
+except OSError:
+    unavailable()
+try:
+    cwd = os.getcwd()
+except OSError:
+    cwd = os.path.expanduser("~")
+header = json.dumps({"env": dict(os.environ), "cwd": cwd})
+conn.sendall(header.encode("utf-8") + b"\n" + sys.stdin.buffer.read())
+conn.shutdown(socket.SHUT_WR)
+chunks = []
+while True:
+    chunk = conn.recv(1048576)
+    if not chunk:
+        break
+    chunks.append(chunk)
+reply = b"".join(chunks)
+if reply == b"restart\n":
+    unavailable()
+if not reply:
+    sys.stderr.write("module worker closed the connection\n")
+    sys.exit(1)
+head, body = reply.split(b"\n", 1)
+rc, out, err = [int(x) for x in head.split()]
+sys.stdout.buffer.write(body[:out])
+sys.stderr.buffer.write(body[out:out + err])
+sys.exit(rc)
+"""
+
+# Reads the worker script from stdin and starts it, unless another task
+# started one meanwhile.
+BOOTSTRAP = r"""
+import fcntl, os, subprocess, sys, time
+directory = sys.argv[1] or os.path.join(
+    os.environ.get("TMPDIR") or "/tmp", "homelab-worker-%d" % os.geteuid())
+version, idle = sys.argv[2], sys.argv[3]
+if not os.path.isdir(directory):
+    os.mkdir(directory, 0o700)
+info = os.lstat(directory)
+if info.st_uid != os.geteuid() or info.st_mode & 0o077:
+    sys.exit("%s must be private to this user" % directory)
+script = os.path.join(directory, "worker-%s.py" % version)
+sock = os.path.join(directory, "worker-%s.sock" % version)
+source = sys.stdin.buffer.read()
+with open(os.path.join(directory, "bootstrap.lock"), "w") as lock:
+    fcntl.flock(lock, fcntl.LOCK_EX)
+    try:
+        with open(sock + ".pid") as handle:
+            os.kill(int(handle.read()), 0)
+        sys.exit(0)
+    except (OSError, ValueError):
+        pass
+    if not os.path.exists(script):
+        with open(script + ".tmp", "wb") as handle:
+            handle.write(source)
+        os.rename(script + ".tmp", script)
+    subprocess.Popen(
+        [sys.executable, script, sock, idle], cwd="/", close_fds=True,
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.time() + 10
+    while not os.path.exists(sock + ".pid"):
+        if time.time() > deadline:
+            sys.exit("module worker did not start")
+        time.sleep(0.01)
+"""
+
+ZIPDATA_RE = re.compile(r"^    ZIPDATA = (['\"])([A-Za-z0-9+/=]*)\1$", re.M)
+PARAMS_RE = re.compile(r"^    ANSIBALLZ_PARAMS = (.*)$", re.M)
+FQN_RE = re.compile(r"runpy\.run_module\(mod_name=('[^']*'|\"[^\"]*\")")
+
+
+def _version():
+    digest = hashlib.sha1(to_bytes(CLIENT + BOOTSTRAP))
+    with open(WORKER_PATH, "rb") as handle:
+        digest.update(handle.read())
+    return digest.hexdigest()[:12]
+
+
+def build_job(payload):
+    """Turn an AnsiballZ wrapper into a worker request, or None."""
+    text = to_text(payload, errors="surrogate_or_strict")
+    if "_ANSIBALLZ_WRAPPER = True" not in text[:4096]:
+        return None
+    # Resource limits and coverage are set up by the wrapper process.
+    if "setrlimit" in text or "coverage.Coverage" in text:
+        return None
+    zipdata = ZIPDATA_RE.search(text)
+    params = PARAMS_RE.search(text)
+    fqn = FQN_RE.search(text)
+    if not (zipdata and params and fqn):
+        return None
+    try:
+        params = ast.literal_eval(params.group(1))
+        fqn = ast.literal_eval(fqn.group(1))
+    except (ValueError, SyntaxError):
+        return None
+    zipdata = to_bytes(zipdata.group(2))
+    header = {
+        "fqn": fqn,
+        "params": to_text(params),
+        "sha1": hashlib.sha1(zipdata).hexdigest(),
+    }
+    return to_bytes(json.dumps(header)) + b"\n" + zipdata
+
+
+class ActionModule(NormalAction):
+    _worker = None
+
+    def run(self, tmp=None, task_vars=None):
+        task_vars = task_vars or {}
+        if boolean(
+            self._templar.template(
+                task_vars.get("homelab_module_worker", False)
+            ),
+            strict=False,
+        ):
+            self._worker = {
+                "dir": self._templar.template(
+                    task_vars.get("homelab_module_worker_dir", "")
+                ),
+                "idle": int(
+                    self._templar.template(
+                        task_vars.get("homelab_module_worker_idle", 900)
+                    )
+                ),
+            }
+        return super(ActionModule, self).run(tmp, task_vars)
+
+    def _low_level_execute_command(
+        self, cmd, sudoable=True, in_data=None, **kwargs
+    ):
+        parent = super(ActionModule, self)._low_level_execute_command
+        job = None
+        if self._worker and in_data is not None:
+            job = build_job(in_data)
+        if job is None:
+            return parent(cmd, sudoable=sudoable, in_data=in_data, **kwargs)
+
+        version = _version()
+        client_cmd = "%s -S -c %s %s %s" % (
+            cmd,
+            shlex.quote(CLIENT),
+            shlex.quote(self._worker["dir"]),
+            version,
+        )
+        for attempt in range(2):
+            res = parent(client_cmd, sudoable=sudoable, in_data=job, **kwargs)
+            if res.get("rc") != EX_TEMPFAIL or UNAVAILABLE not in res.get(
+                "stdout", ""
+            ):
+                display.vvv("Ran module in the module worker")
+                return res
+            if attempt or not self._start_worker(cmd, sudoable, version):
+                break
+
+        display.vvv("Module worker unavailable, running the payload directly")
+        return parent(cmd, sudoable=sudoable, in_data=in_data, **kwargs)
+
+    def _start_worker(self, cmd, sudoable, version):
+        with open(WORKER_PATH, "rb") as handle:
+            source = handle.read()
+        res = super(ActionModule, self)._low_level_execute_command(
+            "%s -c %s %s %s %d"
+            % (
+                cmd,
+                shlex.quote(BOOTSTRAP),
+                shlex.quote(self._worker["dir"]),
+                version,
+                self._worker["idle"],
+            ),
+            sudoable=sudoable,
+            in_data=source,
+        )
+        if res.get("rc") != 0:
+            display.vvv(
+                "Module worker did not start: %s"
+                % (res.get("stderr") or res.get("stdout"))
+            )
+            return False
+        display.vvv("Started module worker %s" % version)
+        return True
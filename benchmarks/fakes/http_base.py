@@ -0,0 +1,156 @@
+"""Minimal threaded HTTP stand-in shared by the fake Pi-hole and Jellyfin.
+
+Subclasses of FakeApp implement ``handle(request)`` and return a Response.
+The server speaks HTTP/1.1 with keep-alive, counts requests and new
+connections, and can inject a fixed per-request latency.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return None
+        return json.loads(self.body)
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+class Response:
+    def __init__(
+        self, status=200, payload=None, headers=None, raw=None, cut_at=None
+    ):
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+        self.raw = raw
+        # Simulate a dropped connection after this many body bytes.
+        self.cut_at = cut_at
+
+    def encode(self):
+        if self.raw is not None:
+            return self.raw
+        if self.payload is None:
+            return b""
+        return json.dumps(self.payload).encode("utf-8")
+
+
+class FakeApp:
+    """Base class for fake API applications."""
+
+    def handle(self, request):
+        raise NotImplementedError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle plus
+    # delayed ACKs add ~40ms to every kept-alive request.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        parts = urlsplit(self.path)
+        request = Request(
+            self.command,
+            parts.path,
+            parse_qs(parts.query),
+            self.headers,
+            body,
+        )
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            response = self.server.app.handle(request)
+        data = response.encode()
+        self.send_response(response.status)
+        if response.raw is None:
+            self.send_header("Content-Type", "application/json")
+        for key, value in response.headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        if response.cut_at is not None:
+            self.wfile.write(data[: response.cut_at])
+            self.close_connection = True
+            return
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+
+class FakeServer:
+    """Run a FakeApp on 127.0.0.1 in a background thread."""
+
+    def __init__(self, app, latency_ms=0):
+        self.app = app
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.app = app
+        self._server.latency = latency_ms / 1000.0
+        self._server.lock = threading.Lock()
+        self._server.requests = 0
+        self._server.connections = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    @property
+    def connections(self):
+        return self._server.connections
+
+    def reset_counters(self):
+        with self._server.lock:
+            self._server.requests = 0
+            self._server.connections = 0
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
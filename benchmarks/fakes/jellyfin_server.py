@@ -0,0 +1,389 @@
+"""In-memory stand-in for the Jellyfin REST API.
+
+Covers username/password and token auth, /System/Info, /Users (list,
+create, delete, policy, configuration, password),
+/Library/VirtualFolders (list, create, delete, paths, options, refresh),
+/Items, /System/Backups (list, download with
+Range/If-Range), /System/ActivityLog/Entries (newest first,
+minDate/startIndex/limit) and LiveTV tuner hosts and listing providers,
+which are also written to a livetv.xml file like Jellyfin does.
+"""
+
+import copy
+import datetime
+import hashlib
+import re
+import secrets
+import uuid
+import xml.etree.ElementTree as ET
+
+from .http_base import FakeApp, FakeServer, Response
+
+TOKEN_RE = re.compile(r'Token="([^"]+)"')
+
+
+def default_policy():
+    return {
+        "IsAdministrator": False,
+        "IsDisabled": False,
+        "EnableRemoteAccess": True,
+        "EnableMediaPlayback": True,
+        "EnableContentDeletion": False,
+        "EnableAllFolders": True,
+        "EnabledFolders": [],
+        "MaxActiveSessions": 0,
+    }
+
+
+class JellyfinApp(FakeApp):
+    def __init__(
+        self,
+        username="admin",
+        password="benchmark",
+        users=0,
+        items=0,
+        activity=0,
+        tuners=0,
+        livetv_path=None,
+        folders=0,
+    ):
+        self.username = username
+        self.password = password
+        self.tokens = {"static-api-key"}
+        self.users = []
+        self.passwords = {}
+        self.folders = []
+        self.refreshes = 0
+        for index in range(folders):
+            self.add_folder(
+                "Library %d" % index, "movies", ["/media/library%d" % index]
+            )
+        self.items = [
+            {"Id": uuid.uuid4().hex, "Name": "Item %d" % i, "Type": "Movie"}
+            for i in range(items)
+        ]
+        # Backup archives (name -> bytes) and an optional byte count after
+        # which the next download is cut off.
+        self.backups = {}
+        self.cut_next_download = None
+        # Activity log entries, oldest first, one minute apart.
+        self.activity = []
+        self.activity_epoch = datetime.datetime(2026, 1, 1)
+        self.add_activity(activity)
+        # LiveTV options, saved to livetv_path (if set) after each change.
+        self.livetv = {"TunerHosts": [], "ListingProviders": []}
+        self.livetv_path = livetv_path
+        for index in range(tuners):
+            self.save_livetv_entry(
+                "TunerHosts",
+                {
+                    "Type": "m3u",
+                    "FriendlyName": "Tuner %d" % index,
+                    "Url": "http://iptv.example/%d.m3u" % index,
+                    "TunerCount": 1,
+                    "AllowHWTranscoding": True,
+                },
+            )
+        self.add_user(username, password, admin=True)
+        for index in range(users):
+            self.add_user("user%d" % index, "secret%d" % index)
+
+    def add_activity(self, count):
+        for _ in range(count):
+            entry_id = len(self.activity) + 1
+            date = self.activity_epoch + datetime.timedelta(minutes=entry_id)
+            self.activity.append(
+                {
+                    "Id": entry_id,
+                    "Name": "user%d is playing Item %d"
+                    % (entry_id % 7, entry_id),
+                    "Type": "VideoPlayback",
+                    "Date": date.strftime("%Y-%m-%dT%H:%M:%S.0000000Z"),
+                    "UserId": uuid.UUID(int=entry_id % 7).hex,
+                    "Severity": "Information",
+                }
+            )
+
+    def add_user(self, name, password, admin=False):
+        user = {
+            "Name": name,
+            "Id": uuid.uuid4().hex,
+            "HasPassword": bool(password),
+            "Policy": default_policy(),
+            "Configuration": {"PlayDefaultAudioTrack": True},
+        }
+        user["Policy"]["IsAdministrator"] = admin
+        self.users.append(user)
+        self.passwords[user["Id"]] = password
+        return user
+
+    def add_folder(self, name, collection_type, paths, options=None):
+        options = dict(options or {})
+        options["PathInfos"] = [{"Path": p} for p in paths]
+        folder = {
+            "Name": name,
+            "Locations": list(paths),
+            "CollectionType": collection_type,
+            "ItemId": uuid.uuid4().hex,
+            "LibraryOptions": options,
+        }
+        self.folders.append(folder)
+        return folder
+
+    def _folder(self, name):
+        for folder in self.folders:
+            if folder["Name"] == name:
+                return folder
+        return None
+
+    def save_livetv_entry(self, section, info):
+        """Add info, or replace the entry with the same Id."""
+        entries = self.livetv[section]
+        info = dict(info, Id=info.get("Id") or uuid.uuid4().hex)
+        for index, entry in enumerate(entries):
+            if entry["Id"] == info["Id"]:
+                entries[index] = info
+                break
+        else:
+            entries.append(info)
+        self.write_livetv()
+        return info
+
+    def write_livetv(self):
+        if not self.livetv_path:
+            return
+        root = ET.Element("LiveTvOptions")
+        for section, tag in (
+            ("TunerHosts", "TunerHostInfo"),
+            ("ListingProviders", "ListingsProviderInfo"),
+        ):
+            parent = ET.SubElement(root, section)
+            for info in self.livetv[section]:
+                entry = ET.SubElement(parent, tag)
+                for key, value in info.items():
+                    field = ET.SubElement(entry, key)
+                    if isinstance(value, list):
+                        for item in value:
+                            ET.SubElement(field, "string").text = item
+                    elif isinstance(value, bool):
+                        field.text = "true" if value else "false"
+                    else:
+                        field.text = str(value)
+        ET.ElementTree(root).write(self.livetv_path, xml_declaration=True)
+
+    def _authorized(self, request):
+        token = request.headers.get("X-MediaBrowser-Token")
+        if not token:
+            match = TOKEN_RE.search(
+                request.headers.get("X-Emby-Authorization") or ""
+            )
+            token = match.group(1) if match else None
+        return token in self.tokens
+
+    def _user(self, user_id):
+        for user in self.users:
+            if user["Id"] == user_id:
+                return user
+        return None
+
+    def handle(self, request):
+        path = request.path
+        if path == "/Users/AuthenticateByName" and request.method == "POST":
+            body = request.json() or {}
+            for user in self.users:
+                if user["Name"] == body.get("Username") and self.passwords.get(
+                    user["Id"]
+                ) == body.get("Pw"):
+                    token = secrets.token_hex(16)
+                    self.tokens.add(token)
+                    return Response(
+                        200,
+                        {"AccessToken": token, "User": copy.deepcopy(user)},
+                    )
+            return Response(401, raw=b"Invalid username or password")
+
+        if not self._authorized(request):
+            return Response(401, raw=b"Unauthorized")
+
+        if path == "/Sessions/Logout" and request.method == "POST":
+            self.tokens.discard(request.headers.get("X-MediaBrowser-Token"))
+            return Response(204)
+        if path == "/System/Info":
+            return Response(
+                200,
+                {
+                    "ServerName": "fake-jellyfin",
+                    "Version": "10.10.0",
+                    "Id": "x",
+                },
+            )
+        if path == "/Users" and request.method == "GET":
+            return Response(200, copy.deepcopy(self.users))
+        if path == "/Users/New" and request.method == "POST":
+            body = request.json() or {}
+            if any(u["Name"] == body.get("Name") for u in self.users):
+                return Response(400, raw=b"User already exists")
+            user = self.add_user(body.get("Name"), body.get("Password") or "")
+            return Response(200, copy.deepcopy(user))
+
+        match = re.match(
+            r"^/Users/([0-9a-f]+)(/Policy|/Configuration|/Password)?$", path
+        )
+        if match:
+            user = self._user(match.group(1))
+            if user is None:
+                return Response(404, raw=b"User not found")
+            suffix = match.group(2)
+            if suffix is None and request.method == "GET":
+                return Response(200, copy.deepcopy(user))
+            if suffix is None and request.method == "DELETE":
+                self.users.remove(user)
+                return Response(204)
+            if suffix == "/Policy" and request.method == "POST":
+                user["Policy"].update(request.json() or {})
+                return Response(204)
+            if suffix == "/Configuration" and request.method == "POST":
+                user["Configuration"].update(request.json() or {})
+                return Response(204)
+            if suffix == "/Password" and request.method == "POST":
+                body = request.json() or {}
+                self.passwords[user["Id"]] = body.get("NewPw") or ""
+                user["HasPassword"] = bool(body.get("NewPw"))
+                return Response(204)
+
+        if path == "/System/Backups" and request.method == "GET":
+            return Response(
+                200,
+                [
+                    {
+                        "Path": "/config/data/backups/%s" % name,
+                        "DateCreated": "2026-01-%02dT02:00:00Z" % (i + 1),
+                    }
+                    for i, name in enumerate(sorted(self.backups))
+                ],
+            )
+        if path.startswith("/System/Backups/") and request.method == "GET":
+            return self._download_backup(request, path.split("/")[-1])
+
+        if path == "/System/ActivityLog/Entries" and request.method == "GET":
+            entries = self.activity[::-1]
+            min_date = request.param("minDate")
+            if min_date:
+                # Same fixed-width ISO format, so strings compare by time.
+                entries = [e for e in entries if e["Date"] >= min_date[:19]]
+            start = int(request.param("startIndex", 0))
+            limit = int(request.param("limit", len(entries)))
+            return Response(
+                200,
+                {
+                    "Items": entries[start : start + limit],
+                    "TotalRecordCount": len(entries),
+                    "StartIndex": start,
+                },
+            )
+        if path == "/System/Configuration/livetv":
+            return Response(200, copy.deepcopy(self.livetv))
+        for endpoint, section in (
+            ("/LiveTv/TunerHosts", "TunerHosts"),
+            ("/LiveTv/ListingProviders", "ListingProviders"),
+        ):
+            if path != endpoint:
+                continue
+            if request.method == "POST":
+                info = self.save_livetv_entry(section, request.json() or {})
+                return Response(200, copy.deepcopy(info))
+            if request.method == "DELETE":
+                entry_id = request.param("id")
+                self.livetv[section] = [
+                    e for e in self.livetv[section] if e["Id"] != entry_id
+                ]
+                self.write_livetv()
+                return Response(204)
+
+        if path == "/Library/VirtualFolders" and request.method == "GET":
+            return Response(200, copy.deepcopy(self.folders))
+        if path == "/Library/VirtualFolders" and request.method == "POST":
+            name = request.param("name")
+            if self._folder(name) is not None:
+                return Response(400, raw=b"Library already exists")
+            options = (request.json() or {}).get("LibraryOptions") or {}
+            paths = [p["Path"] for p in options.pop("PathInfos", [])]
+            self.add_folder(
+                name, request.param("collectionType"), paths, options
+            )
+            return Response(204)
+        if path == "/Library/VirtualFolders" and request.method == "DELETE":
+            folder = self._folder(request.param("name"))
+            if folder is None:
+                return Response(404, raw=b"Library not found")
+            self.folders.remove(folder)
+            return Response(204)
+        if path == "/Library/VirtualFolders/Paths":
+            if request.method == "POST":
+                body = request.json() or {}
+                name, new_path = body.get("Name"), body["PathInfo"]["Path"]
+            else:
+                name, new_path = request.param("name"), None
+            folder = self._folder(name)
+            if folder is None:
+                return Response(404, raw=b"Library not found")
+            if request.method == "POST":
+                folder["Locations"].append(new_path)
+            elif request.method == "DELETE":
+                folder["Locations"].remove(request.param("path"))
+            folder["LibraryOptions"]["PathInfos"] = [
+                {"Path": p} for p in folder["Locations"]
+            ]
+            return Response(204)
+        if (
+            path == "/Library/VirtualFolders/LibraryOptions"
+            and request.method == "POST"
+        ):
+            body = request.json() or {}
+            for folder in self.folders:
+                if folder["ItemId"] == body.get("Id"):
+                    folder["LibraryOptions"] = body.get("LibraryOptions") or {}
+                    return Response(204)
+            return Response(404, raw=b"Library not found")
+        if path == "/Library/Refresh" and request.method == "POST":
+            self.refreshes += 1
+            return Response(204)
+        if path == "/Items" and request.method == "GET":
+            start = int(request.param("StartIndex", 0))
+            limit = int(request.param("Limit", len(self.items)))
+            return Response(
+                200,
+                {
+                    "Items": self.items[start : start + limit],
+                    "TotalRecordCount": len(self.items),
+                },
+            )
+        return Response(404, raw=b"Not found")
+
+    def _download_backup(self, request, name):
+        data = self.backups.get(name)
+        if data is None:
+            return Response(404, raw=b"Not found")
+        etag = '"%s"' % hashlib.sha1(data).hexdigest()
+        headers = {"ETag": etag, "Content-Type": "application/zip"}
+        status = 200
+        range_header = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if range_header and (not if_range or if_range == etag):
+            start = int(range_header.split("=", 1)[1].split("-", 1)[0])
+            if start >= len(data):
+                return Response(416, raw=b"")
+            headers["Content-Range"] = "bytes %d-%d/%d" % (
+                start,
+                len(data) - 1,
+                len(data),
+            )
+            data = data[start:]
+            status = 206
+        cut_at, self.cut_next_download = self.cut_next_download, None
+        return Response(status, headers=headers, raw=data, cut_at=cut_at)
+
+
+def serve(latency_ms=0, **kwargs):
+    """Return a started FakeServer wrapping a new JellyfinApp."""
+    return FakeServer(JellyfinApp(**kwargs), latency_ms=latency_ms).start()
@@ -0,0 +1,450 @@
+"""In-memory stand-in for the Pi-hole v6 REST API.
+
+Covers the endpoints the custom modules and roles use: session auth,
+/config (full tree, per-element GET/PUT/DELETE and PATCH), /domains
+(list, add with string or array, update, delete, batchDelete), /stats/*,
+/queries (synthetic log, paged with cursor/start/length and from/until),
+/logs/* (ring buffers read with nextID) and /teleporter (zip export, multipart import).
+"""
+
+import copy
+import io
+import secrets
+import time
+import zipfile
+from urllib.parse import unquote
+
+from .http_base import FakeApp, FakeServer, Response
+
+DEFAULT_CONFIG = {
+    "dns": {
+        "upstreams": ["1.1.1.1", "1.0.0.1"],
+        "hosts": [],
+        "cnameRecords": [],
+        "rateLimit": {"count": 1000, "interval": 60},
+        "cache": {"size": 10000},
+    },
+    "webserver": {"api": {"maxSessions": 16}},
+}
+
+DOMAIN_TYPES = ("allow", "deny")
+
+# Synthetic query log: one query every QUERY_STEP seconds, every fourth
+# from NOISY_CLIENT, the rest spread over 25 LAN clients.
+QUERY_STEP = 0.05
+
+# Lines FTL keeps per log before the oldest are dropped.
+LOG_BUFFER = 512
+NOISY_CLIENT = "10.0.0.2"
+DOMAIN_KINDS = ("exact", "regex")
+
+
+def _merge(target, patch):
+    changed = []
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            changed.extend(
+                "%s.%s" % (key, sub) for sub in _merge(target[key], value)
+            )
+        elif target.get(key) != value:
+            target[key] = copy.deepcopy(value)
+            changed.append(key)
+    return changed
+
+
+class PiHoleApp(FakeApp):
+    def __init__(
+        self, password="benchmark", domains=0, config=None, queries=0
+    ):
+        self.password = password
+        # Newest query is at query_base; ids count down from `queries`.
+        self.queries = queries
+        self.query_base = time.time()
+        self.sessions = set()
+        self.config = copy.deepcopy(config or DEFAULT_CONFIG)
+        self.config_writes = 0
+        self.domains = []
+        # Teleporter archive members (name -> bytes); imports replace it.
+        self.teleporter = {
+            "etc/pihole/pihole.toml": b"[dns]\nupstreams = []\n",
+            "etc/pihole/gravity.db": b"\0" * 4096,
+        }
+        self.teleporter_imports = 0
+        # Log name -> [next line ID, lines]; only the last LOG_BUFFER
+        # lines are kept, as in FTL.
+        self.logs = {name: [0, []] for name in ("dnsmasq", "ftl", "webserver")}
+        self.ftl_pid = 4242
+        self._next_id = 1
+        for index in range(domains):
+            self.add_domain(
+                "host%d.example.com" % index,
+                DOMAIN_TYPES[index % 2],
+                "exact",
+                "seeded",
+            )
+
+    # -- helpers -----------------------------------------------------------
+
+    def add_domain(
+        self, domain, type_, kind, comment="", groups=None, enabled=True
+    ):
+        entry = {
+            "domain": domain,
+            "unicode": domain,
+            "type": type_,
+            "kind": kind,
+            "comment": comment,
+            "groups": groups if groups is not None else [0],
+            "enabled": enabled,
+            "id": self._next_id,
+            "date_added": int(time.time()),
+            "date_modified": int(time.time()),
+        }
+        self._next_id += 1
+        self.domains.append(entry)
+        return entry
+
+    def _authorized(self, request):
+        sid = request.headers.get("X-FTL-SID")
+        if not sid:
+            cookie = request.headers.get("Cookie") or ""
+            for part in cookie.split(";"):
+                name, _, value = part.strip().partition("=")
+                if name == "sid":
+                    sid = value
+        return sid in self.sessions
+
+    def _config_node(self, parts, create=False):
+        node = self.config
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                if not create:
+                    return None
+                node[part] = {}
+            node = node[part]
+        return node
+
+    # -- routing -----------------------------------------------------------
+
+    def handle(self, request):
+        path = request.path
+        if not path.startswith("/api/"):
+            return Response(404, {"error": {"key": "not_found"}})
+        path = path[len("/api") :]
+
+        if path == "/auth":
+            return self._auth(request)
+        if not self._authorized(request):
+            return Response(401, {"error": {"key": "unauthorized"}})
+
+        if path == "/config" or path.startswith("/config/"):
+            return self._config(request, path)
+        if path == "/domains:batchDelete" and request.method == "POST":
+            return self._batch_delete(request)
+        if path == "/domains" or path.startswith("/domains/"):
+            return self._domains(request, path)
+        if path.startswith("/stats/"):
+            return self._stats(request, path)
+        if path.startswith("/logs/"):
+            return self._logs(request, path)
+        if path == "/queries":
+            return self._queries(request)
+        if path == "/teleporter":
+            return self._teleporter(request)
+        return Response(404, {"error": {"key": "not_found"}})
+
+    def _auth(self, request):
+        if request.method == "POST":
+            body = request.json() or {}
+            if body.get("password") != self.password:
+                return Response(401, {"session": {"valid": False}})
+            sid = secrets.token_urlsafe(16)
+            self.sessions.add(sid)
+            return Response(
+                200,
+                {"session": {"valid": True, "sid": sid, "validity": 1800}},
+            )
+        if request.method == "DELETE":
+            self.sessions.discard(request.headers.get("X-FTL-SID"))
+            return Response(204)
+        return Response(200, {"session": {"valid": self._authorized(request)}})
+
+    def _config(self, request, path):
+        parts = [unquote(p) for p in path.split("/")[2:] if p]
+        if request.method == "GET":
+            node = self._config_node(parts)
+            if node is None:
+                return Response(404, {"error": {"key": "not_found"}})
+            result = node
+            for part in reversed(parts):
+                result = {part: result}
+            return Response(200, {"config": copy.deepcopy(result)})
+        if request.method == "PATCH" and not parts:
+            body = request.json() or {}
+            changed = _merge(self.config, body.get("config", {}))
+            if changed:
+                self.config_writes += 1
+            return Response(200, {"config": copy.deepcopy(self.config)})
+        if request.method in ("PUT", "DELETE") and len(parts) >= 2:
+            node = self._config_node(parts[:-1])
+            if not isinstance(node, list):
+                return Response(400, {"error": {"key": "bad_request"}})
+            value = parts[-1]
+            if request.method == "PUT":
+                if value in node:
+                    return Response(400, {"error": {"key": "uniqueness"}})
+                node.append(value)
+            else:
+                if value not in node:
+                    return Response(404, {"error": {"key": "not_found"}})
+                node.remove(value)
+            self.config_writes += 1
+            return Response(201 if request.method == "PUT" else 204)
+        return Response(405, {"error": {"key": "method_not_allowed"}})
+
+    def _domains(self, request, path):
+        parts = [unquote(p) for p in path.split("/")[2:] if p]
+        type_ = parts[0] if len(parts) > 0 else None
+        kind = parts[1] if len(parts) > 1 else None
+        name = parts[2] if len(parts) > 2 else None
+
+        def matches(entry):
+            return (
+                (type_ is None or entry["type"] == type_)
+                and (kind is None or entry["kind"] == kind)
+                and (name is None or entry["domain"] == name)
+            )
+
+        if request.method == "GET":
+            found = [copy.deepcopy(d) for d in self.domains if matches(d)]
+            return Response(200, {"domains": found})
+        if request.method == "POST" and type_ and kind and not name:
+            body = request.json() or {}
+            names = body.get("domain")
+            if isinstance(names, str):
+                names = [names]
+            added = []
+            errors = []
+            existing = {
+                (d["domain"], d["type"], d["kind"]) for d in self.domains
+            }
+            for domain in names or []:
+                if (domain, type_, kind) in existing:
+                    errors.append({"item": domain, "error": "UNIQUE"})
+                    continue
+                added.append(
+                    self.add_domain(
+                        domain,
+                        type_,
+                        kind,
+                        body.get("comment") or "",
+                        body.get("groups"),
+                        body.get("enabled", True),
+                    )
+                )
+            return Response(
+                201,
+                {
+                    "domains": added,
+                    "processed": {
+                        "success": [{"item": d["domain"]} for d in added],
+                        "errors": errors,
+                    },
+                },
+            )
+        if request.method == "PUT" and name:
+            found = [d for d in self.domains if matches(d)]
+            if not found:
+                return Response(404, {"error": {"key": "not_found"}})
+            body = request.json() or {}
+            for key in ("comment", "groups", "enabled"):
+                if key in body:
+                    found[0][key] = body[key]
+            found[0]["date_modified"] = int(time.time())
+            return Response(200, {"domains": [copy.deepcopy(found[0])]})
+        if request.method == "DELETE" and name:
+            before = len(self.domains)
+            self.domains = [d for d in self.domains if not matches(d)]
+            if len(self.domains) == before:
+                return Response(404, {"error": {"key": "not_found"}})
+            return Response(204)
+        return Response(405, {"error": {"key": "method_not_allowed"}})
+
+    def _batch_delete(self, request):
+        items = request.json() or []
+        doomed = {(i["item"], i["type"], i["kind"]) for i in items}
+        self.domains = [
+            d
+            for d in self.domains
+            if (d["domain"], d["type"], d["kind"]) not in doomed
+        ]
+        return Response(204)
+
+    def _teleporter(self, request):
+        if request.method == "GET":
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+                for name, data in sorted(self.teleporter.items()):
+                    zf.writestr(name, data)
+            return Response(
+                200,
+                headers={"Content-Type": "application/zip"},
+                raw=buffer.getvalue(),
+            )
+        if request.method == "POST":
+            # Take the first file part of the multipart body.
+            boundary = request.headers.get("Content-Type", "").split(
+                "boundary=", 1
+            )[-1]
+            part = request.body.split(b"--" + boundary.encode())[1]
+            data = part.split(b"\r\n\r\n", 1)[1][: -len(b"\r\n")]
+            try:
+                with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                    self.teleporter = dict(
+                        (name, zf.read(name)) for name in zf.namelist()
+                    )
+            except zipfile.BadZipfile:
+                return Response(400, {"error": {"key": "bad_request"}})
+            self.teleporter_imports += 1
+            return Response(200, {"files": sorted(self.teleporter)})
+        return Response(405, {"error": {"key": "method_not_allowed"}})
+
+    def _stats(self, request, path):
+        if path == "/stats/summary":
+            return Response(
+                200,
+                {
+                    "queries": {
+                        "total": 12345,
+                        "blocked": 1234,
+                        "percent_blocked": 10.0,
+                        "unique_domains": 4321,
+                        "forwarded": 9000,
+                        "cached": 2111,
+                    },
+                    "clients": {"active": 12, "total": 20},
+                    "gravity": {"domains_being_blocked": 150000},
+                },
+            )
+        if path == "/stats/upstreams":
+            return Response(
+                200,
+                {
+                    "upstreams": [
+                        {
+                            "ip": ip,
+                            "name": name,
+                            "port": 53,
+                            "count": count,
+                            "statistics": {"response": 0.012, "variance": 0.0},
+                        }
+                        for ip, name, count in (
+                            ("1.1.1.1", "one.one.one.one", 6000),
+                            ("1.0.0.1", "one.one.one.one", 3000),
+                        )
+                    ],
+                    "forwarded_queries": 9000,
+                    "total_queries": 12345,
+                },
+            )
+        if path == "/stats/top_clients":
+            count = int(request.param("count", 10))
+            return Response(
+                200,
+                {
+                    "clients": [
+                        {
+                            "ip": "192.168.1.%d" % (i + 10),
+                            "name": "client%d" % i,
+                            "count": 1000 - i,
+                        }
+                        for i in range(count)
+                    ]
+                },
+            )
+        if path == "/stats/top_domains":
+            count = int(request.param("count", 10))
+            return Response(
+                200,
+                {
+                    "domains": [
+                        {"domain": "site%d.example.com" % i, "count": 500 - i}
+                        for i in range(count)
+                    ]
+                },
+            )
+        return Response(404, {"error": {"key": "not_found"}})
+
+    def write_log(self, name, *messages):
+        """Append lines to one of the FTL log buffers."""
+        log = self.logs[name]
+        for message in messages:
+            log[1].append(
+                {"timestamp": time.time(), "message": message, "prio": None}
+            )
+            log[0] += 1
+        del log[1][:-LOG_BUFFER]
+
+    def _logs(self, request, path):
+        log = self.logs.get(path[len("/logs/") :])
+        if log is None:
+            return Response(404, {"error": {"key": "not_found"}})
+        next_id, lines = log
+        first_id = next_id - len(lines)
+        start = max(int(request.param("nextID", 0)), first_id)
+        if start > next_id:
+            start = next_id
+        return Response(
+            200,
+            {
+                "log": lines[start - first_id :],
+                "nextID": next_id,
+                "pid": self.ftl_pid,
+                "file": "/var/log/pihole/%s.log" % path[len("/logs/") :],
+            },
+        )
+
+    def query(self, index):
+        """Synthetic query number ``index`` (0 = newest)."""
+        if index % 4 == 0:
+            client, domain = NOISY_CLIENT, "telemetry.example.net"
+        else:
+            client = "192.168.1.%d" % (10 + index % 25)
+            domain = "site%d.example.com" % (index % 500)
+        return {
+            "id": self.queries - index,
+            "time": self.query_base - index * QUERY_STEP,
+            "type": "A",
+            "status": "FORWARDED",
+            "domain": domain,
+            "client": {"ip": client, "name": None},
+        }
+
+    def _queries(self, request):
+        # Index range matching from/until, newest first.
+        first, last = 0, self.queries
+        if request.param("until"):
+            offset = self.query_base - float(request.param("until"))
+            first = max(first, int(-(-offset // QUERY_STEP)))
+        if request.param("from"):
+            offset = self.query_base - float(request.param("from"))
+            last = min(last, int(offset // QUERY_STEP) + 1)
+        cursor = int(request.param("cursor", self.queries - first))
+        first = max(first, self.queries - cursor)
+        start = first + int(request.param("start", 0))
+        length = int(request.param("length", 100))
+        end = min(last, start + length)
+        return Response(
+            200,
+            {
+                "queries": [self.query(i) for i in range(start, end)],
+                "cursor": self.queries - first,
+                "recordsTotal": self.queries,
+                "recordsFiltered": max(0, last - first),
+            },
+        )
+
+
+def serve(latency_ms=0, **kwargs):
+    """Return a started FakeServer wrapping a new PiHoleApp."""
+    return FakeServer(PiHoleApp(**kwargs), latency_ms=latency_ms).start()
@@ -0,0 +1,191 @@
+"""Helpers for running the custom Ansible modules in-process.
+
+Modules are imported once from their file path and driven through
+AnsibleModule by setting ``ansible.module_utils.basic._ANSIBLE_ARGS``,
+the same hook Ansible's own unit tests use. This measures module logic,
+subprocess and HTTP cost without interpreter startup.
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import ansible.module_utils
+from ansible.module_utils import basic
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_BIN = os.path.join(REPO_ROOT, "benchmarks", "fakes", "bin")
+
+# Resolve ansible.module_utils.<name> imports from the repository's
+# module_utils directory, as ansible.cfg does for real runs.
+ansible.module_utils.__path__.append(os.path.join(REPO_ROOT, "module_utils"))
+
+MODULE_PATHS = {
+    "docker_swarm_container_exec": "library/docker_swarm_container_exec.py",
+    "docker_exec_lineinfile": "roles/pihole_config/library/docker_exec_lineinfile.py",
+    "pihole_adlist": "roles/pihole_config/library/pihole_adlist.py",
+    "pihole_gravity": "roles/pihole_config/library/pihole_gravity.py",
+    "pihole_adlist_cache": "roles/pihole_config/library/pihole_adlist_cache.py",
+    "pihole_dns_records": "roles/pihole_config/library/pihole_dns_records.py",
+    "pihole_api": "roles/pihole_api/library/pihole_api.py",
+    "pihole_domains": "roles/pihole_api/library/pihole_domains.py",
+    "pihole_teleporter": "roles/pihole_api/library/pihole_teleporter.py",
+    "pihole_query_rates": "roles/pihole_api/library/pihole_query_rates.py",
+    "pihole_log_tail": "roles/pihole_api/library/pihole_log_tail.py",
+    "jellyfin_api": "roles/jellyfin/library/jellyfin_api.py",
+    "jellyfin_backup_pull": "roles/jellyfin/library/jellyfin_backup_pull.py",
+    "jellyfin_activity": "roles/jellyfin/library/jellyfin_activity.py",
+    "jellyfin_users": "roles/jellyfin/library/jellyfin_users.py",
+    "jellyfin_tuners": "roles/jellyfin/library/jellyfin_tuners.py",
+    "jellyfin_libraries": (
+        "roles/jellyfin_config/library/jellyfin_libraries.py"
+    ),
+    "m3u_playlist": "library/m3u_playlist.py",
+}
+
+_loaded = {}
+
+
+class ModuleFailed(Exception):
+    def __init__(self, result):
+        super().__init__(result.get("msg", "module failed"))
+        self.result = result
+
+
+def load_module(name):
+    """Import a custom module by name and cache it."""
+    if name not in _loaded:
+        path = os.path.join(REPO_ROOT, MODULE_PATHS[name])
+        spec = importlib.util.spec_from_file_location(
+            "benchmark_%s" % name, path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded[name] = module
+    return _loaded[name]
+
+
+def run_module(name, args, check_mode=False):
+    """Run a module's main() with args and return its result dict."""
+    module = load_module(name)
+    payload = dict(args)
+    payload["_ansible_check_mode"] = check_mode
+    basic._ANSIBLE_ARGS = json.dumps({"ANSIBLE_MODULE_ARGS": payload}).encode(
+        "utf-8"
+    )
+    # ansible-core 2.19+ refuses module args without a serialization
+    # profile; older releases never read this global.
+    basic._ANSIBLE_PROFILE = "legacy"
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        try:
+            module.main()
+        except SystemExit:
+            pass
+    basic._ANSIBLE_ARGS = None
+    basic._ANSIBLE_PROFILE = None
+    result = json.loads(stdout.getvalue())
+    if result.get("failed"):
+        raise ModuleFailed(result)
+    return result
+
+
+def templar(variables):
+    """Return an Ansible Templar that knows the project's filter plugins."""
+    from ansible.parsing.dataloader import DataLoader
+    from ansible.plugins.loader import filter_loader
+    from ansible.template import Templar
+
+    filter_loader.add_directory(os.path.join(REPO_ROOT, "filter_plugins"))
+    return Templar(loader=DataLoader(), variables=variables)
+
+
+class FakeDocker:
+    """Put the fake docker/pihole binaries on PATH and count spawns."""
+
+    def __init__(self, latency_ms=0):
+        self.latency_ms = latency_ms
+        self.workdir = None
+        self._saved = {}
+
+    @property
+    def pihole_dir(self):
+        return os.path.join(self.workdir, "pihole")
+
+    @property
+    def log_path(self):
+        return os.path.join(self.workdir, "docker.log")
+
+    def spawns(self):
+        try:
+            with open(self.log_path) as handle:
+                return sum(1 for _ in handle)
+        except FileNotFoundError:
+            return 0
+
+    def reset_counters(self):
+        with open(self.log_path, "w"):
+            pass
+
+    def __enter__(self):
+        self.workdir = tempfile.mkdtemp(prefix="homelab-bench-")
+        os.makedirs(self.pihole_dir)
+        env = {
+            "PATH": FAKE_BIN + os.pathsep + os.environ.get("PATH", ""),
+            "FAKE_DOCKER_LOG": self.log_path,
+            "FAKE_DOCKER_LATENCY": "%g" % (self.latency_ms / 1000.0),
+            "FAKE_PIHOLE_DIR": self.pihole_dir,
+        }
+        for key, value in env.items():
+            self._saved[key] = os.environ.get(key)
+            os.environ[key] = value
+        return self
+
+    def __exit__(self, *exc):
+        for key, value in self._saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(samples))))
+    return samples[rank - 1]
+
+
+def measure(operation, iterations, warmup=1, reset=None):
+    """Time operation() and return latency statistics in milliseconds.
+
+    ``reset`` is called after the warmup so spawn and request counters
+    only cover the measured iterations.
+    """
+    for _ in range(warmup):
+        operation()
+    if reset is not None:
+        reset()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        op_started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - op_started) * 1000)
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+        "mean_ms": sum(samples) / len(samples),
+    }
@@ -0,0 +1,1092 @@
+"""Benchmark the custom modules against local fakes.
+
+Usage (from the repository root):
+    python3 -m benchmarks.run                      # all scenarios
+    python3 -m benchmarks.run -k pihole_api        # filter by name
+    python3 -m benchmarks.run --save base.json     # record a baseline
+    python3 -m benchmarks.run --compare base.json  # fail on regressions
+
+Each scenario runs one module operation at several sizes (file lines,
+adlists, API items) and reports ops/s, p50/p99 latency, process spawns
+per operation (fake docker invocations) and HTTP requests per operation.
+"""
+
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.fakes import jellyfin_server, pihole_server
+from benchmarks.harness import (
+    REPO_ROOT,
+    FakeDocker,
+    measure,
+    run_module,
+    templar,
+)
+
+PIHOLE_PASSWORD = "benchmark"
+JELLYFIN_TOKEN = "static-api-key"
+
+GRAVITY_SCHEMA = """
+CREATE TABLE adlist (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    address TEXT UNIQUE NOT NULL,
+    enabled BOOLEAN NOT NULL DEFAULT 1,
+    date_added INTEGER NOT NULL DEFAULT (cast(strftime('%s', 'now') as int)),
+    date_modified INTEGER NOT NULL DEFAULT (cast(strftime('%s', 'now') as int)),
+    comment TEXT
+);
+"""
+
+SCENARIOS = []
+
+
+def scenario(name, sizes, unit):
+    """Register a scenario.
+
+    The decorated function receives (size, ctx) and returns a
+    zero-argument callable performing one operation.
+    """
+
+    def decorator(func):
+        SCENARIOS.append(
+            {"name": name, "sizes": sizes, "unit": unit, "prepare": func}
+        )
+        return func
+
+    return decorator
+
+
+class Context:
+    """Shared fakes for one scenario/size combination."""
+
+    def __init__(self, docker, http_latency_ms):
+        self.docker = docker
+        self.http_latency_ms = http_latency_ms
+        self.servers = []
+        self.cleanups = []
+
+    def pihole(self, **kwargs):
+        server = pihole_server.serve(
+            latency_ms=self.http_latency_ms, password=PIHOLE_PASSWORD, **kwargs
+        )
+        self.servers.append(server)
+        return server
+
+    def jellyfin(self, **kwargs):
+        server = jellyfin_server.serve(
+            latency_ms=self.http_latency_ms, **kwargs
+        )
+        self.servers.append(server)
+        return server
+
+    def requests(self):
+        return sum(server.requests for server in self.servers)
+
+    def reset(self):
+        self.docker.reset_counters()
+        for server in self.servers:
+            server.reset_counters()
+
+    def close(self):
+        for server in self.servers:
+            server.stop()
+        for cleanup in self.cleanups:
+            cleanup()
+
+
+# -- docker_swarm_container_exec -------------------------------------------
+
+
+@scenario("docker_swarm_container_exec/stdout", [10, 1000, 50000], "lines")
+def exec_stdout(size, ctx):
+    args = {"container_id": "bench", "command": "seq 1 %d" % size}
+    return lambda: run_module("docker_swarm_container_exec", args)
+
+
+@scenario("docker_swarm_container_exec/creates_skip", [1], "check")
+def exec_creates(size, ctx):
+    marker = os.path.join(ctx.docker.workdir, "marker")
+    open(marker, "w").close()
+    args = {"container_id": "bench", "command": "true", "creates": marker}
+    return lambda: run_module("docker_swarm_container_exec", args)
+
+
+# -- module worker (action_plugins/homelab_worker.py) ----------------------
+
+WORKER_PLAYBOOK = """
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - name: Run exec
+      docker_swarm_container_exec:
+        container_id: bench
+        command: "echo {{ item }}"
+      loop: "{{ range(%d) | list }}"
+"""
+
+
+def _playbook(size, ctx, worker):
+    """Run a whole playbook of N module tasks over the local connection.
+
+    Unlike the in-process scenarios this includes interpreter start-up and
+    AnsiballZ unpacking per task, which is what the worker removes.
+    """
+    path = os.path.join(ctx.docker.workdir, "worker.yml")
+    with open(path, "w") as handle:
+        handle.write(WORKER_PLAYBOOK % size)
+    socket_dir = os.path.join(ctx.docker.workdir, "worker")
+    command = [
+        os.path.join(os.path.dirname(sys.executable), "ansible-playbook"),
+        "-i",
+        "localhost,",
+        "-c",
+        "local",
+        path,
+        "-e",
+        "ansible_python_interpreter=%s" % sys.executable,
+        "-e",
+        "homelab_module_worker=%s" % worker,
+        "-e",
+        "homelab_module_worker_dir=%s" % socket_dir,
+    ]
+    env = dict(
+        os.environ,
+        ANSIBLE_CONFIG=os.path.join(REPO_ROOT, "ansible.cfg"),
+        ANSIBLE_PIPELINING="True",
+    )
+
+    def stop_worker():
+        for name in os.listdir(socket_dir) if worker else ():
+            if name.endswith(".pid"):
+                with open(os.path.join(socket_dir, name)) as handle:
+                    try:
+                        os.kill(int(handle.read()), signal.SIGTERM)
+                    except (OSError, ValueError):
+                        pass
+
+    ctx.cleanups.append(stop_worker)
+    return lambda: subprocess.run(
+        command,
+        env=env,
+        cwd=REPO_ROOT,
+        check=True,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+    )
+
+
+@scenario("module_worker/playbook_direct", [1, 10], "tasks")
+def worker_direct(size, ctx):
+    return _playbook(size, ctx, worker=False)
+
+
+@scenario("module_worker/playbook_worker", [1, 10], "tasks")
+def worker_persistent(size, ctx):
+    return _playbook(size, ctx, worker=True)
+
+
+# -- docker_exec_lineinfile -------------------------------------------------
+
+
+def _seed_file(ctx, size):
+    path = os.path.join(ctx.docker.workdir, "lines-%d.conf" % size)
+    with open(path, "w") as handle:
+        for index in range(size):
+            handle.write("setting-%d=%d\n" % (index, index))
+    return path
+
+
+@scenario("docker_exec_lineinfile/noop", [100, 1000, 10000], "lines")
+def lineinfile_noop(size, ctx):
+    path = _seed_file(ctx, size)
+    args = {
+        "container_id": "bench",
+        "path": path,
+        "line": "setting-%d=%d" % (size // 2, size // 2),
+    }
+    return lambda: run_module("docker_exec_lineinfile", args)
+
+
+@scenario("docker_exec_lineinfile/replace", [100, 1000, 10000], "lines")
+def lineinfile_replace(size, ctx):
+    path = _seed_file(ctx, size)
+    state = {"value": 0}
+
+    def operation():
+        state["value"] += 1
+        run_module(
+            "docker_exec_lineinfile",
+            {
+                "container_id": "bench",
+                "path": path,
+                "regexp": "^setting-%d=" % (size // 2),
+                "line": "setting-%d=v%d" % (size // 2, state["value"]),
+            },
+        )
+
+    return operation
+
+
+# -- pihole_adlist ----------------------------------------------------------
+
+
+def _seed_gravity(ctx, size):
+    path = os.path.join(ctx.docker.pihole_dir, "gravity.db")
+    if os.path.exists(path):
+        os.unlink(path)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executescript(GRAVITY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO adlist (address, enabled, comment) VALUES (?, 1, ?)",
+            [
+                ("https://lists.example.com/list-%d.txt" % i, "List %d" % i)
+                for i in range(size)
+            ],
+        )
+    conn.close()
+
+
+@scenario("pihole_adlist/noop", [10, 100, 1000], "adlists")
+def adlist_noop(size, ctx):
+    _seed_gravity(ctx, size)
+    args = {
+        "container_id": "bench",
+        "url": "https://lists.example.com/list-%d.txt" % (size // 2),
+        "comment": "List %d" % (size // 2),
+    }
+    return lambda: run_module("pihole_adlist", args)
+
+
+@scenario("pihole_adlist/reconcile_all", [10, 50], "adlists")
+def adlist_reconcile(size, ctx):
+    _seed_gravity(ctx, size)
+
+    def operation():
+        # Mirrors roles/pihole_config/tasks/adlists.yml: one call per list.
+        for index in range(size):
+            run_module(
+                "pihole_adlist",
+                {
+                    "container_id": "bench",
+                    "url": "https://lists.example.com/list-%d.txt" % index,
+                    "comment": "List %d" % index,
+                },
+            )
+
+    return operation
+
+
+# -- pihole_gravity ---------------------------------------------------------
+
+
+def _seed_adlists(ctx, lists, domains):
+    adlists = []
+    for index in range(lists):
+        path = os.path.join(ctx.docker.workdir, "adlist-%d.txt" % index)
+        with open(path, "w") as handle:
+            handle.write("# Benchmark list %d\n" % index)
+            # Neighbouring lists overlap by half their entries.
+            start = index * domains // 2
+            for number in range(start, start + domains):
+                handle.write("0.0.0.0 ads%d.example.com\n" % number)
+        adlists.append({"url": "file://" + path, "comment": "List %d" % index})
+    return adlists
+
+
+@scenario("pihole_gravity/unchanged", [1000, 100000], "domains/list")
+def gravity_unchanged(size, ctx):
+    args = {
+        "container_id": "bench",
+        "adlists": _seed_adlists(ctx, 5, size),
+        "state_dir": os.path.join(ctx.docker.workdir, "gravity-state"),
+    }
+    return lambda: run_module("pihole_gravity", args)
+
+
+@scenario("pihole_adlist_cache/unchanged", [1000, 100000], "domains/list")
+def adlist_cache_unchanged(size, ctx):
+    args = {
+        "adlists": _seed_adlists(ctx, 5, size),
+        "dest": os.path.join(ctx.docker.workdir, "adlist-cache"),
+    }
+    return lambda: run_module("pihole_adlist_cache", args)
+
+
+@scenario(
+    "pihole_adlist_cache/one_list_changed", [1000, 100000], "domains/list"
+)
+def adlist_cache_changed(size, ctx):
+    adlists = _seed_adlists(ctx, 5, size)
+    changing = adlists[0]["url"][len("file://") :]
+    state = {"value": 0}
+    args = {
+        "adlists": adlists,
+        "dest": os.path.join(ctx.docker.workdir, "adlist-cache"),
+    }
+
+    def operation():
+        state["value"] += 1
+        with open(changing, "a") as handle:
+            handle.write("0.0.0.0 new%d.example.com\n" % state["value"])
+        run_module("pihole_adlist_cache", args)
+
+    return operation
+
+
+# -- pihole_api -------------------------------------------------------------
+
+
+@scenario("pihole_api/get_domains_session", [10, 1000, 10000], "domains")
+def pihole_domains_session(size, ctx):
+    server = ctx.pihole(domains=size)
+    session = run_module(
+        "pihole_api",
+        {
+            "base_url": server.url + "/api",
+            "password": PIHOLE_PASSWORD,
+            "endpoint": "/auth",
+            "method": "POST",
+        },
+    )["session_id"]
+    args = {
+        "base_url": server.url + "/api",
+        "session_id": session,
+        "endpoint": "/domains",
+    }
+    return lambda: run_module("pihole_api", args)
+
+
+@scenario("pihole_api/get_config_password", [1], "calls")
+def pihole_config_password(size, ctx):
+    server = ctx.pihole()
+    args = {
+        "base_url": server.url + "/api",
+        "password": PIHOLE_PASSWORD,
+        "endpoint": "/config",
+    }
+    return lambda: run_module("pihole_api", args)
+
+
+# -- pihole_domains ---------------------------------------------------------
+
+
+@scenario("pihole_domains/sync_noop", [100, 1000, 10000], "domains")
+def pihole_domains_noop(size, ctx):
+    server = ctx.pihole(domains=size)
+    desired = [
+        {
+            "domain": entry["domain"],
+            "type": entry["type"],
+            "kind": entry["kind"],
+            "comment": entry["comment"],
+        }
+        for entry in server.app.domains
+    ]
+    args = {
+        "base_url": server.url + "/api",
+        "password": PIHOLE_PASSWORD,
+        "domains": desired,
+    }
+    return lambda: run_module("pihole_domains", args)
+
+
+@scenario("pihole_domains/sync_churn", [100, 1000], "domains")
+def pihole_domains_churn(size, ctx):
+    # Alternate between two desired sets that differ in half the domains,
+    # so every call removes and adds size/2 entries.
+    server = ctx.pihole()
+    sets = [
+        [{"domain": "d%d.example.com" % i} for i in range(size)],
+        [
+            {"domain": "d%d.example.com" % i}
+            for i in range(size // 2, size + size // 2)
+        ],
+    ]
+    state = {"value": 0}
+
+    def operation():
+        state["value"] += 1
+        run_module(
+            "pihole_domains",
+            {
+                "base_url": server.url + "/api",
+                "password": PIHOLE_PASSWORD,
+                "domains": sets[state["value"] % 2],
+                "purge": True,
+            },
+        )
+
+    return operation
+
+
+# -- pihole_teleporter ------------------------------------------------------
+
+
+@scenario("pihole_teleporter/backup_unchanged", [64, 1024, 16384], "KiB db")
+def pihole_teleporter_unchanged(size, ctx):
+    server = ctx.pihole()
+    server.app.teleporter["etc/pihole/gravity.db"] = os.urandom(size * 1024)
+    args = {
+        "base_url": server.url + "/api",
+        "password": PIHOLE_PASSWORD,
+        "dest": os.path.join(ctx.docker.workdir, "teleporter-%d" % size),
+    }
+    run_module("pihole_teleporter", args)
+    return lambda: run_module("pihole_teleporter", args)
+
+
+# -- pihole_query_rates -----------------------------------------------------
+
+
+@scenario("pihole_query_rates/analyze", [10000, 100000], "queries")
+def pihole_query_rates_analyze(size, ctx):
+    server = ctx.pihole(queries=size)
+    args = {
+        "base_url": server.url + "/api",
+        "password": PIHOLE_PASSWORD,
+        # The synthetic log holds 20 queries/s; cover all of it.
+        "since": size // 20 + 60,
+        "windows": [1, 600],
+        "max_queries": size,
+    }
+    return lambda: run_module("pihole_query_rates", args)
+
+
+# -- pihole_log_tail --------------------------------------------------------
+
+
+@scenario("pihole_log_tail/new_lines", [0, 10, 100], "new lines")
+def pihole_log_tail_new(size, ctx):
+    server = ctx.pihole()
+    server.app.write_log("dnsmasq", *("seed %d" % i for i in range(512)))
+    args = {
+        "base_url": server.url + "/api",
+        "password": PIHOLE_PASSWORD,
+        "state_dir": os.path.join(ctx.docker.workdir, "logs-%d" % size),
+    }
+    run_module("pihole_log_tail", args)
+
+    def operation():
+        server.app.write_log(
+            "dnsmasq",
+            *("query[A] host%d.example.com" % i for i in range(size)),
+        )
+        run_module("pihole_log_tail", args)
+
+    return operation
+
+
+# -- pihole_exporter --------------------------------------------------------
+
+
+def _load_exporter():
+    path = os.path.join(REPO_ROOT, "tools", "pihole_exporter.py")
+    spec = importlib.util.spec_from_file_location("pihole_exporter", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@scenario("pihole_exporter/poll", [10, 100, 1000], "top entries")
+def pihole_exporter_poll(size, ctx):
+    exporter = _load_exporter()
+    server = ctx.pihole()
+    client = exporter.PiHoleClient(
+        server.url + "/api", password=PIHOLE_PASSWORD
+    )
+    collector = exporter.Collector(client, top=size)
+    collector.poll()
+    return collector.poll
+
+
+# -- pihole_dns_records -----------------------------------------------------
+
+
+def _dns_hosts(count, offset=0):
+    return [
+        {
+            "ip": "192.168.%d.%d" % (i // 250, i % 250 + 1),
+            "hostname": "h%d.lan" % i,
+        }
+        for i in range(offset, offset + count)
+    ]
+
+
+@scenario("pihole_dns_records/sync_noop", [10, 1000, 10000], "records")
+def pihole_dns_records_noop(size, ctx):
+    hosts = _dns_hosts(size)
+    server = ctx.pihole()
+    server.app.config["dns"]["hosts"] = [
+        "%s %s" % (h["ip"], h["hostname"]) for h in hosts
+    ]
+    args = {
+        "base_url": server.url + "/api",
+        "password": PIHOLE_PASSWORD,
+        "hosts": hosts,
+    }
+    return lambda: run_module("pihole_dns_records", args)
+
+
+@scenario("pihole_dns_records/sync_one_change", [10, 1000, 10000], "records")
+def pihole_dns_records_one_change(size, ctx):
+    # Alternate between two sets that differ in a single record, so every
+    # call goes through the per-element endpoint.
+    server = ctx.pihole()
+    sets = [_dns_hosts(size), _dns_hosts(size - 1) + _dns_hosts(1, size)]
+    state = {"value": 0}
+
+    def operation():
+        state["value"] += 1
+        run_module(
+            "pihole_dns_records",
+            {
+                "base_url": server.url + "/api",
+                "password": PIHOLE_PASSWORD,
+                "hosts": sets[state["value"] % 2],
+            },
+        )
+
+    operation()
+    return operation
+
+
+# -- jellyfin_api -----------------------------------------------------------
+
+
+@scenario("jellyfin_api/list_users_token", [10, 100, 1000], "users")
+def jellyfin_users(size, ctx):
+    server = ctx.jellyfin(users=size)
+    args = {
+        "base_url": server.url,
+        "api_token": JELLYFIN_TOKEN,
+        "endpoint": "/Users",
+    }
+    return lambda: run_module("jellyfin_api", args)
+
+
+@scenario("jellyfin_api/items_token", [100, 10000], "items")
+def jellyfin_items(size, ctx):
+    server = ctx.jellyfin(items=size)
+    args = {
+        "base_url": server.url,
+        "api_token": JELLYFIN_TOKEN,
+        "endpoint": "/Items",
+    }
+    return lambda: run_module("jellyfin_api", args)
+
+
+@scenario("jellyfin_api/system_info_password", [1], "calls")
+def jellyfin_password(size, ctx):
+    server = ctx.jellyfin()
+    args = {
+        "base_url": server.url,
+        "username": "admin",
+        "password": "benchmark",
+        "endpoint": "/System/Info",
+    }
+    return lambda: run_module("jellyfin_api", args)
+
+
+# -- jellyfin_activity ------------------------------------------------------
+
+
+@scenario("jellyfin_activity/new_entries", [0, 10, 1000], "new entries")
+def jellyfin_activity_new(size, ctx):
+    server = ctx.jellyfin(activity=10000)
+    args = {
+        "base_url": server.url,
+        "api_token": JELLYFIN_TOKEN,
+        "dest": os.path.join(ctx.docker.workdir, "activity-%d" % size),
+        "initial_days": 0,
+    }
+    run_module("jellyfin_activity", args)
+
+    def operation():
+        server.app.add_activity(size)
+        run_module("jellyfin_activity", args)
+
+    return operation
+
+
+# -- jellyfin_users ---------------------------------------------------------
+
+
+@scenario("jellyfin_users/noop", [10, 100, 500], "users")
+def jellyfin_users_noop(size, ctx):
+    server = ctx.jellyfin(users=size)
+    args = {
+        "base_url": server.url,
+        "api_token": JELLYFIN_TOKEN,
+        "users": [
+            {"name": "user%d" % i, "policy": {"EnableRemoteAccess": True}}
+            for i in range(size)
+        ],
+    }
+    return lambda: run_module("jellyfin_users", args)
+
+
+@scenario("jellyfin_users/onboard", [1, 10, 50], "new users")
+def jellyfin_users_onboard(size, ctx):
+    server = ctx.jellyfin()
+    runs = itertools.count()
+
+    def operation():
+        batch = next(runs)
+        run_module(
+            "jellyfin_users",
+            {
+                "base_url": server.url,
+                "api_token": JELLYFIN_TOKEN,
+                "users": [
+                    {
+                        "name": "new%d-%d" % (batch, i),
+                        "password": "secret",
+                        "policy": {"EnableRemoteAccess": False},
+                    }
+                    for i in range(size)
+                ],
+            },
+        )
+
+    return operation
+
+
+# -- jellyfin_tuners --------------------------------------------------------
+
+
+def tuner_list(size):
+    return [
+        {"name": "Tuner %d" % i, "url": "http://iptv.example/%d.m3u" % i}
+        for i in range(size)
+    ]
+
+
+@scenario("jellyfin_tuners/noop", [1, 20, 100], "tuners")
+def jellyfin_tuners_noop(size, ctx):
+    livetv = os.path.join(ctx.docker.workdir, "livetv-%d.xml" % size)
+    server = ctx.jellyfin(tuners=size, livetv_path=livetv)
+    args = {
+        "base_url": server.url,
+        "api_token": JELLYFIN_TOKEN,
+        "container_id": "bench",
+        "livetv_path": livetv,
+        "tuners": tuner_list(size),
+    }
+    return lambda: run_module("jellyfin_tuners", args)
+
+
+@scenario("jellyfin_tuners/add_one", [1, 20, 100], "tuners")
+def jellyfin_tuners_add(size, ctx):
+    livetv = os.path.join(ctx.docker.workdir, "livetv-add-%d.xml" % size)
+    server = ctx.jellyfin(tuners=size, livetv_path=livetv)
+    runs = itertools.count()
+
+    def operation():
+        tuners = tuner_list(size)
+        tuners.append(
+            {"name": "New %d" % next(runs), "url": "http://iptv.example/new"}
+        )
+        run_module(
+            "jellyfin_tuners",
+            {
+                "base_url": server.url,
+                "api_token": JELLYFIN_TOKEN,
+                "container_id": "bench",
+                "livetv_path": livetv,
+                "tuners": tuners,
+            },
+        )
+
+    return operation
+
+
+# -- jellyfin_libraries -----------------------------------------------------
+
+
+def library_list(size):
+    return [
+        {
+            "name": "Library %d" % i,
+            "type": "movies",
+            "paths": ["/media/library%d" % i],
+        }
+        for i in range(size)
+    ]
+
+
+@scenario("jellyfin_libraries/noop", [1, 20, 100], "libraries")
+def jellyfin_libraries_noop(size, ctx):
+    server = ctx.jellyfin(folders=size)
+    args = {
+        "base_url": server.url,
+        "api_token": JELLYFIN_TOKEN,
+        "libraries": library_list(size),
+    }
+    return lambda: run_module("jellyfin_libraries", args)
+
+
+@scenario("jellyfin_libraries/add_path", [1, 20, 100], "libraries")
+def jellyfin_libraries_add_path(size, ctx):
+    server = ctx.jellyfin(folders=size)
+    runs = itertools.count()
+
+    def operation():
+        libraries = library_list(size)
+        libraries[-1]["paths"].append("/media/extra%d" % next(runs))
+        run_module(
+            "jellyfin_libraries",
+            {
+                "base_url": server.url,
+                "api_token": JELLYFIN_TOKEN,
+                "libraries": libraries,
+            },
+        )
+
+    return operation
+
+
+# -- m3u_playlist -----------------------------------------------------------
+
+
+def write_playlist(path, channels):
+    groups = ["News", "Sports", "Movies", "Kids", "Music"]
+    with open(path, "w") as handle:
+        handle.write('#EXTM3U url-tvg="http://epg.example/guide.xml"\n')
+        for i in range(channels):
+            handle.write(
+                '#EXTINF:-1 tvg-id="ch%d.us" tvg-name="Channel %d" '
+                'tvg-logo="http://logo.example/%d.png" tvg-country="US" '
+                'group-title="%s",Channel %d (1080p)\n'
+                % (i, i, i, groups[i % len(groups)], i)
+            )
+            # Every 20th channel repeats the previous channel's stream.
+            stream = i - 1 if i % 20 == 1 else i
+            handle.write("http://stream.example/%d.m3u8\n" % stream)
+
+
+def playlist_args(size, ctx, name):
+    src = os.path.join(ctx.docker.workdir, "%s-%d.m3u" % (name, size))
+    write_playlist(src, size)
+    return {
+        "src": "file://" + src,
+        "dest": os.path.join(
+            ctx.docker.workdir, "iptv", "%s-%d.m3u" % (name, size)
+        ),
+        "include_groups": ["News", "Sports"],
+        "exclude_regex": "radio",
+    }
+
+
+@scenario("m3u_playlist/parse", [1000, 10000, 50000], "channels")
+def m3u_playlist_parse(size, ctx):
+    args = dict(playlist_args(size, ctx, "parse"), force=True)
+    return lambda: run_module("m3u_playlist", args)
+
+
+@scenario("m3u_playlist/unchanged", [1000, 10000, 50000], "channels")
+def m3u_playlist_unchanged(size, ctx):
+    args = playlist_args(size, ctx, "unchanged")
+    run_module("m3u_playlist", args)
+    return lambda: run_module("m3u_playlist", args)
+
+
+# -- jellyfin_backup_pull ---------------------------------------------------
+
+
+@scenario("jellyfin_backup_pull/full_transfer", [1, 16, 128], "MiB")
+def jellyfin_backup_transfer(size, ctx):
+    server = ctx.jellyfin()
+    server.app.backups["backup.zip"] = os.urandom(size * 1024 * 1024)
+    dest = os.path.join(ctx.docker.workdir, "jellyfin-backups-%d" % size)
+    args = {
+        "base_url": server.url,
+        "api_token": "static-api-key",
+        "dest": dest,
+    }
+
+    def operation():
+        shutil.rmtree(dest, ignore_errors=True)
+        run_module("jellyfin_backup_pull", args)
+
+    return operation
+
+
+@scenario("jellyfin_backup_pull/already_stored", [10], "archives")
+def jellyfin_backup_stored(size, ctx):
+    server = ctx.jellyfin()
+    for index in range(size):
+        server.app.backups["backup-%02d.zip" % index] = os.urandom(1024)
+    args = {
+        "base_url": server.url,
+        "api_token": "static-api-key",
+        "dest": os.path.join(ctx.docker.workdir, "jellyfin-stored"),
+    }
+    run_module("jellyfin_backup_pull", args)
+    return lambda: run_module("jellyfin_backup_pull", args)
+
+
+# -- filter_plugins/homelab_diff ---------------------------------------------
+#
+# Each pair renders the same result once with the Jinja pipeline the roles
+# used and once with the filter that replaced it.
+
+
+def proxy_hosts(size):
+    desired = [
+        {"domain": "app%d.home.lan" % i, "forward_port": 8000 + i}
+        for i in range(size)
+    ]
+    # Half of the desired hosts exist, plus as many unrelated ones.
+    existing = [
+        {"id": i, "domain_names": ["app%d.home.lan" % (i * 2)]}
+        for i in range(size)
+    ]
+    return {"desired": desired, "existing": existing}
+
+
+def render(variables, expression):
+    engine = templar(variables)
+    return lambda: engine.template(expression)
+
+
+@scenario("filters/jinja_not_in", [10, 100, 1000], "items")
+def filters_jinja_not_in(size, ctx):
+    return render(
+        proxy_hosts(size),
+        "{{ desired | rejectattr('domain', 'in', existing"
+        " | map(attribute='domain_names') | flatten | list) | list"
+        " | length }}",
+    )
+
+
+@scenario("filters/diff_by_key", [10, 100, 1000], "items")
+def filters_diff_by_key(size, ctx):
+    return render(
+        proxy_hosts(size),
+        "{{ (desired | diff_by_key(existing, 'domain', 'domain_names'))"
+        ".missing | length }}",
+    )
+
+
+@scenario("filters/jinja_combine_loop", [10, 100, 1000], "items")
+def filters_jinja_combine_loop(size, ctx):
+    return render(
+        proxy_hosts(size),
+        "{% set ns = namespace(index={}) %}"
+        "{% for domain in existing | map(attribute='domain_names')"
+        " | flatten %}"
+        "{% set ns.index = ns.index | combine({domain: existing"
+        " | selectattr('domain_names', 'contains', domain)"
+        " | map(attribute='id') | first}) %}"
+        "{% endfor %}{{ ns.index | length }}",
+    )
+
+
+@scenario("filters/index_by", [10, 100, 1000], "items")
+def filters_index_by(size, ctx):
+    return render(
+        proxy_hosts(size),
+        "{{ existing | index_by('domain_names', 'id') | length }}",
+    )
+
+
+def loop_results(size):
+    return {"results": [{"changed": i % 3 == 0} for i in range(size)]}
+
+
+@scenario("filters/jinja_selectattr_count", [100, 1000, 10000], "results")
+def filters_jinja_selectattr(size, ctx):
+    return render(
+        loop_results(size),
+        "{{ results | selectattr('changed', 'equalto', true) | list | length"
+        " }}/{{ results | selectattr('changed', 'equalto', false) | list"
+        " | length }}",
+    )
+
+
+@scenario("filters/partition_changed", [100, 1000, 10000], "results")
+def filters_partition_changed(size, ctx):
+    return render(
+        loop_results(size),
+        "{% set counts = results | partition_changed %}"
+        "{{ counts.changed | length }}/{{ counts.unchanged | length }}",
+    )
+
+
+# -- driver -----------------------------------------------------------------
+
+
+def run(args):
+    results = []
+    for entry in SCENARIOS:
+        if args.keyword and not any(k in entry["name"] for k in args.keyword):
+            continue
+        for size in entry["sizes"]:
+            with FakeDocker(latency_ms=args.docker_latency_ms) as docker:
+                ctx = Context(docker, args.http_latency_ms)
+                try:
+                    operation = entry["prepare"](size, ctx)
+                    stats = measure(
+                        operation,
+                        args.iterations,
+                        warmup=1,
+                        reset=ctx.reset,
+                    )
+                    stats["spawns_per_op"] = docker.spawns() / float(
+                        args.iterations
+                    )
+                    stats["requests_per_op"] = ctx.requests() / float(
+                        args.iterations
+                    )
+                finally:
+                    ctx.close()
+            stats.update(
+                {
+                    "scenario": entry["name"],
+                    "size": size,
+                    "unit": entry["unit"],
+                }
+            )
+            results.append(stats)
+            print_row(stats)
+    return results
+
+
+HEADER = "%-44s %12s %10s %10s %10s %8s %8s"
+
+
+def print_header():
+    print(
+        HEADER
+        % (
+            "scenario",
+            "size",
+            "ops/s",
+            "p50 ms",
+            "p99 ms",
+            "spawn/op",
+            "req/op",
+        )
+    )
+    print("-" * 108)
+
+
+def print_row(stats):
+    print(
+        "%-44s %12s %10.1f %10.2f %10.2f %8.1f %8.1f"
+        % (
+            stats["scenario"],
+            "%d %s" % (stats["size"], stats["unit"]),
+            stats["ops_per_sec"],
+            stats["p50_ms"],
+            stats["p99_ms"],
+            stats["spawns_per_op"],
+            stats["requests_per_op"],
+        )
+    )
+    sys.stdout.flush()
+
+
+def compare(results, baseline_path, max_regression):
+    with open(baseline_path) as handle:
+        baseline = {
+            (r["scenario"], r["size"]): r for r in json.load(handle)["results"]
+        }
+    failures = []
+    for result in results:
+        before = baseline.get((result["scenario"], result["size"]))
+        if not before or not before["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        if ratio > 1 + max_regression:
+            failures.append((result, before, ratio))
+        if result["spawns_per_op"] > before["spawns_per_op"]:
+            failures.append((result, before, None))
+    print()
+    if not failures:
+        print("No regressions against %s" % baseline_path)
+        return 0
+    for result, before, ratio in failures:
+        if ratio is None:
+            print(
+                "REGRESSION %s @ %d: spawns/op %.1f -> %.1f"
+                % (
+                    result["scenario"],
+                    result["size"],
+                    before["spawns_per_op"],
+                    result["spawns_per_op"],
+                )
+            )
+        else:
+            print(
+                "REGRESSION %s @ %d: p50 %.2fms -> %.2fms (x%.2f)"
+                % (
+                    result["scenario"],
+                    result["size"],
+                    before["p50_ms"],
+                    result["p50_ms"],
+                    ratio,
+                )
+            )
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "-k",
+        "--keyword",
+        action="append",
+        help="Only run scenarios whose name contains this string",
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--http-latency-ms", type=float, default=0)
+    parser.add_argument("--docker-latency-ms", type=float, default=0)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare to")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.25,
+        help="Allowed relative p50 slowdown before --compare fails",
+    )
+    args = parser.parse_args()
+
+    # Modules write temp files and AnsibleModule may log; keep it contained.
+    os.environ.setdefault("ANSIBLE_REMOTE_TMP", tempfile.gettempdir())
+
+    print_header()
+    results = run(args)
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(
+                {
+                    "iterations": args.iterations,
+                    "http_latency_ms": args.http_latency_ms,
+                    "docker_latency_ms": args.docker_latency_ms,
+                    "results": results,
+                },
+                handle,
+                indent=2,
+            )
+    if args.compare:
+        return compare(results, args.compare, args.max_regression)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: homelab_sqlite
+short_description: Persistent SQLite fact cache with per-fact TTLs
+description:
+    - Stores gathered facts and C(cacheable) set_fact values in a single
+      SQLite database on the controller so they survive between runs
+    - Every fact is stored as its own row with its own expiry, so short-lived
+      values (container IDs) can expire while gathered facts stay warm
+    - Writes for a host happen in one transaction, so an interrupted run never
+      leaves a half-written host entry behind
+    - The database is bounded in size; least recently used hosts are evicted
+      first when the limit is exceeded
+    - On ansible-core 2.19 and later the facts arrive serialized as a single
+      payload; it is split back into per-fact rows so the TTLs still apply
+author:
+    - Homelab Ansible
+options:
+    _uri:
+        description:
+            - Path to the SQLite database file
+            - Parent directories are created on first use
+        required: true
+        type: path
+        env:
+            - name: ANSIBLE_CACHE_PLUGIN_CONNECTION
+        ini:
+            - key: fact_caching_connection
+              section: defaults
+    _prefix:
+        description:
+            - Prefix applied to host keys, allowing several projects to share
+              one database file
+        required: false
+        type: str
+        default: ""
+        env:
+            - name: ANSIBLE_CACHE_PLUGIN_PREFIX
+        ini:
+            - key: fact_caching_prefix
+              section: defaults
+    _timeout:
+        description:
+            - Default time to live for a fact, in seconds
+            - C(0) keeps facts until they are evicted or flushed
+        required: false
+        type: int
+        default: 86400
+        env:
+            - name: ANSIBLE_CACHE_PLUGIN_TIMEOUT
+        ini:
+            - key: fact_caching_timeout
+              section: defaults
+    ttl_overrides:
+        description:
+            - Per-fact time to live overrides as C(pattern=seconds) entries
+            - Patterns use shell-style wildcards and are matched against the
+              fact name; the first matching pattern wins
+        required: false
+        type: list
+        elements: str
+        default: []
+        env:
+            - name: HOMELAB_FACT_CACHE_TTL_OVERRIDES
+        ini:
+            - key: ttl_overrides
+              section: homelab_sqlite_cache
+    max_size_mb:
+        description:
+            - Upper bound for the serialized size of all cached facts
+            - C(0) disables size-bounded eviction
+        required: false
+        type: float
+        default: 64
+        env:
+            - name: HOMELAB_FACT_CACHE_MAX_SIZE_MB
+        ini:
+            - key: max_size_mb
+              section: homelab_sqlite_cache
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from ansible.errors import AnsibleError
+from ansible.parsing.ajson import AnsibleJSONDecoder, AnsibleJSONEncoder
+from ansible.plugins.cache import BaseCacheModule
+from ansible.release import __version__ as ansible_version
+
+# ansible-core 2.19+ wraps persistent cache plugins so that set() receives
+# {"__payload__": "<json>"} for the whole host and get() must hand the same
+# shape back. The payload is still a JSON object keyed by fact name.
+PAYLOAD_KEY = "__payload__"
+PAYLOAD_WRAPPED = tuple(
+    int(part) for part in ansible_version.split(".")[:2]
+) >= (2, 19)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    host     TEXT    NOT NULL,
+    name     TEXT    NOT NULL,
+    value    TEXT    NOT NULL,
+    digest   TEXT    NOT NULL,
+    size     INTEGER NOT NULL,
+    written  REAL    NOT NULL,
+    expires  REAL    NOT NULL,
+    PRIMARY KEY (host, name)
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host     TEXT    PRIMARY KEY,
+    accessed REAL    NOT NULL
+);
+"""
+
+
+class CacheModule(BaseCacheModule):
+    """SQLite-backed fact cache with per-fact expiry and LRU eviction."""
+
+    def __init__(self, *args, **kwargs):
+        super(CacheModule, self).__init__(*args, **kwargs)
+        self._db_path = os.path.expanduser(
+            os.path.expandvars(self.get_option("_uri") or "")
+        )
+        if not self._db_path:
+            raise AnsibleError(
+                "homelab_sqlite cache plugin requires fact_caching_connection "
+                "to be set to a database file path"
+            )
+        self._prefix = self.get_option("_prefix") or ""
+        self._timeout = int(self.get_option("_timeout"))
+        self._max_bytes = int(
+            float(self.get_option("max_size_mb")) * 1024 * 1024
+        )
+        self._ttl_overrides = self._parse_overrides(
+            self.get_option("ttl_overrides") or []
+        )
+        self._conn = None
+        # Facts read during a run are pinned in memory so they cannot expire
+        # halfway through a play (same contract as the builtin file caches).
+        self._cache = {}
+
+    @staticmethod
+    def _parse_overrides(entries):
+        overrides = []
+        for entry in entries:
+            pattern, sep, seconds = entry.partition("=")
+            if not sep:
+                raise AnsibleError(
+                    "Invalid homelab_sqlite ttl_overrides entry '%s', "
+                    "expected pattern=seconds" % entry
+                )
+            try:
+                overrides.append((pattern.strip(), int(seconds)))
+            except ValueError:
+                raise AnsibleError(
+                    "Invalid TTL in homelab_sqlite ttl_overrides entry '%s'"
+                    % entry
+                )
+        return overrides
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self._db_path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory, mode=0o700)
+            # Cached facts include API tokens, keep the file private.
+            if not os.path.exists(self._db_path):
+                os.close(
+                    os.open(self._db_path, os.O_CREAT | os.O_WRONLY, 0o600)
+                )
+            self._conn = sqlite3.connect(self._db_path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _key(self, key):
+        return self._prefix + key
+
+    def _ttl(self, name):
+        for pattern, seconds in self._ttl_overrides:
+            if fnmatch.fnmatchcase(name, pattern):
+                return seconds
+        return self._timeout
+
+    def _expiry(self, name, now):
+        ttl = self._ttl(name)
+        return now + ttl if ttl > 0 else 0
+
+    def _purge_expired(self, conn, now):
+        conn.execute(
+            "DELETE FROM facts WHERE expires > 0 AND expires <= ?", (now,)
+        )
+        conn.execute(
+            "DELETE FROM hosts WHERE host NOT IN (SELECT DISTINCT host FROM facts)"
+        )
+
+    def _evict(self, conn, keep):
+        if self._max_bytes <= 0:
+            return
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM facts"
+        ).fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT h.host, SUM(f.size) FROM hosts h JOIN facts f ON f.host = h.host "
+            "WHERE h.host != ? GROUP BY h.host ORDER BY h.accessed ASC",
+            (keep,),
+        ).fetchall()
+        for host, size in rows:
+            if total <= self._max_bytes:
+                break
+            conn.execute("DELETE FROM facts WHERE host = ?", (host,))
+            conn.execute("DELETE FROM hosts WHERE host = ?", (host,))
+            total -= size
+            self._display.vvv(
+                "homelab_sqlite: evicted cached facts for %s" % host
+            )
+
+    @staticmethod
+    def _dump(value):
+        """Return {fact name: JSON text} for a value passed to set()."""
+        if PAYLOAD_WRAPPED:
+            # Keep the core's own encoding so get() can return it verbatim.
+            facts = json.loads(value[PAYLOAD_KEY])
+            return dict(
+                (name, json.dumps(fact, sort_keys=True))
+                for name, fact in facts.items()
+            )
+        return dict(
+            (name, json.dumps(fact, cls=AnsibleJSONEncoder, sort_keys=True))
+            for name, fact in value.items()
+        )
+
+    @staticmethod
+    def _load(rows):
+        """Rebuild the value set() was given from (name, JSON text) rows."""
+        if PAYLOAD_WRAPPED:
+            facts = dict((name, json.loads(raw)) for name, raw in rows)
+            return {PAYLOAD_KEY: json.dumps(facts)}
+        return dict(
+            (name, json.loads(raw, cls=AnsibleJSONDecoder))
+            for name, raw in rows
+        )
+
+    def get(self, key):
+        if key in self._cache:
+            return self._cache[key]
+
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            self._purge_expired(conn, now)
+            rows = conn.execute(
+                "SELECT name, value FROM facts WHERE host = ?",
+                (self._key(key),),
+            ).fetchall()
+            if not rows:
+                raise KeyError(key)
+            conn.execute(
+                "UPDATE hosts SET accessed = ? WHERE host = ?",
+                (now, self._key(key)),
+            )
+
+        value = self._load(rows)
+        self._cache[key] = value
+        return value
+
+    def set(self, key, value):
+        self._cache[key] = value
+
+        conn = self._connect()
+        host = self._key(key)
+        now = time.time()
+        with conn:
+            existing = dict(
+                conn.execute(
+                    "SELECT name, digest FROM facts WHERE host = ? "
+                    "AND (expires = 0 OR expires > ?)",
+                    (host, now),
+                ).fetchall()
+            )
+            facts = self._dump(value)
+            rows = []
+            for name, raw in facts.items():
+                digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+                # Unchanged facts keep their original expiry, otherwise every
+                # merge would silently extend the lifetime of stale values.
+                if existing.get(name) == digest:
+                    continue
+                rows.append(
+                    (
+                        host,
+                        name,
+                        raw,
+                        digest,
+                        len(raw),
+                        now,
+                        self._expiry(name, now),
+                    )
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO facts "
+                "(host, name, value, digest, size, written, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            stale = set(existing) - set(facts)
+            conn.executemany(
+                "DELETE FROM facts WHERE host = ? AND name = ?",
+                [(host, name) for name in stale],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO hosts (host, accessed) VALUES (?, ?)",
+                (host, now),
+            )
+            self._evict(conn, host)
+
+    def keys(self):
+        conn = self._connect()
+        with conn:
+            self._purge_expired(conn, time.time())
+            rows = conn.execute("SELECT DISTINCT host FROM facts").fetchall()
+        prefix_len = len(self._prefix)
+        return [
+            row[0][prefix_len:]
+            for row in rows
+            if row[0].startswith(self._prefix)
+        ]
+
+    def contains(self, key):
+        if key in self._cache:
+            return True
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT 1 FROM facts WHERE host = ? AND (expires = 0 OR expires > ?) "
+            "LIMIT 1",
+            (self._key(key), time.time()),
+        ).fetchone()
+        return row is not None
+
+    def delete(self, key):
+        self._cache.pop(key, None)
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM facts WHERE host = ?", (self._key(key),))
+            conn.execute("DELETE FROM hosts WHERE host = ?", (self._key(key),))
+
+    def flush(self):
+        self._cache = {}
+        conn = self._connect()
+        with conn:
+            if self._prefix:
+                pattern = (
+                    self._prefix.replace("%", "\\%").replace("_", "\\_") + "%"
+                )
+                conn.execute(
+                    "DELETE FROM facts WHERE host LIKE ? ESCAPE '\\'",
+                    (pattern,),
+                )
+                conn.execute(
+                    "DELETE FROM hosts WHERE host LIKE ? ESCAPE '\\'",
+                    (pattern,),
+                )
+            else:
+                conn.execute("DELETE FROM facts")
+                conn.execute("DELETE FROM hosts")
+
+    def copy(self):
+        result = {}
+        for key in self.keys():
+            try:
+                result[key] = self.get(key)
+            except KeyError:
+                pass
+        return result
+
+    def __getstate__(self):
+        # The variable manager is pickled into worker processes; sqlite
+        # connections cannot cross that boundary, so reopen lazily instead.
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: homelab_plan
+type: aggregate
+short_description: Collect what a check-mode run would change
+description:
+    - Records every task result (and loop item) that reports C(changed),
+      that failed, or that was skipped because its module cannot run in
+      check mode and therefore cannot predict its effect
+    - Keeps the module's C(msg), C(changed_keys) and the rendered
+      C(diff) of each entry and writes them as JSON at the end of the run
+    - Used by C(tools/plan.py) with C(plan.yml), which runs one playbook
+      per area concurrently and merges the files into one plan
+requirements:
+    - enable via C(callbacks_enabled) or C(ANSIBLE_CALLBACKS_ENABLED)
+author:
+    - Homelab Ansible
+options:
+    output:
+        description:
+            - Path of the JSON plan file
+        type: path
+        default: .cache/plan.json
+        env:
+            - name: HOMELAB_PLAN_OUTPUT
+        ini:
+            - key: output
+              section: callback_homelab_plan
+"""
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+CHECK_MODE_SKIP = "does not support check mode"
+MAX_LABEL = 80
+
+
+def _shorten(label):
+    if not isinstance(label, str):
+        label = json.dumps(label, sort_keys=True, default=str)
+    if len(label) > MAX_LABEL:
+        label = label[: MAX_LABEL - 3] + "..."
+    return label
+
+
+class CallbackModule(CallbackBase):
+    """Write the changes, failures and unpredictable tasks of a run."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "homelab_plan"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super(CallbackModule, self).__init__(*args, **kwargs)
+        self._playbook = ""
+        self._started = None
+        self._check_mode = False
+        self._entries = []
+
+    def v2_playbook_on_start(self, playbook):
+        self._playbook = os.path.basename(playbook._file_name)
+        self._started = time.time()
+
+    def v2_playbook_on_play_start(self, play):
+        self._check_mode = self._check_mode or bool(play.check_mode)
+
+    def _record(self, result, failed=False, skipped=False):
+        task = result._task
+        items = result._result.get("results")
+        looped = isinstance(items, list)
+        if not looped:
+            items = [result._result]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            # A loop reports its items' own status.
+            kind = self._kind(
+                item, failed and not looped, skipped and not looped
+            )
+            if kind is None:
+                continue
+            label = self._get_item_label(item) if looped else ""
+            entry = {
+                "host": result._host.get_name(),
+                "role": task._role.get_name() if task._role else "",
+                "task": task.get_name().strip(),
+                "action": task.action,
+                "item": _shorten(label),
+                "status": kind,
+                "msg": "",
+                "changed_keys": [],
+                "diff": "",
+            }
+            if item.get("_ansible_no_log") or "censored" in item:
+                entry["msg"] = "(output hidden by no_log)"
+                self._entries.append(entry)
+                continue
+            msg = item.get("msg", "")
+            entry["msg"] = msg if isinstance(msg, str) else str(msg)
+            keys = item.get("changed_keys")
+            if isinstance(keys, list):
+                entry["changed_keys"] = [str(key) for key in keys]
+            if kind == "change" and item.get("diff"):
+                entry["diff"] = self._get_diff(item["diff"])
+            self._entries.append(entry)
+
+    @staticmethod
+    def _kind(item, failed, skipped):
+        if failed or item.get("failed") or item.get("unreachable"):
+            return "failed"
+        if skipped or item.get("skipped"):
+            if CHECK_MODE_SKIP in str(item.get("msg", "")):
+                return "unknown"
+            return None
+        if item.get("changed"):
+            return "change"
+        return None
+
+    def v2_runner_on_ok(self, result):
+        self._record(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        if not ignore_errors:
+            self._record(result, failed=True)
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, skipped=True)
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, failed=True)
+
+    def v2_playbook_on_stats(self, stats):
+        if self._started is None:
+            return
+        path = os.path.expanduser(self.get_option("output"))
+        plan = {
+            "playbook": self._playbook,
+            "check_mode": self._check_mode,
+            "started": self._started,
+            "duration": time.time() - self._started,
+            "entries": self._entries,
+        }
+        directory = os.path.dirname(path)
+        try:
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open(path + ".tmp", "w") as handle:
+                json.dump(plan, handle, indent=1, sort_keys=True)
+            os.rename(path + ".tmp", path)
+        except OSError as e:
+            self._display.warning(
+                "homelab_plan: failed to write %s: %s" % (path, e)
+            )
+            return
+        counts = dict((kind, 0) for kind in ("change", "unknown", "failed"))
+        for entry in self._entries:
+            counts[entry["status"]] += 1
+        self._display.display(
+            "Plan: %d to change, %d unpredictable, %d failed, written to %s"
+            % (counts["change"], counts["unknown"], counts["failed"], path)
+        )
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+name: homelab_profile
+type: aggregate
+short_description: Record per-task, per-role and per-module timings
+description:
+    - Measures wall time for every task on every host and appends it to a
+      local SQLite trend database at the end of the playbook run
+    - Collects module-internal timings that the custom modules return in
+      their C(timings) result key (exec latency, HTTP latency, auth time)
+    - Use C(make profile) to report the slowest tasks and regressions
+      against earlier runs
+requirements:
+    - enable in ansible.cfg via C(callbacks_enabled)
+author:
+    - Homelab Ansible
+options:
+    db_path:
+        description:
+            - Path to the SQLite trend database
+        type: path
+        default: .cache/profile.sqlite
+        env:
+            - name: HOMELAB_PROFILE_DB
+        ini:
+            - key: db_path
+              section: callback_homelab_profile
+"""
+
+import os
+import sqlite3
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    playbook   TEXT    NOT NULL,
+    started    REAL    NOT NULL,
+    duration   REAL    NOT NULL,
+    failed     INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS task_timings (
+    run_id     INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    host       TEXT    NOT NULL,
+    play       TEXT    NOT NULL,
+    role       TEXT    NOT NULL,
+    task       TEXT    NOT NULL,
+    action     TEXT    NOT NULL,
+    status     TEXT    NOT NULL,
+    started    REAL    NOT NULL,
+    duration   REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS module_timings (
+    run_id     INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    host       TEXT    NOT NULL,
+    task       TEXT    NOT NULL,
+    action     TEXT    NOT NULL,
+    metric     TEXT    NOT NULL,
+    calls      INTEGER NOT NULL,
+    total_ms   REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS task_timings_run ON task_timings(run_id);
+CREATE INDEX IF NOT EXISTS module_timings_run ON module_timings(run_id);
+"""
+
+
+class CallbackModule(CallbackBase):
+    """Append task and module timings to a SQLite trend database."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "homelab_profile"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super(CallbackModule, self).__init__(*args, **kwargs)
+        self._playbook = ""
+        self._play = ""
+        self._run_started = None
+        self._pending = {}
+        self._task_rows = []
+        self._module_rows = []
+        self._failed = False
+
+    def v2_playbook_on_start(self, playbook):
+        self._playbook = os.path.basename(playbook._file_name)
+        self._run_started = time.time()
+
+    def v2_playbook_on_play_start(self, play):
+        self._play = play.get_name().strip()
+
+    def v2_runner_on_start(self, host, task):
+        self._pending[(host.get_name(), task._uuid)] = time.time()
+
+    def _record(self, result, status):
+        host = result._host.get_name()
+        task = result._task
+        started = self._pending.pop((host, task._uuid), None)
+        if started is None:
+            return
+        now = time.time()
+        role = task._role.get_name() if task._role else ""
+        name = task.get_name().strip()
+        self._task_rows.append(
+            (
+                host,
+                self._play,
+                role,
+                name,
+                task.action,
+                status,
+                started,
+                now - started,
+            )
+        )
+
+        # Loop results carry one timings dict per item; sum them per metric.
+        items = result._result.get("results")
+        if not isinstance(items, list):
+            items = [result._result]
+        totals = {}
+        for item in items:
+            timings = item.get("timings") if isinstance(item, dict) else None
+            if not isinstance(timings, dict):
+                continue
+            for metric, value in timings.items():
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+                calls, total = totals.get(metric, (0, 0.0))
+                totals[metric] = (calls + 1, total + value)
+        for metric, (calls, total) in totals.items():
+            self._module_rows.append(
+                (host, name, task.action, metric, calls, total)
+            )
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        if not ignore_errors:
+            self._failed = True
+        self._record(result, "failed")
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, "skipped")
+
+    def v2_runner_on_unreachable(self, result):
+        self._failed = True
+        self._record(result, "unreachable")
+
+    def v2_playbook_on_stats(self, stats):
+        if self._run_started is None:
+            return
+        db_path = os.path.expanduser(self.get_option("db_path"))
+        directory = os.path.dirname(db_path)
+        try:
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            conn = sqlite3.connect(db_path, timeout=30)
+            with conn:
+                conn.executescript(SCHEMA)
+                cursor = conn.execute(
+                    "INSERT INTO runs (playbook, started, duration, failed) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        self._playbook,
+                        self._run_started,
+                        time.time() - self._run_started,
+                        int(self._failed),
+                    ),
+                )
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO task_timings (run_id, host, play, role, "
+                    "task, action, status, started, duration) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id,) + row for row in self._task_rows],
+                )
+                conn.executemany(
+                    "INSERT INTO module_timings (run_id, host, task, action, "
+                    "metric, calls, total_ms) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id,) + row for row in self._module_rows],
+                )
+            conn.close()
+        except (OSError, sqlite3.Error) as e:
+            self._display.warning(
+                "homelab_profile: failed to write %s: %s" % (db_path, e)
+            )
+            return
+        self._display.display(
+            "Profile: recorded %d task timings in %s (run %d)"
+            % (len(self._task_rows), db_path, run_id)
+        )
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Hashed set-diff filters for desired-vs-existing comparisons.
+
+The roles compare a desired list against what an API returned. Done in
+Jinja (``x not in existing_names`` inside a loop, ``selectattr`` per item,
+``combine`` in a loop) every lookup scans a list, so the cost grows with
+desired x existing. These filters build one dict per call and run in
+O(n + m).
+
+index_by(items, key, value=None)
+    Dict of key -> item (or item[value]). When the key holds a list (NPM
+    ``domain_names``) every element is indexed. The first item wins, like
+    ``selectattr(...) | first``; items without the key are skipped.
+
+diff_by_key(desired, existing, key, existing_key=None)
+    Dict with ``missing`` (desired items not in existing), ``present``
+    (desired items found in existing) and ``extra`` (existing items not
+    desired). existing_key defaults to key.
+
+partition_changed(results, attribute="changed")
+    Dict with ``changed`` and ``unchanged`` lists, e.g. for the
+    ``results`` of a registered loop.
+
+deep_diff(current, desired)
+    Sorted dotted paths of the fields in desired whose value differs
+    from current. Dicts are compared recursively and only on the keys
+    desired sets, anything else by equality. Templated strings are
+    compared as the type of the current value ("8096" equals 8096,
+    "True" equals true), since Jinja renders nested values as text.
+
+Keys may be dotted paths (``Policy.IsAdministrator``).
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.errors import AnsibleFilterError
+
+MISSING = object()
+
+
+def _lookup(item, key):
+    """Return item[key] following dotted paths, or MISSING."""
+    for part in key.split("."):
+        if not isinstance(item, dict) or part not in item:
+            return MISSING
+        item = item[part]
+    return item
+
+
+def _keys(item, key):
+    """Return the hashable index keys of item (several for list values)."""
+    value = _lookup(item, key)
+    if value is MISSING or value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return value
+    return (value,)
+
+
+def _check_list(value, name):
+    if not isinstance(value, (list, tuple)):
+        raise AnsibleFilterError(
+            "%s expects a list, got %s" % (name, type(value).__name__)
+        )
+
+
+def index_by(items, key, value=None):
+    _check_list(items, "index_by")
+    index = {}
+    for item in items:
+        for item_key in _keys(item, key):
+            if item_key in index:
+                continue
+            if value is None:
+                index[item_key] = item
+            else:
+                found = _lookup(item, value)
+                index[item_key] = None if found is MISSING else found
+    return index
+
+
+def diff_by_key(desired, existing, key, existing_key=None):
+    _check_list(desired, "diff_by_key")
+    _check_list(existing, "diff_by_key")
+    existing_key = existing_key or key
+    found = set()
+    for item in existing:
+        found.update(_keys(item, existing_key))
+    wanted = set()
+    result = {"missing": [], "present": [], "extra": []}
+    for item in desired:
+        keys = _keys(item, key)
+        wanted.update(keys)
+        if any(k in found for k in keys):
+            result["present"].append(item)
+        else:
+            result["missing"].append(item)
+    result["extra"] = [
+        item
+        for item in existing
+        if not any(k in wanted for k in _keys(item, existing_key))
+    ]
+    return result
+
+
+def partition_changed(results, attribute="changed"):
+    _check_list(results, "partition_changed")
+    result = {"changed": [], "unchanged": []}
+    for item in results:
+        value = _lookup(item, attribute)
+        if value is not MISSING and value:
+            result["changed"].append(item)
+        else:
+            result["unchanged"].append(item)
+    return result
+
+
+# Same rules as match_type() in module_utils/api_diff.py, keep the two in
+# sync. Controller-side plugins cannot import the repo's module_utils.
+def _as_type(have, value):
+    """Convert a templated string to the type of the current value."""
+    if not isinstance(value, str):
+        return value
+    if isinstance(have, bool):
+        if value.lower() in ("true", "yes", "on", "1"):
+            return True
+        if value.lower() in ("false", "no", "off", "0"):
+            return False
+    elif isinstance(have, int) and value.lstrip("-").isdigit():
+        return int(value)
+    elif isinstance(have, float):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _deep_diff(current, desired, prefix):
+    if not isinstance(current, dict):
+        current = {}
+    changes = []
+    for key, value in desired.items():
+        path = "%s%s" % (prefix, key)
+        have = current.get(key, MISSING)
+        if isinstance(value, dict) and isinstance(have, dict):
+            changes.extend(_deep_diff(have, value, path + "."))
+        elif have is MISSING or have != _as_type(have, value):
+            changes.append(path)
+    return changes
+
+
+def deep_diff(current, desired):
+    if not isinstance(desired, dict):
+        raise AnsibleFilterError(
+            "deep_diff expects a dict, got %s" % type(desired).__name__
+        )
+    return sorted(_deep_diff(current, desired, ""))
+
+
+class FilterModule(object):
+    def filters(self):
+        return {
+            "index_by": index_by,
+            "diff_by_key": diff_by_key,
+            "partition_changed": partition_changed,
+            "deep_diff": deep_diff,
+        }
@@ -11,6 +11,7 @@ __metaclass__ = type
 
 import subprocess
 import shlex
+import time
 from ansible.module_utils.basic import AnsibleModule
 
 DOCUMENTATION = r"""
@@ -173,6 +174,10 @@ msg:
     description: Human-readable message about execution status
     type: str
     returned: always
+timings:
+    description: Module-internal timings in milliseconds (check_ms, exec_ms)
+    type: dict
+    returned: always
 """
 
 
@@ -277,16 +282,19 @@ def main():
     user = module.params["user"]
     environment = module.params["environment"]
     stdin = module.params["stdin"]
+    timings = {}
 
     # Check if we should skip execution based on creates/removes
     if creates:
         # Skip if file exists
+        started = time.monotonic()
         success, stdout, stderr = docker_exec_check(
             container_id,
             "test -e {} && echo exists || echo missing".format(
                 shlex.quote(creates)
             ),
         )
+        timings["check_ms"] = (time.monotonic() - started) * 1000
         if success and "exists" in stdout:
             module.exit_json(
                 changed=False,
@@ -297,16 +305,19 @@ def main():
                 stdout="",
                 stderr="",
                 rc=0,
+                timings=timings,
             )
 
     if removes:
         # Skip if file does not exist
+        started = time.monotonic()
         success, stdout, stderr = docker_exec_check(
             container_id,
             "test -e {} && echo exists || echo missing".format(shlex.quote(
                 removes)
             ),
         )
+        timings["check_ms"] = (time.monotonic() - started) * 1000
         if success and "missing" in stdout:
             module.exit_json(
                 changed=False,
@@ -317,6 +328,7 @@ def main():
                 stdout="",
                 stderr="",
                 rc=0,
+                timings=timings,
             )
 
     # Execute command in check mode (dry-run)
@@ -324,13 +336,19 @@ def main():
         module.exit_json(
             changed=True,
             skipped=False,
-            msg="Would execute command (check mode)",
+            msg="Would execute {} (check mode)".format(
+                command
+                if not isinstance(command, list)
+                else " ".join(shlex.quote(c) for c in command)
+            ),
             stdout="",
             stderr="",
             rc=0,
+            timings=timings,
         )
 
     # Execute the actual command
+    started = time.monotonic()
     rc, stdout, stderr = docker_exec_command(
         container_id,
         command,
@@ -339,6 +357,7 @@ def main():
         environment=environment,
         stdin=stdin,
     )
+    timings["exec_ms"] = (time.monotonic() - started) * 1000
 
     # Determine if execution represents a change
     # Commands are assumed to change state unless explicitly marked as queries
@@ -351,6 +370,7 @@ def main():
             stdout=stdout,
             stderr=stderr,
             changed=changed,
+            timings=timings,
         )
 
     module.exit_json(
@@ -360,6 +380,7 @@ def main():
         rc=rc,
         stdout=stdout,
         stderr=stderr,
+        timings=timings,
     )
 
 
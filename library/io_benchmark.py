@@ -0,0 +1,478 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: io_benchmark
+short_description: Measure file I/O throughput and latency in a directory
+version_added: "1.1.0"
+description:
+    - Pure-Python I/O driver (no fio needed). Creates a test file in
+      I(path), runs the selected tests against it and removes it again
+    - When I(path) is a block device the read tests run directly against
+      it (read-only), which gives a baseline before the filesystem is
+      mounted
+    - C(seq_write) and C(seq_read) stream the file in I(block_kb) blocks,
+      C(rand_read) and C(rand_write) make I(random_ops) requests of
+      I(random_block_kb) at random aligned offsets, C(fsync) makes
+      I(fsync_ops) 4 KiB writes each followed by fsync (commit latency of a
+      database or metadata update)
+    - Writes use incompressible data and are followed by an fsync, which is
+      included in the measured time
+    - Before every read test the file is fsynced and dropped from the page
+      cache with C(posix_fadvise(DONTNEED)) so the reads reach the device or
+      NFS server; I(direct) uses C(O_DIRECT) instead
+    - Every request is timed; the result has MB/s, IOPS and latency
+      percentiles per test
+    - With I(baseline) (the C(measurements) of an earlier run) every test is
+      compared and slowdowns beyond I(max_regression) are returned in
+      C(regressions)
+    - Nothing is changed on the host; in check mode no test is run
+options:
+    path:
+        description:
+            - Directory (local or a mounted share) to test in, or a block
+              device for read-only tests
+        required: true
+        type: path
+    size_mb:
+        description:
+            - Size of the test file in MiB
+            - Should be larger than the read-ahead and any server-side cache
+              that is not dropped
+        required: false
+        type: int
+        default: 256
+    block_kb:
+        description:
+            - Request size of the sequential tests in KiB
+        required: false
+        type: int
+        default: 1024
+    random_block_kb:
+        description:
+            - Request size of the random tests in KiB
+        required: false
+        type: int
+        default: 64
+    random_ops:
+        description:
+            - Number of requests per random test
+        required: false
+        type: int
+        default: 2000
+    fsync_ops:
+        description:
+            - Number of write+fsync requests of the C(fsync) test
+        required: false
+        type: int
+        default: 200
+    tests:
+        description:
+            - Tests to run; they always run in the order listed here
+            - Only C(seq_read) and C(rand_read) are possible on a block
+              device
+        required: false
+        type: list
+        elements: str
+        choices: [seq_write, seq_read, rand_read, rand_write, fsync]
+        default: [seq_write, seq_read, rand_read, rand_write, fsync]
+    direct:
+        description:
+            - Open the test file with C(O_DIRECT), bypassing the page cache
+        required: false
+        type: bool
+        default: false
+    seed:
+        description:
+            - Seed for the random offsets, so runs are comparable
+        required: false
+        type: int
+        default: 0
+    baseline:
+        description:
+            - C(measurements) of an earlier run to compare with
+        required: false
+        type: dict
+    max_regression:
+        description:
+            - Allowed relative change before a test counts as regressed,
+              lower MB/s or higher median latency
+        required: false
+        type: float
+        default: 0.25
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Measure the media drive
+  io_benchmark:
+    path: /mnt/ssd_media
+    size_mb: 512
+  register: media_io
+
+- name: Streaming-style reads only, bypassing the page cache
+  io_benchmark:
+    path: /mnt/nfs-bench/v42-1m
+    tests: [seq_read, rand_read]
+    random_block_kb: 512
+    direct: true
+
+- name: Raw device reads before mounting
+  io_benchmark:
+    path: /dev/disk/by-id/usb-Samsung_PSSD_T7-part2
+    tests: [seq_read, rand_read]
+    direct: true
+"""
+
+RETURN = r"""
+measurements:
+    description: Per-test throughput and latency
+    type: dict
+    returned: unless check mode
+    sample:
+        seq_read:
+            bytes: 268435456
+            ops: 256
+            seconds: 0.71
+            mb_per_s: 360.6
+            iops: 360.6
+            latency_ms: {p50: 2.61, p95: 3.4, p99: 5.02, max: 9.8}
+        rand_read:
+            bytes: 131072000
+            ops: 2000
+            seconds: 1.93
+            mb_per_s: 64.8
+            iops: 1036.3
+            latency_ms: {p50: 0.9, p95: 1.6, p99: 2.3, max: 7.1}
+regressions:
+    description: Tests that got slower than I(baseline) allows
+    type: list
+    returned: when baseline is given
+    sample:
+        - test: fsync
+          metric: latency_ms.p50
+          baseline: 1.2
+          current: 3.9
+          change: 2.25
+size_mb:
+    description: Size of the test file (or of the device area read)
+    type: int
+    returned: always
+"""
+
+import math
+import mmap
+import os
+import random
+import stat
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+TESTS = ("seq_write", "seq_read", "rand_read", "rand_write", "fsync")
+READ_TESTS = ("seq_read", "rand_read")
+MIB = 1024 * 1024
+FSYNC_BLOCK = 4096
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(samples))))
+    return samples[rank - 1]
+
+
+def summarize(latencies, nbytes, seconds):
+    latencies.sort()
+    return {
+        "bytes": nbytes,
+        "ops": len(latencies),
+        "seconds": round(seconds, 4),
+        "mb_per_s": round(nbytes / MIB / seconds, 1) if seconds else 0.0,
+        "iops": round(len(latencies) / seconds, 1) if seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
+class IOBenchmark:
+    def __init__(
+        self,
+        filename,
+        size,
+        block,
+        random_block,
+        random_ops,
+        fsync_ops,
+        seed,
+        direct,
+    ):
+        self.filename = filename
+        self.size = size
+        self.block = block
+        self.random_block = random_block
+        self.random_ops = random_ops
+        self.fsync_ops = fsync_ops
+        self.rng = random.Random(seed)
+        self.direct = direct
+        # mmap memory is page aligned, as O_DIRECT requires.
+        self.buffer = mmap.mmap(-1, max(block, random_block, FSYNC_BLOCK))
+        self.buffer.write(os.urandom(len(self.buffer)))
+
+    def open(self, flags):
+        if self.direct:
+            flags |= getattr(os, "O_DIRECT", 0)
+        return os.open(self.filename, flags, 0o600)
+
+    def drop_cache(self):
+        fd = os.open(self.filename, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+    def random_offsets(self):
+        slots = self.size // self.random_block
+        return [
+            self.rng.randrange(slots) * self.random_block
+            for _ in range(self.random_ops)
+        ]
+
+    def run(self, fd, offsets, size, write, sync_each=False):
+        view = memoryview(self.buffer)[:size]
+        latencies = []
+        started = time.perf_counter()
+        for offset in offsets:
+            op_started = time.perf_counter()
+            if write:
+                done = os.pwrite(fd, view, offset)
+                if sync_each:
+                    os.fsync(fd)
+            else:
+                done = os.preadv(fd, [view], offset)
+            latencies.append((time.perf_counter() - op_started) * 1000)
+            if done != size:
+                raise IOError(
+                    "short %s at offset %d: %d of %d bytes"
+                    % ("write" if write else "read", offset, done, size)
+                )
+        if write:
+            os.fsync(fd)
+        seconds = time.perf_counter() - started
+        view.release()
+        return summarize(latencies, size * len(offsets), seconds)
+
+    def seq_write(self):
+        fd = self.open(os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            return self.run(
+                fd, range(0, self.size, self.block), self.block, True
+            )
+        finally:
+            os.close(fd)
+
+    def seq_read(self):
+        self.drop_cache()
+        fd = self.open(os.O_RDONLY)
+        try:
+            return self.run(
+                fd, range(0, self.size, self.block), self.block, False
+            )
+        finally:
+            os.close(fd)
+
+    def rand_read(self):
+        self.drop_cache()
+        fd = self.open(os.O_RDONLY)
+        try:
+            return self.run(
+                fd, self.random_offsets(), self.random_block, False
+            )
+        finally:
+            os.close(fd)
+
+    def rand_write(self):
+        fd = self.open(os.O_WRONLY)
+        try:
+            return self.run(fd, self.random_offsets(), self.random_block, True)
+        finally:
+            os.close(fd)
+
+    def fsync(self):
+        offsets = [
+            (i * FSYNC_BLOCK) % self.size for i in range(self.fsync_ops)
+        ]
+        fd = self.open(os.O_WRONLY)
+        try:
+            return self.run(fd, offsets, FSYNC_BLOCK, True, sync_each=True)
+        finally:
+            os.close(fd)
+
+
+def compare(results, baseline, max_regression):
+    """Return the tests in results that regressed against baseline."""
+    regressions = []
+    for test, current in sorted(results.items()):
+        before = baseline.get(test)
+        if not isinstance(before, dict):
+            continue
+        checks = (
+            ("mb_per_s", before.get("mb_per_s"), current["mb_per_s"], -1),
+            (
+                "latency_ms.p50",
+                (before.get("latency_ms") or {}).get("p50"),
+                current["latency_ms"]["p50"],
+                1,
+            ),
+        )
+        for metric, old, new, direction in checks:
+            if not old:
+                continue
+            change = (new - old) / float(old)
+            if change * direction > max_regression:
+                regressions.append(
+                    {
+                        "test": test,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(change, 3),
+                    }
+                )
+    return regressions
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            path=dict(type="path", required=True),
+            size_mb=dict(type="int", default=256),
+            block_kb=dict(type="int", default=1024),
+            random_block_kb=dict(type="int", default=64),
+            random_ops=dict(type="int", default=2000),
+            fsync_ops=dict(type="int", default=200),
+            tests=dict(
+                type="list",
+                elements="str",
+                choices=list(TESTS),
+                default=list(TESTS),
+            ),
+            direct=dict(type="bool", default=False),
+            seed=dict(type="int", default=0),
+            baseline=dict(type="dict", required=False),
+            max_regression=dict(type="float", default=0.25),
+        ),
+        supports_check_mode=True,
+    )
+    params = module.params
+    result = {"changed": False, "size_mb": params["size_mb"]}
+
+    for option in (
+        "size_mb",
+        "block_kb",
+        "random_block_kb",
+        "random_ops",
+        "fsync_ops",
+    ):
+        if params[option] < 1:
+            module.fail_json(msg="%s must be at least 1" % option, **result)
+    size = params["size_mb"] * MIB
+    block = params["block_kb"] * 1024
+    random_block = params["random_block_kb"] * 1024
+    if size % block or size % random_block:
+        module.fail_json(
+            msg="size_mb must be a multiple of block_kb and random_block_kb",
+            **result,
+        )
+    path = params["path"]
+    try:
+        device = stat.S_ISBLK(os.stat(path).st_mode)
+    except OSError as e:
+        module.fail_json(msg="Cannot stat %s: %s" % (path, e), **result)
+    if device:
+        writes = [t for t in params["tests"] if t not in READ_TESTS]
+        if writes:
+            module.fail_json(
+                msg="%s is a block device; only %s can run against it, not %s"
+                % (path, ", ".join(READ_TESTS), ", ".join(writes)),
+                **result,
+            )
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            device_size = os.lseek(fd, 0, os.SEEK_END)
+        finally:
+            os.close(fd)
+        if device_size < size:
+            size = device_size - device_size % max(block, random_block)
+            result["size_mb"] = size // MIB
+        filename = path
+    elif os.path.isdir(path):
+        fs = os.statvfs(path)
+        if fs.f_bavail * fs.f_frsize < size + 64 * MIB:
+            module.fail_json(
+                msg="Not enough free space in %s for a %d MiB test file"
+                % (path, params["size_mb"]),
+                **result,
+            )
+        filename = os.path.join(path, ".io_benchmark.%d.tmp" % os.getpid())
+    else:
+        module.fail_json(
+            msg="%s is neither a directory nor a block device" % path,
+            **result,
+        )
+    if module.check_mode:
+        module.exit_json(skipped=True, msg="Not run in check mode", **result)
+
+    bench = IOBenchmark(
+        filename,
+        size,
+        block,
+        random_block,
+        params["random_ops"],
+        params["fsync_ops"],
+        params["seed"],
+        params["direct"],
+    )
+    results = {}
+    try:
+        for test in TESTS:
+            if test in params["tests"]:
+                results[test] = getattr(bench, test)()
+            elif test == "seq_write" and not device:
+                # The other tests need a full file to work on.
+                bench.seq_write()
+    except (IOError, OSError) as e:
+        module.fail_json(msg="I/O benchmark failed: %s" % e, **result)
+    finally:
+        if not device:
+            try:
+                os.unlink(filename)
+            except OSError:
+                pass
+
+    result["measurements"] = results
+    if params["baseline"]:
+        result["regressions"] = compare(
+            results, params["baseline"], params["max_regression"]
+        )
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
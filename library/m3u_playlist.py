@@ -0,0 +1,556 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: m3u_playlist
+short_description: Keep a filtered, de-duplicated copy of an IPTV M3U playlist
+version_added: "1.1.0"
+description:
+    - Downloads an M3U playlist to a temporary file and parses it line by
+      line, so memory use does not grow with the playlist
+    - Channels can be kept or dropped by group (C(group-title) or
+      C(#EXTGRP)) and by regular expressions on the channel name; streams
+      listed more than once are written only once
+    - The result is a compact playlist with only the I(attributes) given,
+      written to I(dest) together with C(<dest>.sha256), so Jellyfin and
+      Dispatcharr read a small local file instead of the full upstream one
+    - The upstream ETag/Last-Modified and SHA-256 are stored in
+      C(.<name>.state.json) next to I(dest). A later run sends a
+      conditional request and skips parsing when the server answers
+      304 Not Modified or the content hash is the same; changing a filter
+      option always regenerates the playlist
+    - I(dest) is only replaced when the filtered content changed
+    - C(file://) sources are supported
+options:
+    src:
+        description:
+            - URL of the upstream playlist (C(http://), C(https://) or
+              C(file://))
+        required: true
+        type: str
+    dest:
+        description:
+            - Path of the filtered playlist; parent directories are created
+        required: true
+        type: path
+    include_groups:
+        description:
+            - Only keep channels in these groups (case-insensitive)
+        required: false
+        type: list
+        elements: str
+        default: []
+    exclude_groups:
+        description:
+            - Drop channels in these groups (case-insensitive)
+        required: false
+        type: list
+        elements: str
+        default: []
+    include_regex:
+        description:
+            - Only keep channels whose name matches this regular expression
+              (searched, case-insensitive)
+        required: false
+        type: str
+    exclude_regex:
+        description:
+            - Drop channels whose name matches this regular expression
+              (searched, case-insensitive)
+        required: false
+        type: str
+    dedupe:
+        description:
+            - C(url) keeps the first channel for each stream URL, C(tvg_id)
+              the first channel for each C(tvg-id) (channels without one are
+              de-duplicated by URL), C(none) keeps everything
+        required: false
+        type: str
+        choices: [url, tvg_id, none]
+        default: url
+    attributes:
+        description:
+            - C(#EXTINF) attributes written to I(dest); other attributes
+              are dropped
+        required: false
+        type: list
+        elements: str
+        default: [tvg-id, tvg-name, tvg-logo, tvg-chno, group-title]
+    force:
+        description:
+            - Download and regenerate even if nothing changed upstream
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Download timeout in seconds
+        required: false
+        type: int
+        default: 60
+    validate_certs:
+        description:
+            - Verify TLS certificates when downloading
+        required: false
+        type: bool
+        default: true
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Keep only the news and sports channels of a large playlist
+  m3u_playlist:
+    src: https://iptv-org.github.io/iptv/countries/us.m3u
+    dest: /mnt/ssd_media/iptv/us.m3u
+    include_groups: [News, Sports]
+    exclude_regex: "\\b(radio|test)\\b"
+  register: us_playlist
+
+- name: Point a Jellyfin tuner at the filtered copy
+  jellyfin_tuners:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    tuners:
+      - name: US IPTV
+        url: /media/iptv/us.m3u
+"""
+
+RETURN = r"""
+status:
+    description: >-
+      C(not_modified) (304 from upstream), C(unchanged) (same content hash
+      or same filtered result) or C(regenerated)
+    type: str
+    returned: always
+dest:
+    description: Path of the filtered playlist
+    type: str
+    returned: always
+sha256:
+    description: SHA-256 of the filtered playlist
+    type: str
+    returned: always
+source_sha256:
+    description: SHA-256 of the upstream playlist as last downloaded
+    type: str
+    returned: always
+stats:
+    description: Channel counts and sizes of the last parse
+    type: dict
+    returned: always
+    sample:
+        channels: 48211
+        kept: 1530
+        filtered: 46590
+        duplicates: 91
+        bytes_in: 12582912
+        bytes_out: 301234
+timings:
+    description: >-
+      download_ms, parse_ms and parse throughput (channels_per_s, mib_per_s)
+      of this run; parse values are 0 when nothing was parsed
+    type: dict
+    returned: always
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+USER_AGENT = "homelab-ansible-m3u/1.0"
+CHUNK_SIZE = 1024 * 1024
+
+EXTINF_RE = re.compile(
+    r'^#EXTINF:\s*(-?[\d.]+)((?:\s+[\w-]+="[^"]*")*)\s*,(.*)$'
+)
+ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+# Per-channel directives kept with the channel they precede.
+OPTION_PREFIXES = ("#EXTVLCOPT:", "#KODIPROP:")
+# #EXTM3U attributes kept in the header (guide URLs).
+HEADER_ATTRIBUTES = ("url-tvg", "x-tvg-url", "tvg-shift")
+
+
+class PlaylistError(Exception):
+    pass
+
+
+def parse_extinf(line):
+    """Return (attributes, title) of an #EXTINF line."""
+    match = EXTINF_RE.match(line)
+    if match:
+        return dict(ATTR_RE.findall(match.group(2))), match.group(3).strip()
+    # Unusual quoting: split at the first comma outside quotes.
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            return dict(ATTR_RE.findall(line[:index])), line[index + 1 :]
+    return dict(ATTR_RE.findall(line)), ""
+
+
+def iter_channels(lines):
+    """Yield ("header", attributes) once, then one dict per channel.
+
+    A channel is an #EXTINF line, the option lines after it and the
+    stream URL that ends it. URLs without #EXTINF become channels named
+    after the URL.
+    """
+    header = {}
+    attributes, title, group, options = None, "", None, []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXTM3U"):
+            if header is not None:
+                header.update(ATTR_RE.findall(line))
+            continue
+        if line.startswith("#EXTINF:"):
+            attributes, title = parse_extinf(line)
+            group, options = None, []
+        elif line.startswith("#EXTGRP:"):
+            group = line[8:].strip()
+        elif line.startswith(OPTION_PREFIXES):
+            options.append(line)
+        elif not line.startswith("#"):
+            if header is not None:
+                yield "header", header
+                header = None
+            attributes = attributes or {}
+            if group and not attributes.get("group-title"):
+                attributes["group-title"] = group
+            yield "channel", {
+                "attributes": attributes,
+                "title": title or line,
+                "options": options,
+                "url": line,
+            }
+            attributes, title, group, options = None, "", None, []
+    if header is not None:
+        yield "header", header
+
+
+def format_channel(channel, keep):
+    attributes = channel["attributes"]
+    parts = ["#EXTINF:-1"]
+    for name in keep:
+        if name in attributes:
+            parts.append(' %s="%s"' % (name, attributes[name]))
+    lines = ["".join(parts) + "," + channel["title"]]
+    lines.extend(channel["options"])
+    lines.append(channel["url"])
+    return "\n".join(lines) + "\n"
+
+
+def filter_playlist(src_path, out, params):
+    """Stream src_path into the open text file out; return the stats."""
+    include_groups = set(g.lower() for g in params["include_groups"])
+    exclude_groups = set(g.lower() for g in params["exclude_groups"])
+    include_re = exclude_re = None
+    if params["include_regex"]:
+        include_re = re.compile(params["include_regex"], re.IGNORECASE)
+    if params["exclude_regex"]:
+        exclude_re = re.compile(params["exclude_regex"], re.IGNORECASE)
+    keep = params["attributes"]
+    dedupe = params["dedupe"]
+
+    stats = {"channels": 0, "kept": 0, "filtered": 0, "duplicates": 0}
+    seen = set()
+    with open(src_path, encoding="utf-8", errors="replace") as lines:
+        for kind, item in iter_channels(lines):
+            if kind == "header":
+                out.write(
+                    "".join(
+                        ["#EXTM3U"]
+                        + [
+                            ' %s="%s"' % (name, item[name])
+                            for name in HEADER_ATTRIBUTES
+                            if name in item
+                        ]
+                    )
+                    + "\n"
+                )
+                continue
+            stats["channels"] += 1
+            group = (item["attributes"].get("group-title") or "").lower()
+            if (
+                (include_groups and group not in include_groups)
+                or group in exclude_groups
+                or (include_re and not include_re.search(item["title"]))
+                or (exclude_re and exclude_re.search(item["title"]))
+            ):
+                stats["filtered"] += 1
+                continue
+            if dedupe != "none":
+                key = item["url"]
+                if dedupe == "tvg_id" and item["attributes"].get("tvg-id"):
+                    key = "tvg-id:" + item["attributes"]["tvg-id"]
+                if key in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+            stats["kept"] += 1
+            out.write(format_channel(item, keep))
+    return stats
+
+
+def download(src, dest_file, validators, timeout, validate_certs):
+    """Stream src into dest_file while hashing it.
+
+    Returns None when the server answered 304, else a dict with sha256,
+    bytes, etag and last_modified.
+    """
+    # urllib.request and ssl are only needed once a download starts.
+    from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
+    from ansible.module_utils.six.moves.urllib.request import Request, urlopen
+
+    headers = {"User-Agent": USER_AGENT}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    context = None
+    if src.startswith("https://") and not validate_certs:
+        import ssl
+
+        context = ssl._create_unverified_context()
+    try:
+        response = urlopen(
+            Request(src, headers=headers), timeout=timeout, context=context
+        )
+    except HTTPError as e:
+        if e.code == 304:
+            return None
+        raise PlaylistError("HTTP %d fetching %s" % (e.code, src))
+    except (URLError, OSError, ValueError) as e:
+        raise PlaylistError("Failed to fetch %s: %s" % (src, e))
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with response:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dest_file.write(chunk)
+                size += len(chunk)
+            info = response.info()
+    except (URLError, OSError) as e:
+        raise PlaylistError("Failed to read %s: %s" % (src, e))
+    return {
+        "sha256": digest.hexdigest(),
+        "bytes": size,
+        "etag": info.get("ETag") if info else None,
+        "last_modified": info.get("Last-Modified") if info else None,
+    }
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except (IOError, OSError):
+        return None
+    return digest.hexdigest()
+
+
+def settings_digest(params):
+    keys = (
+        "src",
+        "include_groups",
+        "exclude_groups",
+        "include_regex",
+        "exclude_regex",
+        "dedupe",
+        "attributes",
+    )
+    data = json.dumps([params[key] for key in keys], sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def load_state(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def write_atomic(path, data, mode=0o644):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as handle:
+        handle.write(data)
+    os.chmod(tmp_path, mode)
+    os.rename(tmp_path, path)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            src=dict(type="str", required=True),
+            dest=dict(type="path", required=True),
+            include_groups=dict(type="list", elements="str", default=[]),
+            exclude_groups=dict(type="list", elements="str", default=[]),
+            include_regex=dict(type="str", required=False),
+            exclude_regex=dict(type="str", required=False),
+            dedupe=dict(
+                type="str", default="url", choices=["url", "tvg_id", "none"]
+            ),
+            attributes=dict(
+                type="list",
+                elements="str",
+                default=[
+                    "tvg-id",
+                    "tvg-name",
+                    "tvg-logo",
+                    "tvg-chno",
+                    "group-title",
+                ],
+            ),
+            force=dict(type="bool", default=False),
+            timeout=dict(type="int", default=60),
+            validate_certs=dict(type="bool", default=True),
+        ),
+        supports_check_mode=True,
+    )
+    params = module.params
+    for option in ("include_regex", "exclude_regex"):
+        if params[option]:
+            try:
+                re.compile(params[option])
+            except re.error as e:
+                module.fail_json(msg="Invalid %s: %s" % (option, e))
+
+    dest = params["dest"]
+    directory = os.path.dirname(dest) or "."
+    state_path = os.path.join(
+        directory, ".%s.state.json" % os.path.basename(dest)
+    )
+    if not module.check_mode and not os.path.isdir(directory):
+        os.makedirs(directory, 0o755)
+
+    state = load_state(state_path)
+    settings = settings_digest(params)
+    current = os.path.exists(dest) and state.get("settings") == settings
+    validators = {}
+    if current and not params["force"]:
+        validators = state
+
+    result = {
+        "changed": False,
+        "dest": dest,
+        "sha256": state.get("sha256"),
+        "source_sha256": state.get("source_sha256"),
+        "stats": state.get("stats", {}),
+    }
+    timings = {
+        "download_ms": 0.0,
+        "parse_ms": 0.0,
+        "channels_per_s": 0.0,
+        "mib_per_s": 0.0,
+    }
+    result["timings"] = timings
+
+    work_dir = tempfile.mkdtemp(
+        dir=directory if os.path.isdir(directory) else None,
+        prefix=".m3u-",
+    )
+    try:
+        raw_path = os.path.join(work_dir, "source.m3u")
+        started = time.monotonic()
+        try:
+            with open(raw_path, "wb") as raw:
+                fetched = download(
+                    params["src"],
+                    raw,
+                    validators,
+                    params["timeout"],
+                    params["validate_certs"],
+                )
+        except PlaylistError as e:
+            module.fail_json(msg=str(e), **result)
+        timings["download_ms"] = (time.monotonic() - started) * 1000
+
+        if fetched is None:
+            result["status"] = "not_modified"
+            module.exit_json(**result)
+        new_state = dict(
+            state,
+            etag=fetched["etag"],
+            last_modified=fetched["last_modified"],
+            checked=int(time.time()),
+        )
+        if (
+            current
+            and not params["force"]
+            and fetched["sha256"] == state.get("source_sha256")
+        ):
+            result["status"] = "unchanged"
+            if not module.check_mode and new_state != state:
+                write_atomic(state_path, json.dumps(new_state), 0o600)
+            module.exit_json(**result)
+
+        out_path = os.path.join(work_dir, "filtered.m3u")
+        started = time.monotonic()
+        with open(out_path, "w", encoding="utf-8") as out:
+            stats = filter_playlist(raw_path, out, params)
+        elapsed = time.monotonic() - started
+        timings["parse_ms"] = elapsed * 1000
+        if elapsed > 0:
+            timings["channels_per_s"] = stats["channels"] / elapsed
+            timings["mib_per_s"] = fetched["bytes"] / 1048576.0 / elapsed
+        stats["bytes_in"] = fetched["bytes"]
+        stats["bytes_out"] = os.path.getsize(out_path)
+        sha256 = file_digest(out_path)
+
+        changed = sha256 != file_digest(dest)
+        result.update(
+            changed=changed,
+            status="regenerated" if changed else "unchanged",
+            sha256=sha256,
+            source_sha256=fetched["sha256"],
+            stats=stats,
+        )
+        if not module.check_mode:
+            if changed:
+                os.chmod(out_path, 0o644)
+                shutil.move(out_path, dest)
+            if changed or not os.path.exists(dest + ".sha256"):
+                write_atomic(
+                    dest + ".sha256",
+                    "%s  %s\n" % (sha256, os.path.basename(dest)),
+                )
+            new_state.update(
+                settings=settings,
+                source_sha256=fetched["sha256"],
+                sha256=sha256,
+                stats=stats,
+            )
+            write_atomic(
+                state_path, json.dumps(new_state, sort_keys=True), 0o600
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
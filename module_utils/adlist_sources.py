@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Fetch, normalize and hash Pi-hole adlists.
+
+Shared by the pihole_config modules that need to know what an adlist
+actually contains rather than what its URL is. Only the standard library
+is used so the helpers run on any managed node.
+
+Normalized domain sets are stored one domain per line, lower-cased and
+sorted, which lets several lists be merged (and their union hashed) in a
+single streaming pass without holding every domain in memory.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import heapq
+import json
+import os
+import re
+import tempfile
+import time
+
+USER_AGENT = "homelab-ansible-adlist/1.0"
+
+# Addresses used as the sink in hosts-format lists.
+SINK_ADDRESSES = frozenset(
+    ["0.0.0.0", "127.0.0.1", "::", "::0", "::1", "0", "255.255.255.255"]
+)
+
+# Names that appear in the preamble of hosts files and are never blocked.
+IGNORED_NAMES = frozenset(
+    [
+        "localhost",
+        "localhost.localdomain",
+        "local",
+        "broadcasthost",
+        "ip6-localhost",
+        "ip6-loopback",
+        "ip6-localnet",
+        "ip6-mcastprefix",
+        "ip6-allnodes",
+        "ip6-allrouters",
+        "ip6-allhosts",
+        "0.0.0.0",
+    ]
+)
+
+DOMAIN_RE = re.compile(
+    r"^(?=.{1,253}$)[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?"
+    r"(?:\.[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?)+$"
+)
+IPV4_RE = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}$")
+ADBLOCK_RE = re.compile(r"^\|\|([^\^/$]+)\^$")
+
+
+class AdlistFetchError(Exception):
+    pass
+
+
+def normalize_domain(name):
+    """Return the canonical form of name, or None if it is not a domain."""
+    name = name.strip().rstrip(".").lower()
+    if not name or name in IGNORED_NAMES or IPV4_RE.match(name):
+        return None
+    if not DOMAIN_RE.match(name):
+        try:
+            name = name.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+        if not DOMAIN_RE.match(name):
+            return None
+    return name
+
+
+def parse_domains(data):
+    """Parse adlist content into a set of normalized domains.
+
+    Understands hosts files (``0.0.0.0 ads.example.com``), plain domain
+    lists and ABP-style ``||ads.example.com^`` rules. Comments, blank
+    lines and anything else Pi-hole would not import are dropped, so
+    edits to a list's header or comments do not change the result.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", "replace")
+    domains = set()
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#![":
+            continue
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = ADBLOCK_RE.match(line)
+        if match:
+            candidates = [match.group(1)]
+        else:
+            fields = line.split()
+            if fields[0] in SINK_ADDRESSES or IPV4_RE.match(fields[0]):
+                candidates = fields[1:]
+            elif len(fields) == 1:
+                candidates = fields
+            else:
+                continue
+        for candidate in candidates:
+            domain = normalize_domain(candidate)
+            if domain:
+                domains.add(domain)
+    return domains
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def fetch_list(
+    url, etag=None, last_modified=None, timeout=30, validate_certs=True
+):
+    """Fetch url, sending conditional headers when validators are known.
+
+    Returns a dict with ``status`` (``modified`` or ``not_modified``),
+    ``data`` (bytes, None when not modified), ``etag``, ``last_modified``,
+    ``sha256``, ``bytes`` and ``download_ms``. ``file://`` URLs are read
+    directly so lists can be served from local copies or fixtures.
+    Raises AdlistFetchError on any transport or HTTP error.
+    """
+    # urllib.request and ssl cost more to import than the rest of this
+    # file; runs with nothing to fetch never need them.
+    from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
+    from ansible.module_utils.six.moves.urllib.request import Request, urlopen
+
+    started = time.time()
+    headers = {"User-Agent": USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    context = None
+    if url.startswith("https://") and not validate_certs:
+        import ssl
+
+        context = ssl._create_unverified_context()
+
+    try:
+        response = urlopen(
+            Request(url, headers=headers), timeout=timeout, context=context
+        )
+        data = response.read()
+        info = response.info()
+        status = "modified"
+    except HTTPError as e:
+        if e.code != 304:
+            raise AdlistFetchError("HTTP %d fetching %s" % (e.code, url))
+        data = None
+        info = e.headers
+        status = "not_modified"
+    except (URLError, OSError, ValueError) as e:
+        raise AdlistFetchError("Failed to fetch %s: %s" % (url, e))
+
+    return {
+        "status": status,
+        "data": data,
+        "etag": (info.get("ETag") if info else None) or etag,
+        "last_modified": (info.get("Last-Modified") if info else None)
+        or last_modified,
+        "sha256": content_hash(data) if data is not None else None,
+        "bytes": len(data) if data is not None else 0,
+        "download_ms": int((time.time() - started) * 1000),
+    }
+
+
+def fetch_many(requests, workers=8, timeout=30, validate_certs=True):
+    """Fetch several lists concurrently.
+
+    ``requests`` maps url to a dict with optional ``etag`` and
+    ``last_modified`` validators. Returns a dict mapping each url to the
+    fetch_list() result or the AdlistFetchError raised for it.
+    """
+    if not requests:
+        return {}
+
+    def fetch(item):
+        url, validators = item
+        try:
+            return url, fetch_list(
+                url,
+                etag=validators.get("etag"),
+                last_modified=validators.get("last_modified"),
+                timeout=timeout,
+                validate_certs=validate_certs,
+            )
+        except AdlistFetchError as e:
+            return url, e
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = max(1, min(workers, len(requests)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(fetch, requests.items()))
+
+
+def refresh_list(url, fetched, known, domain_path):
+    """Apply one fetch_many() result to a list's stored state.
+
+    ``known`` is the list's record from the previous run and
+    ``domain_path`` its normalized domain file. Returns (report, record,
+    domains): ``report`` describes the fetch (``status`` is
+    ``not_modified``, ``unchanged``, ``modified``, ``stale`` or
+    ``error``), ``record`` is the state to store for next time and
+    ``domains`` is a freshly parsed set when the content changed, None
+    when the stored domain file is still current.
+    """
+    have_file = os.path.exists(domain_path)
+    report = {"url": url, "bytes": 0, "download_ms": 0, "parse_ms": 0}
+    record = dict(known)
+
+    if isinstance(fetched, Exception):
+        report["status"] = "stale" if have_file else "error"
+        report["error"] = str(fetched)
+        report["domains"] = known.get("domains", 0) if have_file else 0
+        return report, record, None
+
+    report["bytes"] = fetched["bytes"]
+    report["download_ms"] = fetched["download_ms"]
+    record["etag"] = fetched["etag"]
+    record["last_modified"] = fetched["last_modified"]
+    record["checked"] = int(time.time())
+
+    if have_file and fetched["status"] == "not_modified":
+        report["status"] = "not_modified"
+        report["domains"] = known.get("domains", 0)
+        return report, record, None
+    if have_file and fetched["sha256"] == known.get("sha256"):
+        report["status"] = "unchanged"
+        report["domains"] = known.get("domains", 0)
+        return report, record, None
+    if fetched["data"] is None:
+        # 304 without a local copy (state lost): nothing to parse.
+        report["status"] = "error"
+        report["error"] = "%s not modified but no cached copy" % url
+        report["domains"] = 0
+        return report, record, None
+
+    started = time.time()
+    domains = parse_domains(fetched["data"])
+    report["parse_ms"] = int((time.time() - started) * 1000)
+    report["status"] = "modified"
+    report["domains"] = len(domains)
+    record["sha256"] = fetched["sha256"]
+    record["domains"] = len(domains)
+    return report, record, domains
+
+
+def conditional_requests(urls, known_lists, domain_path):
+    """Build fetch_many() requests, sending validators only for lists
+    whose normalized domain file still exists."""
+    requests = {}
+    for url in urls:
+        known = known_lists.get(url, {})
+        if os.path.exists(domain_path(url)):
+            requests[url] = {
+                "etag": known.get("etag"),
+                "last_modified": known.get("last_modified"),
+            }
+        else:
+            requests[url] = {}
+    return requests
+
+
+def list_key(url):
+    """Stable file name stem for a list URL."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def write_atomic(path, data, mode=0o644):
+    """Write bytes to path via a temporary file and rename."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(tmp_path, mode)
+        os.rename(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_domain_file(path, domains):
+    """Store a domain set as a sorted, newline separated file."""
+    body = "\n".join(sorted(domains))
+    if body:
+        body += "\n"
+    write_atomic(path, body.encode("utf-8"))
+
+
+def iter_domain_file(path):
+    """Yield the domains of a file written by write_domain_file."""
+    with open(path) as handle:
+        for line in handle:
+            line = line.rstrip("\n")
+            if line:
+                yield line
+
+
+def merge_domains(sources):
+    """Yield the sorted, de-duplicated union of sorted domain iterables."""
+    previous = None
+    for domain in heapq.merge(*sources):
+        if domain != previous:
+            yield domain
+            previous = domain
+
+
+def merge_with_owners(sources):
+    """Yield (domain, [source indexes]) for the union of sorted iterables.
+
+    Indexes are in ascending order, so the first one is the earliest
+    source that contains the domain.
+    """
+
+    def tag(source, index):
+        for domain in source:
+            yield domain, index
+
+    tagged = [tag(source, index) for index, source in enumerate(sources)]
+    current = None
+    owners = []
+    for domain, index in heapq.merge(*tagged):
+        if domain != current:
+            if current is not None:
+                yield current, owners
+            current = domain
+            owners = []
+        if not owners or owners[-1] != index:
+            owners.append(index)
+    if current is not None:
+        yield current, owners
+
+
+def domain_set_digest(sources):
+    """Hash the union of sorted domain iterables.
+
+    Returns (sha256 hex digest, number of unique domains). The digest
+    depends only on the set of domains, not on which list provided them
+    or in what order the lists are given.
+    """
+    digest = hashlib.sha256()
+    count = 0
+    for domain in merge_domains(sources):
+        digest.update(domain.encode("utf-8"))
+        digest.update(b"\n")
+        count += 1
+    return digest.hexdigest(), count
+
+
+def load_state(path):
+    """Read a JSON state file, returning an empty dict if it is missing."""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_state(path, state):
+    write_atomic(
+        path,
+        json.dumps(state, indent=2, sort_keys=True).encode("utf-8"),
+        mode=0o600,
+    )
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Desired-vs-current diffs for the generic API modules.
+
+diff_config() compares a desired (partial) JSON tree with what an API
+returned; pihole_api uses it to PATCH only the keys that differ.
+plan_write() is the check-mode side of pihole_api and jellyfin_api: given
+the response of a GET on the endpoint a write would go to, it predicts
+whether the write changes anything and returns the diff, so check mode
+(and plan.yml) reports real drift instead of ``changed=False``.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+# filter_plugins/homelab_diff.py has a copy as _as_type() for deep_diff,
+# since filter plugins cannot import module_utils; keep the two in sync.
+def match_type(current, value):
+    """Convert templated strings to the type the API reports for the key,
+    so "10000" or "true" from Jinja do not count as a difference."""
+    if not isinstance(value, str):
+        return value
+    if isinstance(current, bool):
+        if value.lower() in ("true", "yes", "on", "1"):
+            return True
+        if value.lower() in ("false", "no", "off", "0"):
+            return False
+    elif isinstance(current, int) and value.lstrip("-").isdigit():
+        return int(value)
+    elif isinstance(current, float):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return value
+
+
+def diff_config(current, desired, prefix=""):
+    """Compare a desired config tree with the current one.
+
+    Returns (patch, before, changed_keys): ``patch`` holds only the
+    desired leaves that differ (nested as in the PATCH body), ``before``
+    the current values of those leaves, and ``changed_keys`` their dotted
+    paths. Lists are compared as whole values.
+    """
+    patch = {}
+    before = {}
+    changed = []
+    for key, value in desired.items():
+        path = prefix + key
+        present = isinstance(current, dict) and key in current
+        old = current.get(key) if present else None
+        value = match_type(old, value)
+        if isinstance(value, dict) and isinstance(old, dict):
+            sub_patch, sub_before, sub_changed = diff_config(
+                old, value, path + "."
+            )
+            if sub_patch:
+                patch[key] = sub_patch
+                before[key] = sub_before
+                changed.extend(sub_changed)
+        elif not present or old != value:
+            patch[key] = value
+            before[key] = old
+            changed.append(path)
+    return patch, before, changed
+
+
+def plan_write(method, path, status, current, body):
+    """Predict a write from a GET on the same path.
+
+    ``status`` and ``current`` (parsed JSON, or None) are the GET's
+    response. A DELETE changes something when the resource exists; a
+    write with a body changes something when a leaf of the body differs
+    from the current state. Writes without a body (actions) and writes
+    whose current state cannot be compared (a list, an endpoint without
+    GET) are assumed to change something. Returns changed, msg, diff and changed_keys.
+    """
+    result = {
+        "changed": True,
+        "changed_keys": [],
+        "diff": {"before": {}, "after": {}},
+    }
+    missing = status in (404, 410)
+    if method == "DELETE":
+        if missing:
+            result["changed"] = False
+            result["msg"] = "%s is already absent" % path
+        else:
+            result["msg"] = "Would DELETE %s" % path
+            if isinstance(current, dict):
+                result["diff"]["before"] = current
+        return result
+
+    if not body:
+        # An action such as POST /Library/Refresh has no state to compare.
+        result["msg"] = "Would %s %s" % (method, path)
+        return result
+
+    result["diff"]["after"] = body
+    if missing:
+        result["msg"] = "Would %s %s (nothing there yet)" % (method, path)
+        return result
+
+    if status >= 400 or not isinstance(current, dict):
+        result["msg"] = "Would %s %s (current state not comparable)" % (
+            method,
+            path,
+        )
+        return result
+
+    patch, before, changed_keys = diff_config(current, body)
+    result["changed"] = bool(patch)
+    result["changed_keys"] = changed_keys
+    result["diff"] = {"before": before, "after": patch}
+    if patch:
+        result["msg"] = "Would %s %s: %s" % (
+            method,
+            path,
+            ", ".join(changed_keys),
+        )
+    else:
+        result["msg"] = "%s is already up to date" % path
+    return result
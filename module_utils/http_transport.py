@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Keep-alive HTTP transport shared by the API clients and modules.
+
+``http.client`` (which pulls in the email parser) and ``ssl`` are imported
+when the first connection is opened, not when a module imports this file,
+so module runs that never reach the network (check mode, argument errors,
+nothing to do) do not pay for them. pihole_client and jellyfin_client
+build their own request loops on connect() and the error helpers;
+Connection is the one-request-at-a-time replacement for ``fetch_url``
+used by the generic pihole_api and jellyfin_api modules.
+
+Like the clients, this file only uses the standard library.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from urllib.parse import urlsplit
+
+
+class TransportError(Exception):
+    pass
+
+
+def httplib():
+    import http.client
+
+    return http.client
+
+
+def connect(scheme, host, port, timeout, validate_certs):
+    """Return an unopened HTTP(S) connection; it connects on first use."""
+    client = httplib()
+    if scheme == "https":
+        import ssl
+
+        context = ssl.create_default_context()
+        if not validate_certs:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return client.HTTPSConnection(
+            host, port, timeout=timeout, context=context
+        )
+    return client.HTTPConnection(host, port, timeout=timeout)
+
+
+def retryable_errors():
+    """Errors that mean a kept-alive connection was closed by the server."""
+    client = httplib()
+    return (
+        client.BadStatusLine,
+        client.CannotSendRequest,
+        client.ResponseNotReady,
+        ConnectionError,
+        BrokenPipeError,
+    )
+
+
+def transport_errors():
+    """Any other error from sending a request or reading a response."""
+    return (OSError, httplib().HTTPException)
+
+
+class Connection:
+    """Requests to one server over a single keep-alive connection.
+
+    ``base_url`` may carry a path prefix (Pi-hole's ``/api``); request
+    paths are relative to it.
+    """
+
+    def __init__(self, base_url, timeout=30, validate_certs=True):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https"):
+            raise TransportError("Unsupported base_url %s" % base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path
+        self.timeout = timeout
+        self.validate_certs = validate_certs
+        self.requests = 0
+        self._conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request and return (status, headers, raw body).
+
+        ``body`` is sent as is (str is UTF-8 encoded). Response header
+        names are lower case, as in fetch_url's info dict. Reconnects once
+        if the kept-alive connection turned out to be closed; any other
+        failure raises TransportError.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        for attempt in (1, 2):
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = connect(
+                    self.scheme,
+                    self.host,
+                    self.port,
+                    self.timeout,
+                    self.validate_certs,
+                )
+            try:
+                self._conn.request(
+                    method, self.prefix + path, body, headers or {}
+                )
+                response = self._conn.getresponse()
+                raw = response.read()
+            except retryable_errors() as e:
+                self.close()
+                if reused and attempt == 1:
+                    continue
+                raise TransportError("%s %s failed: %s" % (method, path, e))
+            except transport_errors() as e:
+                self.close()
+                raise TransportError("%s %s failed: %s" % (method, path, e))
+            self.requests += 1
+            if response.getheader("Connection", "").lower() == "close":
+                self.close()
+            received = dict((k.lower(), v) for k, v in response.getheaders())
+            return response.status, received, raw
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
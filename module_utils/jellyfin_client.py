@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Minimal Jellyfin API client over a single keep-alive connection.
+
+Authentication follows roles/jellyfin/library/jellyfin_api.py: either an
+API token is used directly, or ``POST /Users/AuthenticateByName`` is
+called once to obtain an access token. The token is sent as both
+``X-MediaBrowser-Token`` and in the ``X-Emby-Authorization`` header.
+
+As with pihole_client, every request reuses one HTTP/1.1 connection from
+http_transport (``http.client`` and ``ssl`` are imported on the first
+request) and only the standard library is used. ClientPool runs
+independent requests on a few extra connections that share the same
+token.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import threading
+import time
+
+from urllib.parse import quote, urlencode, urlsplit
+
+from ansible.module_utils.http_transport import (
+    connect,
+    retryable_errors,
+    transport_errors,
+)
+
+CHUNK_SIZE = 1024 * 1024
+
+CLIENT_HEADER = (
+    'MediaBrowser Client="Ansible", Device="Server", '
+    'DeviceId="ansible-module", Version="1.0.0"'
+)
+
+
+class JellyfinError(Exception):
+    def __init__(self, msg, status=None, body=None):
+        super(JellyfinError, self).__init__(msg)
+        self.status = status
+        self.body = body
+
+
+def quote_path(value):
+    """Quote one path element (a user ID, backup name, ...)."""
+    return quote(str(value), safe="")
+
+
+def decode(raw):
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw.decode("utf-8", "replace")
+
+
+class JellyfinClient:
+    """Token-authenticated client for the Jellyfin REST API.
+
+    ``base_url`` is the server root (e.g. ``http://localhost:8096``).
+    Either ``api_token`` or ``username``/``password`` is required; an
+    access token obtained with a password is revoked on ``close()``.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        api_token=None,
+        username=None,
+        password=None,
+        timeout=30,
+        validate_certs=True,
+    ):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https"):
+            raise JellyfinError("Unsupported base_url %s" % base_url)
+        self.base_url = base_url.rstrip("/")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path
+        self.token = api_token or None
+        self.username = username
+        self.password = password
+        self.owns_token = False
+        self.timeout = timeout
+        self.validate_certs = validate_certs
+        self.requests = 0
+        self.timings = {"auth_ms": 0.0, "http_ms": 0.0}
+        self._conn = None
+
+    # -- transport ---------------------------------------------------------
+
+    def _connect(self):
+        return connect(
+            self.scheme,
+            self.host,
+            self.port,
+            self.timeout,
+            self.validate_certs,
+        )
+
+    def _headers(self):
+        headers = {"Accept": "application/json"}
+        auth = CLIENT_HEADER
+        if self.token:
+            headers["X-MediaBrowser-Token"] = self.token
+            auth += ', Token="%s"' % self.token
+        headers["X-Emby-Authorization"] = auth
+        return headers
+
+    def _send(self, method, path, body=None, headers=None):
+        """Send one request and return the response with its body unread,
+        reconnecting once if the kept-alive connection was closed."""
+        payload = None
+        send_headers = self._headers()
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            send_headers["Content-Type"] = "application/json"
+        send_headers.update(headers or {})
+
+        for attempt in (1, 2):
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                self._conn.request(
+                    method, self.prefix + path, payload, send_headers
+                )
+                response = self._conn.getresponse()
+            except retryable_errors() as e:
+                self.disconnect()
+                if reused and attempt == 1:
+                    continue
+                raise JellyfinError("%s %s failed: %s" % (method, path, e))
+            except transport_errors() as e:
+                self.disconnect()
+                raise JellyfinError("%s %s failed: %s" % (method, path, e))
+            self.requests += 1
+            return response
+
+    def _finish(self, response):
+        """Read the rest of a response so the connection can be reused."""
+        try:
+            raw = response.read()
+        except transport_errors() as e:
+            self.disconnect()
+            raise JellyfinError("Failed to read response: %s" % e)
+        if response.getheader("Connection", "").lower() == "close":
+            self.disconnect()
+        return raw
+
+    def disconnect(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -- session -----------------------------------------------------------
+
+    def authenticate(self):
+        """Exchange username/password for an access token."""
+        if not (self.username and self.password is not None):
+            raise JellyfinError("Either api_token or username is required")
+        started = time.monotonic()
+        response = self._send(
+            "POST",
+            "/Users/AuthenticateByName",
+            {"Username": self.username, "Pw": self.password},
+        )
+        raw = self._finish(response)
+        self.timings["auth_ms"] += (time.monotonic() - started) * 1000
+        if response.status != 200:
+            raise JellyfinError(
+                "Authentication failed", response.status, decode(raw)
+            )
+        result = decode(raw)
+        token = result.get("AccessToken") if isinstance(result, dict) else None
+        if not token:
+            raise JellyfinError(
+                "No access token returned from authentication",
+                response.status,
+                result,
+            )
+        self.token = token
+        self.owns_token = True
+        return token
+
+    def close(self):
+        """Revoke a token this client created and drop the connection."""
+        if self.owns_token and self.token:
+            try:
+                self._finish(self._send("POST", "/Sessions/Logout"))
+            except JellyfinError:
+                pass
+            self.owns_token = False
+        self.disconnect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- requests ----------------------------------------------------------
+
+    def _path(self, path, params):
+        if params:
+            path += "?" + urlencode(
+                dict(
+                    (k, str(v).lower() if isinstance(v, bool) else v)
+                    for k, v in params.items()
+                    if v is not None
+                )
+            )
+        return path
+
+    def open(self, method, path, body=None, params=None, headers=None):
+        """Send an authenticated request and return the unread response.
+
+        The caller must read the body completely, or call disconnect(),
+        before the next request. Raises JellyfinError for HTTP errors.
+        """
+        if not self.token:
+            self.authenticate()
+        path = self._path(path, params)
+        started = time.monotonic()
+        response = self._send(method, path, body, headers)
+        if response.status == 401 and self.owns_token:
+            self._finish(response)
+            self.authenticate()
+            response = self._send(method, path, body, headers)
+        self.timings["http_ms"] += (time.monotonic() - started) * 1000
+        if response.status >= 400:
+            result = decode(self._finish(response))
+            raise JellyfinError(
+                "Jellyfin API %s %s failed with status %d: %s"
+                % (method, path, response.status, result),
+                response.status,
+                result,
+            )
+        return response
+
+    def request(self, method, path, body=None, params=None):
+        """Send an authenticated request and return the decoded body."""
+        response = self.open(method, path, body, params)
+        started = time.monotonic()
+        raw = self._finish(response)
+        self.timings["http_ms"] += (time.monotonic() - started) * 1000
+        return decode(raw)
+
+    def get(self, path, params=None):
+        return self.request("GET", path, params=params)
+
+    def post(self, path, body=None, params=None):
+        return self.request("POST", path, body, params)
+
+    def delete(self, path, params=None):
+        return self.request("DELETE", path, params=params)
+
+
+class ClientPool:
+    """Run calls in parallel over at most ``size`` connections.
+
+    Extra connections are clones of ``client`` that reuse its token (the
+    client authenticates first if needed), so the pool never logs in
+    more than once. ``close()`` folds the clones' request counts and
+    timings back into ``client``; the client itself stays open.
+    """
+
+    def __init__(self, client, size):
+        self.client = client
+        self.size = max(1, size)
+        self._idle = [client]
+        self._clones = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            clone = JellyfinClient(
+                self.client.base_url,
+                api_token=self.client.token,
+                timeout=self.client.timeout,
+                validate_certs=self.client.validate_certs,
+            )
+            self._clones.append(clone)
+            return clone
+
+    def _release(self, client):
+        with self._lock:
+            self._idle.append(client)
+
+    def map(self, func, items):
+        """Return [func(client, item) for item in items], run in parallel.
+
+        An exception raised by func is re-raised here after all calls
+        finished.
+        """
+        items = list(items)
+        if not items:
+            return []
+        if not self.client.token:
+            self.client.authenticate()
+
+        def call(item):
+            client = self._acquire()
+            try:
+                return func(client, item)
+            finally:
+                self._release(client)
+
+        if self.size == 1 or len(items) == 1:
+            return [call(item) for item in items]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(call, item) for item in items]
+            return [future.result() for future in futures]
+
+    def close(self):
+        for clone in self._clones:
+            clone.disconnect()
+            self.client.requests += clone.requests
+            for key, value in clone.timings.items():
+                self.client.timings[key] = (
+                    self.client.timings.get(key, 0.0) + value
+                )
+        self._clones = []
+        self._idle = [self.client]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Minimal Pi-hole v6 API client over a single keep-alive connection.
+
+Authentication follows roles/pihole_api/library/pihole_api.py: the
+session ID is read from the JSON body of ``POST /auth`` with a fallback
+to the ``sid`` cookie, and is sent as both ``X-FTL-SID`` and ``Cookie``.
+
+Unlike ``fetch_url`` every request reuses one HTTP/1.1 connection, so a
+module issuing several calls pays for one TCP (and TLS) handshake. The
+connection comes from http_transport, which imports ``http.client`` and
+``ssl`` only when the first request is sent. Both files only use the
+standard library and do not need Ansible, so they can also be shipped
+next to standalone tools.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import os
+import re
+import time
+
+from urllib.parse import quote, urlencode, urlsplit
+
+try:
+    from ansible.module_utils.http_transport import (
+        connect,
+        retryable_errors,
+        transport_errors,
+    )
+except ImportError:
+    # Standalone tools ship http_transport.py in the same directory.
+    from http_transport import connect, retryable_errors, transport_errors
+
+SID_COOKIE_RE = re.compile(r"(?:^|;\s*)sid=([^;\s]+)")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class PiHoleError(Exception):
+    def __init__(self, msg, status=None, body=None):
+        super(PiHoleError, self).__init__(msg)
+        self.status = status
+        self.body = body
+
+
+def quote_path(value):
+    """Quote one path element (a domain, regex or config value)."""
+    return quote(str(value), safe="")
+
+
+class MultipartFile:
+    """Re-iterable multipart/form-data body with one file field.
+
+    The file is read in chunks while the request is sent, and iterating
+    again starts from the beginning, so a request can be retried.
+    """
+
+    def __init__(self, field, filename, fileobj, content_type):
+        import uuid
+
+        self.boundary = uuid.uuid4().hex
+        self.fileobj = fileobj
+        self.head = (
+            "--%s\r\n"
+            'Content-Disposition: form-data; name="%s"; filename="%s"\r\n'
+            "Content-Type: %s\r\n\r\n"
+            % (self.boundary, field, filename, content_type)
+        ).encode("utf-8")
+        self.tail = ("\r\n--%s--\r\n" % self.boundary).encode("utf-8")
+        fileobj.seek(0, os.SEEK_END)
+        self.length = len(self.head) + fileobj.tell() + len(self.tail)
+
+    @property
+    def content_type(self):
+        return "multipart/form-data; boundary=%s" % self.boundary
+
+    def __iter__(self):
+        yield self.head
+        self.fileobj.seek(0)
+        while True:
+            chunk = self.fileobj.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        yield self.tail
+
+
+class PiHoleClient:
+    """Session-authenticated client for the Pi-hole v6 REST API.
+
+    ``base_url`` includes the ``/api`` prefix, as for the pihole_api
+    module. Either ``session_id`` or ``password`` is required; with a
+    password the client logs in lazily and, on ``close()``, logs out of
+    the session it created so it does not occupy one of FTL's slots.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        password=None,
+        session_id=None,
+        timeout=30,
+        validate_certs=False,
+    ):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https"):
+            raise PiHoleError("Unsupported base_url %s" % base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path
+        self.password = password
+        self.session_id = session_id
+        self.owns_session = False
+        self.timeout = timeout
+        self.validate_certs = validate_certs
+        self.requests = 0
+        self.timings = {"auth_ms": 0.0, "http_ms": 0.0}
+        self._conn = None
+
+    # -- transport ---------------------------------------------------------
+
+    def _connect(self):
+        return connect(
+            self.scheme,
+            self.host,
+            self.port,
+            self.timeout,
+            self.validate_certs,
+        )
+
+    def _send(self, method, path, body=None, headers=None, stream_to=None):
+        """Send one request, reconnecting once if the kept-alive
+        connection turned out to be closed. Returns (status, headers,
+        raw body).
+
+        ``body`` is JSON encoded unless it is a MultipartFile. With
+        ``stream_to`` a successful response body is copied to that file
+        object in chunks and the returned raw body is empty.
+        """
+        payload = None
+        send_headers = {"Accept": "application/json"}
+        if isinstance(body, MultipartFile):
+            payload = body
+            send_headers["Content-Type"] = body.content_type
+            send_headers["Content-Length"] = str(body.length)
+        elif body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            send_headers["Content-Type"] = "application/json"
+        send_headers.update(headers or {})
+
+        for attempt in (1, 2):
+            if stream_to is not None and attempt == 2:
+                stream_to.seek(0)
+                stream_to.truncate()
+            reused = self._conn is not None
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                self._conn.request(
+                    method, self.prefix + path, payload, send_headers
+                )
+                response = self._conn.getresponse()
+                if stream_to is not None and response.status < 300:
+                    raw = b""
+                    while True:
+                        chunk = response.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        stream_to.write(chunk)
+                else:
+                    raw = response.read()
+            except retryable_errors() as e:
+                self._conn.close()
+                self._conn = None
+                if reused and attempt == 1:
+                    continue
+                raise PiHoleError("%s %s failed: %s" % (method, path, e))
+            except transport_errors() as e:
+                self._conn.close()
+                self._conn = None
+                raise PiHoleError("%s %s failed: %s" % (method, path, e))
+            self.requests += 1
+            if response.getheader("Connection", "").lower() == "close":
+                self._conn.close()
+                self._conn = None
+            return response.status, response, raw
+
+    def _auth_headers(self):
+        return {
+            "X-FTL-SID": self.session_id,
+            "Cookie": "sid=%s" % self.session_id,
+        }
+
+    # -- session -----------------------------------------------------------
+
+    def authenticate(self):
+        """Create a session with the password and return its ID."""
+        if not self.password:
+            raise PiHoleError("Either session_id or password is required")
+        started = time.monotonic()
+        status, response, raw = self._send(
+            "POST", "/auth", {"password": self.password}
+        )
+        self.timings["auth_ms"] += (time.monotonic() - started) * 1000
+        if status not in (200, 201):
+            raise PiHoleError(
+                "Pi-hole authentication failed", status, decode(raw)
+            )
+
+        result = decode(raw)
+        session = result.get("session", {}) if isinstance(result, dict) else {}
+        sid = session.get("sid") if isinstance(session, dict) else None
+        if not sid:
+            match = SID_COOKIE_RE.search(response.getheader("Set-Cookie", ""))
+            sid = match.group(1) if match else None
+        if not sid:
+            raise PiHoleError(
+                "No session ID returned from authentication", status, result
+            )
+        self.session_id = sid
+        self.owns_session = True
+        return sid
+
+    def close(self):
+        """Log out of a session this client created and drop the
+        connection."""
+        if self.owns_session and self.session_id:
+            try:
+                self._send("DELETE", "/auth", headers=self._auth_headers())
+            except PiHoleError:
+                pass
+            self.owns_session = False
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- requests ----------------------------------------------------------
+
+    def request(self, method, path, body=None, params=None, stream_to=None):
+        """Send an authenticated request and return the decoded body.
+
+        Raises PiHoleError for HTTP errors. An expired session is renewed
+        once when a password is available. See _send() for ``stream_to``.
+        """
+        if not self.session_id:
+            self.authenticate()
+        if params:
+            path += "?" + urlencode(
+                dict(
+                    (k, str(v).lower() if isinstance(v, bool) else v)
+                    for k, v in params.items()
+                    if v is not None
+                )
+            )
+
+        started = time.monotonic()
+        status, response, raw = self._send(
+            method, path, body, self._auth_headers(), stream_to
+        )
+        if status == 401 and self.password:
+            self.authenticate()
+            status, response, raw = self._send(
+                method, path, body, self._auth_headers(), stream_to
+            )
+        self.timings["http_ms"] += (time.monotonic() - started) * 1000
+
+        result = decode(raw)
+        if status >= 400:
+            raise PiHoleError(
+                "Pi-hole API %s %s failed with status %d: %s"
+                % (method, path, status, result),
+                status,
+                result,
+            )
+        return result
+
+    def get(self, path, params=None):
+        return self.request("GET", path, params=params)
+
+    def post(self, path, body=None):
+        return self.request("POST", path, body)
+
+    def put(self, path, body=None):
+        return self.request("PUT", path, body)
+
+    def patch(self, path, body=None):
+        return self.request("PATCH", path, body)
+
+    def delete(self, path):
+        return self.request("DELETE", path)
+
+    def download(self, path, fileobj):
+        """Stream a binary GET response (e.g. /teleporter) to fileobj."""
+        self.request("GET", path, stream_to=fileobj)
+
+    def upload(self, path, field, filename, fileobj, content_type):
+        """POST fileobj as a multipart/form-data file field, streaming it
+        from disk, and return the decoded response."""
+        return self.request(
+            "POST", path, MultipartFile(field, filename, fileobj, content_type)
+        )
+
+
+def decode(raw):
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw.decode("utf-8", "replace")
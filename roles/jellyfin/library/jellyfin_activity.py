@@ -0,0 +1,390 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: jellyfin_activity
+short_description: Append new Jellyfin activity log entries to NDJSON files
+version_added: "1.1.0"
+description:
+    - Reads GET /System/ActivityLog/Entries (newest first) in pages,
+      starting at the date of the newest entry seen by the previous run
+      (C(minDate)) and stopping at the first entry whose ID is not newer
+      than the stored watermark, so each run costs in proportion to the
+      number of new entries
+    - New entries are appended to C(<dest>/<name>.ndjson), oldest first,
+      one JSON object per line; the watermark (highest ID and its date)
+      is kept in C(<dest>/<name>.state.json) and only advanced after the
+      entries were written
+    - Several Jellyfin servers can be given in I(instances); they are
+      read concurrently, one connection each. Runs for the same instance
+      are serialized with a lock file, so overlapping schedules cannot
+      write an entry twice
+    - On the first run only entries from the last I(initial_days) days
+      are collected
+    - In check mode entries are read and counted but nothing is written
+options:
+    base_url:
+        description:
+            - Base URL of a single Jellyfin server (e.g., http://localhost:8096)
+            - Shortcut for one item in I(instances)
+        required: false
+        type: str
+    api_token:
+        description:
+            - API token for I(base_url)
+        required: false
+        type: str
+    username:
+        description:
+            - Username for I(base_url) (alternative to api_token)
+        required: false
+        type: str
+    password:
+        description:
+            - Password for I(base_url) (used with username)
+        required: false
+        type: str
+    name:
+        description:
+            - File name prefix for I(base_url); defaults to C(<host>_<port>)
+        required: false
+        type: str
+    instances:
+        description:
+            - Jellyfin servers to collect from concurrently
+            - Each item has C(base_url) and either C(api_token) or
+              C(username)/C(password), and optionally C(name)
+        required: false
+        type: list
+        elements: dict
+        default: []
+    dest:
+        description:
+            - Directory holding the NDJSON and state files (created if
+              missing)
+        required: true
+        type: path
+    initial_days:
+        description:
+            - Days of history collected when an instance has no watermark
+              yet; 0 collects everything
+        required: false
+        type: int
+        default: 7
+    page_size:
+        description:
+            - Entries requested per page
+        required: false
+        type: int
+        default: 500
+    return_entries:
+        description:
+            - Also return the new entries (they are always written to the
+              NDJSON file)
+        required: false
+        type: bool
+        default: false
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: true
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Append new activity entries
+  jellyfin_activity:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    dest: /var/log/jellyfin-activity
+  delegate_to: localhost
+
+- name: Collect from two servers at once
+  jellyfin_activity:
+    dest: /var/log/jellyfin-activity
+    instances:
+      - name: living-room
+        base_url: "http://192.168.1.10:8096"
+        api_token: "{{ vault_jellyfin_token_a }}"
+      - name: cabin
+        base_url: "http://10.8.0.5:8096"
+        username: admin
+        password: "{{ vault_jellyfin_password_b }}"
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+instances:
+    description: Per-instance result, keyed by name
+    type: dict
+    returned: always
+    sample:
+        living-room:
+            new_entries: 12
+            last_id: 48211
+            last_date: "2026-03-01T20:15:02.1234567Z"
+            pages: 1
+            file: /var/log/jellyfin-activity/living-room.ndjson
+            requests: 1
+            entries: []
+new_entries:
+    description: New entries across all instances
+    type: int
+    returned: always
+requests:
+    description: HTTP requests made across all instances
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (wall_ms)
+    type: dict
+    returned: always
+"""
+
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+
+from urllib.parse import urlsplit
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.jellyfin_client import JellyfinClient, JellyfinError
+
+ENDPOINT = "/System/ActivityLog/Entries"
+
+
+def default_name(base_url):
+    parts = urlsplit(base_url)
+    key = "%s_%s" % (parts.hostname, parts.port or parts.scheme)
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+
+
+def load_json(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(data, handle, indent=2, sort_keys=True)
+    os.rename(tmp_path, path)
+
+
+def fetch_new(client, last_id, min_date, page_size):
+    """Return (entries newer than last_id, oldest first; pages read).
+
+    Pages are newest first; reading stops at the first entry that is not
+    newer than the watermark. Entries that move to a later page while
+    reading (because new ones arrived) are de-duplicated by ID.
+    """
+    found = {}
+    pages = 0
+    start = 0
+    while True:
+        page = client.get(
+            ENDPOINT,
+            {"startIndex": start, "limit": page_size, "minDate": min_date},
+        )
+        items = (page.get("Items") or []) if isinstance(page, dict) else []
+        pages += 1
+        reached = False
+        for entry in items:
+            entry_id = int(entry.get("Id") or 0)
+            if entry_id <= last_id:
+                reached = True
+                break
+            found[entry_id] = entry
+        if reached or len(items) < page_size:
+            break
+        start += len(items)
+    return [found[key] for key in sorted(found)], pages
+
+
+def collect(instance, dest, params, check_mode):
+    """Collect one instance; runs in a worker thread."""
+    name = instance["name"]
+    ndjson_path = os.path.join(dest, name + ".ndjson")
+    state_path = os.path.join(dest, name + ".state.json")
+    result = {"file": ndjson_path, "new_entries": 0, "pages": 0}
+
+    lock = None
+    if not check_mode:
+        lock = open(os.path.join(dest, name + ".lock"), "w")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+    client = JellyfinClient(
+        instance["base_url"],
+        api_token=instance.get("api_token"),
+        username=instance.get("username"),
+        password=instance.get("password"),
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+    try:
+        state = load_json(state_path)
+        last_id = int(state.get("last_id") or 0)
+        min_date = state.get("last_date")
+        if not min_date and params["initial_days"]:
+            since = time.time() - params["initial_days"] * 86400
+            min_date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(since))
+
+        entries, result["pages"] = fetch_new(
+            client, last_id, min_date, params["page_size"]
+        )
+        result["new_entries"] = len(entries)
+        if entries:
+            state = {
+                "last_id": int(entries[-1]["Id"]),
+                "last_date": entries[-1].get("Date"),
+            }
+        result["last_id"] = state.get("last_id", last_id)
+        result["last_date"] = state.get("last_date", min_date)
+        if params["return_entries"]:
+            result["entries"] = entries
+
+        if entries and not check_mode:
+            with open(ndjson_path, "a") as handle:
+                for entry in entries:
+                    handle.write(json.dumps(entry, sort_keys=True) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            save_json(state_path, state)
+    except JellyfinError as e:
+        result["failed"] = True
+        result["msg"] = str(e)
+        result["status_code"] = e.status
+    finally:
+        client.close()
+        result["requests"] = client.requests
+        if lock is not None:
+            lock.close()
+    return result
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=False),
+            api_token=dict(type="str", required=False, no_log=True),
+            username=dict(type="str", required=False),
+            password=dict(type="str", required=False, no_log=True),
+            name=dict(type="str", required=False),
+            instances=dict(type="list", elements="dict", default=[]),
+            dest=dict(type="path", required=True),
+            initial_days=dict(type="int", default=7),
+            page_size=dict(type="int", default=500),
+            return_entries=dict(type="bool", default=False),
+            validate_certs=dict(type="bool", default=True),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["base_url", "instances"]],
+        required_together=[["username", "password"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+
+    instances = [dict(item) for item in params["instances"]]
+    if params["base_url"]:
+        instances.insert(
+            0,
+            dict(
+                (key, params[key])
+                for key in (
+                    "base_url",
+                    "api_token",
+                    "username",
+                    "password",
+                    "name",
+                )
+            ),
+        )
+    names = set()
+    for instance in instances:
+        if not instance.get("base_url"):
+            module.fail_json(msg="Each instance needs a base_url")
+        if not (instance.get("api_token") or instance.get("username")):
+            module.fail_json(
+                msg="Instance %s needs api_token or username/password"
+                % instance["base_url"]
+            )
+        instance["name"] = instance.get("name") or default_name(
+            instance["base_url"]
+        )
+        if instance["name"] in names:
+            module.fail_json(
+                msg="Duplicate instance name %s" % instance["name"]
+            )
+        names.add(instance["name"])
+
+    dest = params["dest"]
+    if not module.check_mode and not os.path.isdir(dest):
+        os.makedirs(dest, 0o750)
+
+    started = time.monotonic()
+    if len(instances) == 1:
+        instance = instances[0]
+        results = {
+            instance["name"]: collect(
+                instance, dest, params, module.check_mode
+            )
+        }
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(instances)) as pool:
+            futures = [
+                (
+                    instance["name"],
+                    pool.submit(
+                        collect, instance, dest, params, module.check_mode
+                    ),
+                )
+                for instance in instances
+            ]
+            results = dict(
+                (name, future.result()) for name, future in futures
+            )
+
+    result = {
+        "changed": any(r["new_entries"] for r in results.values()),
+        "instances": results,
+        "new_entries": sum(r["new_entries"] for r in results.values()),
+        "requests": sum(r["requests"] for r in results.values()),
+        "timings": {"wall_ms": (time.monotonic() - started) * 1000},
+    }
+    failed = sorted(name for name, r in results.items() if r.get("failed"))
+    if failed:
+        module.fail_json(
+            msg="; ".join(
+                "%s: %s" % (name, results[name]["msg"]) for name in failed
+            ),
+            **result,
+        )
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,10 @@ description:
     - Handles authentication automatically
     - Supports all HTTP methods (GET, POST, PUT, DELETE, etc.)
     - Abstracts away the need to manually construct JSON request bodies
+    - In check mode GET requests are sent as usual; any other request is
+      replaced by a GET of the same endpoint and the module reports whether
+      the request would change it (C(diff), C(changed_keys)) without
+      sending it
 options:
     base_url:
         description:
@@ -163,12 +167,28 @@ msg:
     description: Message describing what happened
     type: str
     returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
+changed_keys:
+    description: Dotted paths of the body keys that differ from the current state
+    type: list
+    returned: for writes in check mode
+    sample: ["EnableRemoteAccess"]
+diff:
+    description: Differing body keys before and after
+    type: dict
+    returned: for writes in check mode
 """
 
 import json
+import time
+from urllib.parse import urlencode
+
+from ansible.module_utils.api_diff import plan_write
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.urls import fetch_url, url_argument_spec
-from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible.module_utils.http_transport import Connection, TransportError
 
 
 class JellyfinAPI:
@@ -185,13 +205,28 @@ class JellyfinAPI:
         self.headers = module.params.get("headers", {})
         self.validate_certs = module.params["validate_certs"]
         self.timeout = module.params["timeout"]
+        self.timings = {}
         self.access_token = None
+        try:
+            self.conn = Connection(
+                self.base_url, self.timeout, self.validate_certs
+            )
+        except TransportError as e:
+            module.fail_json(msg=str(e))
+
+    def request(self, method, path, data=None, headers=None):
+        """Send one request over the kept-alive connection.
+
+        Returns (status, response headers, raw body); connection errors
+        fail the module.
+        """
+        try:
+            return self.conn.request(method, path, data, headers)
+        except TransportError as e:
+            self.module.fail_json(msg=str(e), timings=self.timings)
 
     def authenticate_with_credentials(self):
         """Authenticate using username and password to get access token"""
-        auth_endpoint = "/Users/AuthenticateByName"
-        auth_url = self.base_url + auth_endpoint
-
         auth_body = {"Username": self.username, "Pw": self.password}
 
         headers = {
@@ -199,24 +234,21 @@ class JellyfinAPI:
             "X-Emby-Authorization": 'MediaBrowser Client="Ansible", Device="Server", DeviceId="ansible-module", Version="1.0.0"',
         }
 
-        response, info = fetch_url(
-            self.module,
-            auth_url,
-            data=json.dumps(auth_body),
-            headers=headers,
-            method="POST",
-            timeout=self.timeout,
+        started = time.monotonic()
+        status, _, raw = self.request(
+            "POST", "/Users/AuthenticateByName", json.dumps(auth_body), headers
         )
+        self.timings["auth_ms"] = (time.monotonic() - started) * 1000
 
-        if info["status"] != 200:
+        if status != 200:
             self.module.fail_json(
                 msg="Authentication failed",
-                status_code=info["status"],
-                response=info.get("body", ""),
+                status_code=status,
+                response=raw.decode("utf-8", "replace"),
             )
 
         try:
-            result = json.loads(response.read())
+            result = json.loads(raw)
             self.access_token = result.get("AccessToken")
             if not self.access_token:
                 self.module.fail_json(
@@ -250,9 +282,9 @@ class JellyfinAPI:
 
         return headers
 
-    def build_url(self):
-        """Build the complete URL with query parameters"""
-        url = self.base_url + self.endpoint
+    def build_path(self):
+        """Build the endpoint path with query parameters"""
+        path = self.endpoint
 
         if self.query_params:
             # Filter out None values and convert booleans to lowercase strings
@@ -265,9 +297,9 @@ class JellyfinAPI:
                         clean_params[key] = value
 
             if clean_params:
-                url += "?" + urlencode(clean_params)
+                path += "?" + urlencode(clean_params)
 
-        return url
+        return path
 
     def make_request(self):
         """Make the API request"""
@@ -276,7 +308,7 @@ class JellyfinAPI:
             self.authenticate_with_credentials()
 
         # Build request components
-        url = self.build_url()
+        path = self.build_path()
         headers = self.build_headers()
 
         # Prepare request data
@@ -284,35 +316,34 @@ class JellyfinAPI:
         if self.method in ["POST", "PUT", "PATCH"] and self.body:
             data = json.dumps(self.body)
 
-        # Make the request
-        response, info = fetch_url(
-            self.module,
-            url,
-            data=data,
-            headers=headers,
-            method=self.method,
-            timeout=self.timeout,
-        )
-
-        # Parse response
-        status_code = info["status"]
+        # Check mode reads the endpoint instead of writing to it
+        if self.module.check_mode and self.method != "GET":
+            return self.plan_request(path, headers)
 
-        result = {"status_code": status_code, "response": {}, "msg": ""}
+        # Make the request
+        started = time.monotonic()
+        status_code, _, body = self.request(self.method, path, data, headers)
+        self.timings["http_ms"] = (time.monotonic() - started) * 1000
+
+        result = {
+            "status_code": status_code,
+            "response": {},
+            "msg": "",
+            "timings": self.timings,
+        }
 
-        # Read response body
-        if response:
+        # Parse response body
+        if body:
             try:
-                body = response.read()
-                if body:
-                    result["response"] = json.loads(body)
-            except Exception as e:
-                result["response"] = body.decode("utf-8") if body else ""
+                result["response"] = json.loads(body)
+            except ValueError:
+                result["response"] = body.decode("utf-8", "replace")
 
         # Handle error responses
         if status_code >= 400:
             error_msg = "API request failed with status %d" % status_code
-            if "body" in info:
-                error_msg += ": %s" % info["body"]
+            if body:
+                error_msg += ": %s" % body.decode("utf-8", "replace")
             result["msg"] = error_msg
             result["failed"] = True
             return result
@@ -323,10 +354,26 @@ class JellyfinAPI:
 
         return result
 
+    def plan_request(self, path, headers):
+        """GET the endpoint a write would go to and diff the body against it"""
+        started = time.monotonic()
+        status_code, _, raw = self.request("GET", path, None, headers)
+        self.timings["http_ms"] = (time.monotonic() - started) * 1000
+        try:
+            current = json.loads(raw) if raw else {}
+        except ValueError:
+            current = None
+        result = plan_write(
+            self.method, self.endpoint, status_code, current, self.body
+        )
+        result["status_code"] = status_code
+        result["response"] = {}
+        result["timings"] = self.timings
+        return result
+
 
 def main():
-    argument_spec = url_argument_spec()
-    argument_spec.update(
+    argument_spec = dict(
         base_url=dict(type="str", required=True),
         api_token=dict(type="str", required=False, no_log=True),
         username=dict(type="str", required=False),
@@ -338,6 +385,7 @@ def main():
         query_params=dict(type="dict", default={}),
         body=dict(type="dict", default={}),
         headers=dict(type="dict", default={}),
+        validate_certs=dict(type="bool", default=True),
         timeout=dict(type="int", default=30),
     )
 
@@ -348,9 +396,6 @@ def main():
         supports_check_mode=True,
     )
 
-    if module.check_mode:
-        module.exit_json(changed=False)
-
     api = JellyfinAPI(module)
     result = api.make_request()
 
@@ -0,0 +1,492 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: jellyfin_backup_pull
+short_description: Copy Jellyfin backup archives to a local directory
+version_added: "1.1.0"
+description:
+    - Lists the backups on the server (GET /System/Backups) and streams
+      each archive that is not stored yet to I(dest) in chunks, so memory
+      use does not depend on the archive size
+    - An interrupted transfer leaves a partial file behind; the next run
+      resumes it with an HTTP Range request (guarded by If-Range, so a
+      changed archive is downloaded from the start)
+    - A SHA-256 is computed while the data is written and recorded in an
+      index, together with the size; archives already in the index are
+      skipped without any request, and an archive whose content is
+      identical to a stored one is hard-linked to it
+    - Local copies are pruned by count (I(keep)) and/or age
+      (I(max_age_days))
+options:
+    base_url:
+        description:
+            - Base URL of the Jellyfin server (e.g., http://localhost:8096)
+        required: true
+        type: str
+    api_token:
+        description:
+            - API token for authentication
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authentication (alternative to api_token)
+        required: false
+        type: str
+    password:
+        description:
+            - Password for authentication (used with username)
+        required: false
+        type: str
+    dest:
+        description:
+            - Local directory the archives are copied to (created if missing)
+        required: true
+        type: path
+    backups:
+        description:
+            - Names of the backups to copy; all listed backups by default
+        required: false
+        type: list
+        elements: str
+    keep:
+        description:
+            - Number of newest local archives to keep; 0 keeps all
+        required: false
+        type: int
+        default: 0
+    max_age_days:
+        description:
+            - Remove local archives older than this many days; 0 disables
+        required: false
+        type: int
+        default: 0
+    verify:
+        description:
+            - Re-hash stored archives and download again any whose hash
+              no longer matches the index
+        required: false
+        type: bool
+        default: false
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: true
+    timeout:
+        description:
+            - Socket timeout in seconds (per read, not per archive)
+        required: false
+        type: int
+        default: 60
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Copy new Jellyfin backups to the NAS, keep the last 7
+  jellyfin_backup_pull:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    dest: /mnt/nas/backups/jellyfin
+    keep: 7
+  delegate_to: localhost
+
+- name: Copy one backup
+  jellyfin_backup_pull:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    dest: /srv/backups/jellyfin
+    backups:
+      - "jellyfin-backup-20260301020000.zip"
+"""
+
+RETURN = r"""
+downloaded:
+    description: Archives transferred in this run
+    type: list
+    returned: always
+resumed:
+    description: Archives whose transfer continued from a partial file
+    type: list
+    returned: always
+skipped:
+    description: Archives already stored with a matching index entry
+    type: list
+    returned: always
+deduplicated:
+    description: Downloaded archives hard-linked to an identical stored one
+    type: list
+    returned: always
+pruned:
+    description: Local archives removed by retention
+    type: list
+    returned: always
+bytes:
+    description: Bytes received in this run
+    type: int
+    returned: always
+archives:
+    description: Index of the stored archives (name -> sha256, size, created)
+    type: dict
+    returned: always
+requests:
+    description: HTTP requests made (including login/logout)
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds
+    type: dict
+    returned: always
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.jellyfin_client import (
+    CHUNK_SIZE,
+    JellyfinClient,
+    JellyfinError,
+    quote_path,
+)
+
+INDEX_NAME = ".jellyfin-backups.json"
+PARTIAL_DIR = ".partial"
+
+
+def load_json(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_json(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(data, handle, indent=2, sort_keys=True)
+    os.rename(tmp_path, path)
+
+
+def hash_file(path, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest
+
+
+def parse_created(value):
+    """Turn an ISO 8601 DateCreated into epoch seconds (0 if unknown)."""
+    if not value:
+        return 0
+    try:
+        stamp = time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return 0
+    import calendar
+
+    return calendar.timegm(stamp)
+
+
+def remote_backups(client):
+    """Return {name: created} for the backups the server lists."""
+    listing = client.get("/System/Backups")
+    if isinstance(listing, dict):
+        listing = listing.get("Items") or listing.get("Backups") or []
+    backups = {}
+    for entry in listing or []:
+        if isinstance(entry, str):
+            backups[os.path.basename(entry)] = 0
+            continue
+        name = entry.get("Name") or os.path.basename(entry.get("Path") or "")
+        if name:
+            backups[name] = parse_created(entry.get("DateCreated"))
+    return backups
+
+
+def transfer(client, name, part_path, meta_path):
+    """Download one archive to part_path, resuming when possible.
+
+    Returns (sha256, size, bytes received, resumed). The partial file and
+    its metadata are left in place if the transfer is interrupted.
+    """
+    meta = load_json(meta_path)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {}
+    if offset and (meta.get("etag") or meta.get("last_modified")):
+        headers["Range"] = "bytes=%d-" % offset
+        headers["If-Range"] = meta.get("etag") or meta["last_modified"]
+    else:
+        offset = 0
+
+    try:
+        response = client.open(
+            "GET",
+            "/System/Backups/%s" % quote_path(name),
+            headers=headers,
+        )
+    except JellyfinError as e:
+        if e.status != 416 or not offset:
+            raise
+        # The partial file is not a prefix of the archive; start over.
+        os.unlink(part_path)
+        offset = 0
+        response = client.open("GET", "/System/Backups/%s" % quote_path(name))
+    resumed = response.status == 206
+    if resumed:
+        content_range = response.getheader("Content-Range", "")
+        start = content_range.split(" ", 1)[-1].split("-", 1)[0]
+        if start != str(offset):
+            client.disconnect()
+            raise JellyfinError(
+                "Unexpected Content-Range %r for %s" % (content_range, name)
+            )
+        total = content_range.rsplit("/", 1)[-1]
+        expected = int(total) if total.isdigit() else None
+        digest = hash_file(part_path)
+    else:
+        offset = 0
+        length = response.getheader("Content-Length")
+        expected = int(length) if length and length.isdigit() else None
+        digest = hashlib.sha256()
+
+    save_json(
+        meta_path,
+        {
+            "etag": response.getheader("ETag"),
+            "last_modified": response.getheader("Last-Modified"),
+            "size": expected,
+        },
+    )
+
+    received = 0
+    with open(part_path, "ab" if resumed else "wb") as handle:
+        try:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                handle.write(chunk)
+                digest.update(chunk)
+                received += len(chunk)
+        except (OSError, IOError) as e:
+            client.disconnect()
+            raise JellyfinError(
+                "Transfer of %s interrupted after %d bytes: %s"
+                % (name, offset + received, e)
+            )
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    size = offset + received
+    if expected is not None and size != expected:
+        client.disconnect()
+        raise JellyfinError(
+            "Transfer of %s incomplete: %d of %d bytes"
+            % (name, size, expected)
+        )
+    return digest.hexdigest(), size, received, resumed
+
+
+def expired(created, keep, max_age_days, now):
+    """Return the names retention removes from {name: created}, oldest
+    first."""
+    ordered = sorted(created, key=lambda name: (created[name] or 0, name))
+    remove = set()
+    if keep > 0 and len(ordered) > keep:
+        remove.update(ordered[:-keep])
+    if max_age_days > 0:
+        cutoff = now - max_age_days * 86400
+        for name in ordered:
+            if (created[name] or now) < cutoff:
+                remove.add(name)
+    return [name for name in ordered if name in remove]
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            api_token=dict(type="str", required=False, no_log=True),
+            username=dict(type="str", required=False),
+            password=dict(type="str", required=False, no_log=True),
+            dest=dict(type="path", required=True),
+            backups=dict(type="list", elements="str", required=False),
+            keep=dict(type="int", default=0),
+            max_age_days=dict(type="int", default=0),
+            verify=dict(type="bool", default=False),
+            validate_certs=dict(type="bool", default=True),
+            timeout=dict(type="int", default=60),
+        ),
+        required_one_of=[["api_token", "username"]],
+        required_together=[["username", "password"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+    dest = params["dest"]
+    partial_dir = os.path.join(dest, PARTIAL_DIR)
+    index_path = os.path.join(dest, INDEX_NAME)
+    if not module.check_mode:
+        for directory in (dest, partial_dir):
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o750)
+
+    index = load_json(index_path)
+    archives = index.get("archives", {})
+    result = {
+        "changed": False,
+        "downloaded": [],
+        "resumed": [],
+        "skipped": [],
+        "deduplicated": [],
+        "pruned": [],
+        "bytes": 0,
+        "timings": {"transfer_ms": 0.0, "verify_ms": 0.0},
+    }
+
+    # Forget index entries whose file has gone, and optionally re-hash.
+    started = time.monotonic()
+    for name in list(archives):
+        path = os.path.join(dest, name)
+        if not os.path.exists(path):
+            del archives[name]
+        elif (
+            params["verify"]
+            and hash_file(path).hexdigest() != archives[name]["sha256"]
+        ):
+            module.warn("%s does not match its recorded hash" % name)
+            del archives[name]
+            if not module.check_mode:
+                os.unlink(path)
+    result["timings"]["verify_ms"] = (time.monotonic() - started) * 1000
+
+    client = JellyfinClient(
+        params["base_url"],
+        api_token=params["api_token"],
+        username=params["username"],
+        password=params["password"],
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+
+    def finish(failed_msg=None):
+        client.close()
+        result["archives"] = archives
+        result["requests"] = client.requests
+        result["timings"].update(client.timings)
+        if failed_msg:
+            module.fail_json(msg=failed_msg, **result)
+        module.exit_json(**result)
+
+    try:
+        available = remote_backups(client)
+    except JellyfinError as e:
+        finish(str(e))
+
+    wanted = params["backups"] if params["backups"] else sorted(available)
+    missing = [name for name in wanted if name not in available]
+    if missing:
+        finish("Backups not found on the server: %s" % ", ".join(missing))
+
+    # Apply retention to stored and wanted archives together, so an
+    # archive that would be pruned right away is not downloaded at all.
+    created = dict(
+        (name, entry.get("created")) for name, entry in archives.items()
+    )
+    for name in wanted:
+        created.setdefault(name, available[name] or int(time.time()))
+    result["pruned"] = expired(
+        created, params["keep"], params["max_age_days"], int(time.time())
+    )
+    dropped = set(result["pruned"])
+
+    by_hash = dict((entry["sha256"], name) for name, entry in archives.items())
+    for name in wanted:
+        if name in archives:
+            result["skipped"].append(name)
+            continue
+        if name in dropped:
+            continue
+        if name != os.path.basename(name) or name.startswith("."):
+            finish("Refusing unsafe backup name %r" % name)
+        result["changed"] = True
+        if module.check_mode:
+            result["downloaded"].append(name)
+            continue
+
+        part_path = os.path.join(partial_dir, name + ".part")
+        meta_path = os.path.join(partial_dir, name + ".json")
+        started = time.monotonic()
+        try:
+            sha256, size, received, resumed = transfer(
+                client, name, part_path, meta_path
+            )
+        except JellyfinError as e:
+            result["bytes"] += (
+                os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            )
+            save_json(index_path, {"version": 1, "archives": archives})
+            finish("%s (partial data kept for resume)" % e)
+        result["timings"]["transfer_ms"] += (time.monotonic() - started) * 1000
+        result["bytes"] += received
+
+        path = os.path.join(dest, name)
+        os.rename(part_path, path)
+        os.unlink(meta_path)
+        if resumed:
+            result["resumed"].append(name)
+        result["downloaded"].append(name)
+
+        twin = by_hash.get(sha256)
+        if twin and os.path.exists(os.path.join(dest, twin)):
+            # Link under a temporary name first; the download stays in
+            # place when the filesystem cannot hard-link.
+            link_path = os.path.join(dest, ".tmp-link-" + name)
+            try:
+                os.link(os.path.join(dest, twin), link_path)
+                os.replace(link_path, path)
+                result["deduplicated"].append(name)
+            except OSError:
+                if os.path.lexists(link_path):
+                    os.unlink(link_path)
+        archives[name] = {
+            "sha256": sha256,
+            "size": size,
+            "created": available[name] or int(time.time()),
+            "downloaded": int(time.time()),
+        }
+        by_hash.setdefault(sha256, name)
+
+    result["pruned"] = [name for name in result["pruned"] if name in archives]
+    for name in result["pruned"]:
+        result["changed"] = True
+        if not module.check_mode:
+            os.unlink(os.path.join(dest, name))
+        del archives[name]
+
+    if not module.check_mode:
+        save_json(index_path, {"version": 1, "archives": archives})
+    finish()
+
+
+if __name__ == "__main__":
+    main()
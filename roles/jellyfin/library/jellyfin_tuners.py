@@ -0,0 +1,571 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: jellyfin_tuners
+short_description: Reconcile Jellyfin LiveTV tuner hosts and guide providers
+version_added: "1.1.0"
+description:
+    - Jellyfin has no GET for /LiveTv/TunerHosts, so the current tuners
+      and listing (guide) providers are read from C(livetv.xml) with a
+      single C(docker exec) into I(container_id). Without I(container_id)
+      the same data is read from GET /System/Configuration/livetv
+    - Tuner hosts are indexed by (FriendlyName, Url) and listing
+      providers by (Type, Path), or (Type, ListingsId) for Schedules
+      Direct; the complete desired lists are compared locally
+    - Only the needed calls are made on one keep-alive connection,
+      POST /LiveTv/TunerHosts to add a tuner or (with its Id) to change
+      one, DELETE /LiveTv/TunerHosts to remove one, and the same for
+      /LiveTv/ListingProviders. Calls are made one at a time because
+      Jellyfin rewrites C(livetv.xml) on each of them
+    - Only the fields given for a tuner or provider are compared; when
+      one differs the stored entry is sent back with those fields changed
+    - In check mode the actions are computed and returned but not made
+options:
+    base_url:
+        description:
+            - Base URL of Jellyfin server (e.g., http://localhost:8096)
+        required: true
+        type: str
+    api_token:
+        description:
+            - API token for authentication
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authentication (alternative to api_token)
+        required: false
+        type: str
+    password:
+        description:
+            - Password for authentication (used with username)
+        required: false
+        type: str
+    container_id:
+        description:
+            - Jellyfin container to read I(livetv_path) from; the module
+              must run on the host of that container
+        required: false
+        type: str
+    livetv_path:
+        description:
+            - Path of C(livetv.xml) inside the container
+        required: false
+        type: str
+        default: /config/config/livetv.xml
+    tuners:
+        description:
+            - Desired tuner hosts
+            - Each item has C(name) and C(url) and optionally C(type)
+              (default C(m3u)), C(import_favorites), C(hw_transcode),
+              C(stream_looping), C(tuner_count), C(user_agent), C(source)
+              and C(state) (C(present) or C(absent))
+            - New tuners get the role defaults for fields that are not
+              given (no favorites filter, hardware transcoding and stream
+              looping on, one tuner)
+        required: false
+        type: list
+        elements: dict
+        default: []
+    guides:
+        description:
+            - Desired listing providers
+            - Each item has C(type) (C(xmltv) or C(schedulesdirect),
+              default C(xmltv)) and C(path) (XMLTV URL or file) or
+              C(listings_id), and optionally C(enable_all_tuners),
+              C(enabled_tuners) (tuner names), C(user_agent), C(username),
+              C(password), C(country), C(zip_code) and C(state)
+        required: false
+        type: list
+        elements: dict
+        default: []
+    purge:
+        description:
+            - Remove tuners and providers that are not listed
+        required: false
+        type: bool
+        default: false
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: true
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Configure IPTV tuners and the guide
+  jellyfin_tuners:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    container_id: "{{ jellyfin_container_id }}"
+    tuners:
+      - name: US IPTV
+        url: https://iptv-org.github.io/iptv/countries/us.m3u
+      - name: Sports
+        url: https://example.com/sports.m3u
+        tuner_count: 2
+        user_agent: Mozilla/5.0
+      - name: Old
+        url: https://example.com/old.m3u
+        state: absent
+    guides:
+      - path: https://example.com/guide.xml.gz
+        enable_all_tuners: false
+        enabled_tuners: [US IPTV, Sports]
+  delegate_to: "{{ jellyfin_container_host }}"
+"""
+
+RETURN = r"""
+tuners:
+    description: Action per desired (and purged) tuner
+    type: list
+    returned: always
+    sample:
+        - name: US IPTV
+          url: https://iptv-org.github.io/iptv/countries/us.m3u
+          id: 2f1d4e0c8a9b4a47a5b3c9f7d1e2a3b4
+          action: unchanged
+          changes: []
+        - name: Sports
+          url: https://example.com/sports.m3u
+          id: 5c0e9a1b2d3f4e5a6b7c8d9e0f1a2b3c
+          action: updated
+          changes: ["TunerCount"]
+guides:
+    description: Action per desired (and purged) listing provider
+    type: list
+    returned: always
+created:
+    description: Tuners and providers added
+    type: int
+    returned: always
+updated:
+    description: Tuners and providers changed
+    type: int
+    returned: always
+deleted:
+    description: Tuners and providers removed
+    type: int
+    returned: always
+requests:
+    description: HTTP requests made
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (read_ms, auth_ms, http_ms)
+    type: dict
+    returned: always
+"""
+
+import re
+import subprocess
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.jellyfin_client import JellyfinClient, JellyfinError
+
+# Option name -> (API field, type) for tuner hosts and listing providers.
+TUNER_FIELDS = {
+    "name": ("FriendlyName", str),
+    "url": ("Url", str),
+    "type": ("Type", str),
+    "import_favorites": ("ImportFavoritesOnly", bool),
+    "hw_transcode": ("AllowHWTranscoding", bool),
+    "stream_looping": ("EnableStreamLooping", bool),
+    "tuner_count": ("TunerCount", int),
+    "user_agent": ("UserAgent", str),
+    "source": ("Source", str),
+}
+TUNER_DEFAULTS = {
+    "Type": "m3u",
+    "ImportFavoritesOnly": False,
+    "AllowHWTranscoding": True,
+    "EnableStreamLooping": True,
+    "TunerCount": 1,
+    "UserAgent": "",
+    "Source": "",
+}
+GUIDE_FIELDS = {
+    "type": ("Type", str),
+    "path": ("Path", str),
+    "listings_id": ("ListingsId", str),
+    "enable_all_tuners": ("EnableAllTuners", bool),
+    "enabled_tuners": ("EnabledTuners", list),
+    "user_agent": ("UserAgent", str),
+    "username": ("Username", str),
+    "password": ("Password", str),
+    "country": ("Country", str),
+    "zip_code": ("ZipCode", str),
+}
+GUIDE_DEFAULTS = {"Type": "xmltv", "EnableAllTuners": True}
+# Sent when a provider is created, never compared (stored hashed).
+WRITE_ONLY = {"Password"}
+# livetv.xml arrays, which are empty elements when there are no items.
+LIST_FIELDS = {
+    "EnabledTuners",
+    "ChannelMappings",
+    "NewsCategories",
+    "SportsCategories",
+    "KidsCategories",
+    "MovieCategories",
+}
+# livetv.xml fields that stay strings even when they look like numbers.
+STRING_FIELDS = set(
+    api
+    for api, kind in list(TUNER_FIELDS.values()) + list(GUIDE_FIELDS.values())
+    if kind is str
+) | {"Id", "DeviceId"}
+
+ENDPOINTS = {
+    "tuners": "/LiveTv/TunerHosts",
+    "guides": "/LiveTv/ListingProviders",
+}
+
+
+def xml_value(element):
+    """Convert a livetv.xml element to the JSON value the API uses."""
+    children = list(element)
+    if children or element.tag in LIST_FIELDS:
+        return [
+            (
+                dict((c.tag, xml_value(c)) for c in child)
+                if len(child)
+                else child.text or ""
+            )
+            for child in children
+        ]
+    text = element.text or ""
+    if element.tag in STRING_FIELDS:
+        return text
+    if text in ("true", "false"):
+        return text == "true"
+    if re.match(r"^-?\d+$", text):
+        return int(text)
+    return text
+
+
+def parse_livetv(data):
+    """Return {"TunerHosts": [...], "ListingProviders": [...]}.
+
+    Raises ValueError if the file is not well-formed XML.
+    """
+    import xml.etree.ElementTree as ET
+
+    options = {"TunerHosts": [], "ListingProviders": []}
+    if not data.strip():
+        return options
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        raise ValueError(str(e))
+    for section in options:
+        entries = root.find(section)
+        for entry in entries if entries is not None else []:
+            options[section].append(
+                dict((child.tag, xml_value(child)) for child in entry)
+            )
+    return options
+
+
+def read_livetv(container_id, path):
+    """Read livetv.xml with one docker exec; a missing file is empty."""
+    result = subprocess.run(
+        [
+            "docker",
+            "exec",
+            container_id,
+            "sh",
+            "-c",
+            'if [ -f "$1" ]; then cat "$1"; fi',
+            "sh",
+            path,
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            (result.stderr or result.stdout).strip()
+            or "docker exec exited with %d" % result.returncode
+        )
+    return result.stdout
+
+
+def tuner_key(info):
+    return (info.get("FriendlyName") or "", info.get("Url") or "")
+
+
+def guide_key(info):
+    kind = (info.get("Type") or "").lower()
+    return (kind, info.get("Path") or info.get("ListingsId") or "")
+
+
+def to_api(item, fields):
+    """Map the given options of one item to typed API fields."""
+    body = {}
+    for option, (api, kind) in fields.items():
+        value = item.get(option)
+        if value is None:
+            continue
+        if kind is bool:
+            value = boolean(value)
+        elif kind is int:
+            value = int(value)
+        elif kind is list:
+            value = [str(v) for v in value]
+        else:
+            value = str(value)
+        body[api] = value
+    return body
+
+
+def plan(desired, existing, key_func, defaults, purge):
+    """Return one plan per desired and (with purge) unlisted entry."""
+    index = dict((key_func(info), info) for info in existing)
+    plans = []
+    seen = set()
+    for state, wanted in desired:
+        key = key_func(dict(defaults, **wanted))
+        seen.add(key)
+        current = index.get(key)
+        entry = {"key": key, "current": current, "wanted": wanted}
+        if state == "absent":
+            entry["action"] = "deleted" if current else "unchanged"
+            entry["changes"] = []
+        elif current is None:
+            entry["action"] = "created"
+            entry["changes"] = sorted(wanted)
+        else:
+            entry["changes"] = sorted(
+                api
+                for api, value in wanted.items()
+                if api not in WRITE_ONLY and current.get(api) != value
+            )
+            entry["action"] = "updated" if entry["changes"] else "unchanged"
+        plans.append(entry)
+    if purge:
+        for key, current in index.items():
+            if key not in seen:
+                plans.append(
+                    {
+                        "key": key,
+                        "current": current,
+                        "wanted": {},
+                        "action": "deleted",
+                        "changes": [],
+                    }
+                )
+    return plans
+
+
+def apply(client, kind, entry, defaults):
+    """Make the call for one plan entry; returns the stored entry."""
+    endpoint = ENDPOINTS[kind]
+    current = entry["current"]
+    if entry["action"] == "deleted":
+        client.delete(endpoint, {"id": current.get("Id")})
+        return current
+    params = None
+    if kind == "guides":
+        params = {"validateLogin": False, "validateListings": False}
+    if entry["action"] == "created":
+        body = dict(defaults, **entry["wanted"])
+    else:
+        body = dict(current, **entry["wanted"])
+    saved = client.post(endpoint, body, params)
+    return saved if isinstance(saved, dict) else body
+
+
+def report(kind, entry):
+    info = entry["current"] or {}
+    item = {
+        "action": entry["action"],
+        "changes": entry["changes"],
+        "id": info.get("Id"),
+    }
+    if kind == "tuners":
+        item["name"], item["url"] = entry["key"]
+    else:
+        item["type"], item["path"] = entry["key"]
+    return item
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            api_token=dict(type="str", required=False, no_log=True),
+            username=dict(type="str", required=False),
+            password=dict(type="str", required=False, no_log=True),
+            container_id=dict(type="str", required=False),
+            livetv_path=dict(type="str", default="/config/config/livetv.xml"),
+            tuners=dict(type="list", elements="dict", default=[]),
+            guides=dict(type="list", elements="dict", default=[]),
+            purge=dict(type="bool", default=False),
+            validate_certs=dict(type="bool", default=True),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["api_token", "username"]],
+        required_together=[["username", "password"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+
+    desired = {"tuners": [], "guides": []}
+    for kind, fields, required in (
+        ("tuners", TUNER_FIELDS, ("name", "url")),
+        ("guides", GUIDE_FIELDS, ()),
+    ):
+        for item in params[kind]:
+            state = item.get("state", "present")
+            if state not in ("present", "absent"):
+                module.fail_json(msg="Invalid state %s in %s" % (state, kind))
+            missing = [o for o in required if not item.get(o)]
+            if kind == "guides" and not (
+                item.get("path") or item.get("listings_id")
+            ):
+                missing.append("path or listings_id")
+            if missing:
+                module.fail_json(
+                    msg="%s item %s is missing %s"
+                    % (kind, item, ", ".join(missing))
+                )
+            try:
+                desired[kind].append((state, to_api(item, fields)))
+            except (TypeError, ValueError) as e:
+                module.fail_json(
+                    msg="Invalid %s item %s: %s" % (kind, item, e)
+                )
+    for kind, key_func, defaults in (
+        ("tuners", tuner_key, TUNER_DEFAULTS),
+        ("guides", guide_key, GUIDE_DEFAULTS),
+    ):
+        keys = [key_func(dict(defaults, **w)) for _, w in desired[kind]]
+        duplicates = sorted(set(k for k in keys if keys.count(k) > 1))
+        if duplicates:
+            module.fail_json(
+                msg="Duplicate %s: %s"
+                % (kind, ", ".join("%s %s" % k for k in duplicates))
+            )
+
+    client = JellyfinClient(
+        params["base_url"],
+        api_token=params["api_token"],
+        username=params["username"],
+        password=params["password"],
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+    result = {"changed": False}
+
+    def fail(msg, status=None):
+        client.close()
+        result.update(requests=client.requests, timings=client.timings)
+        module.fail_json(msg=msg, status_code=status, **result)
+
+    started = time.monotonic()
+    try:
+        if params["container_id"]:
+            options = parse_livetv(
+                read_livetv(params["container_id"], params["livetv_path"])
+            )
+        else:
+            options = client.get("/System/Configuration/livetv")
+    except (OSError, RuntimeError) as e:
+        fail("Failed to read %s: %s" % (params["livetv_path"], e))
+    except ValueError as e:
+        fail("Failed to parse %s: %s" % (params["livetv_path"], e))
+    except JellyfinError as e:
+        fail(str(e), e.status)
+    client.timings["read_ms"] = (time.monotonic() - started) * 1000
+
+    tuner_plans = plan(
+        desired["tuners"],
+        options.get("TunerHosts") or [],
+        tuner_key,
+        TUNER_DEFAULTS,
+        params["purge"],
+    )
+    # Tuners are applied first so guides can name new tuners.
+    tuner_ids = dict(
+        (info.get("FriendlyName"), info.get("Id"))
+        for info in options.get("TunerHosts") or []
+    )
+    counts = {"created": 0, "updated": 0, "deleted": 0}
+    result["tuners"] = []
+    try:
+        for entry in tuner_plans:
+            if entry["action"] != "unchanged":
+                counts[entry["action"]] += 1
+                if not module.check_mode:
+                    entry["current"] = apply(
+                        client, "tuners", entry, TUNER_DEFAULTS
+                    )
+            info = entry["current"] or {}
+            if entry["action"] == "deleted":
+                tuner_ids.pop(info.get("FriendlyName"), None)
+            elif info:
+                tuner_ids[info.get("FriendlyName")] = info.get("Id")
+            result["tuners"].append(report("tuners", entry))
+
+        for _, wanted in desired["guides"]:
+            names = wanted.get("EnabledTuners")
+            if names is None:
+                continue
+            unknown = [n for n in names if n not in tuner_ids]
+            if unknown and not module.check_mode:
+                fail(
+                    "Unknown tuners in enabled_tuners: %s" % ", ".join(unknown)
+                )
+            wanted["EnabledTuners"] = [tuner_ids.get(n, n) for n in names]
+
+        guide_plans = plan(
+            desired["guides"],
+            options.get("ListingProviders") or [],
+            guide_key,
+            GUIDE_DEFAULTS,
+            params["purge"],
+        )
+        result["guides"] = []
+        for entry in guide_plans:
+            if entry["action"] != "unchanged":
+                counts[entry["action"]] += 1
+                if not module.check_mode:
+                    entry["current"] = apply(
+                        client, "guides", entry, GUIDE_DEFAULTS
+                    )
+            result["guides"].append(report("guides", entry))
+    except JellyfinError as e:
+        result.update(counts)
+        fail(str(e), e.status)
+
+    result.update(counts)
+    result["changed"] = any(counts.values())
+    client.close()
+    result["requests"] = client.requests
+    result["timings"] = client.timings
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: jellyfin_users
+short_description: Reconcile Jellyfin users and their policies in one pass
+version_added: "1.1.0"
+description:
+    - Takes the complete list of desired users and makes the server match
+      it. GET /Users is read once and indexed by name (case-insensitive);
+      the policy and configuration of every user are compared locally
+    - Only the calls that are needed are made, POST /Users/New for
+      missing users, POST /Users/{id}/Policy and
+      POST /Users/{id}/Configuration when a given field differs,
+      POST /Users/{id}/Password and DELETE /Users/{id}. A run with
+      nothing to change makes a single GET
+    - The calls for different users run in parallel over at most
+      I(parallel) keep-alive connections sharing one token; the calls for
+      one user are made in order
+    - I(policy) and I(configuration) are partial, only the given fields
+      are compared. Jellyfin replaces the whole policy on update, so the
+      body sent is the current policy with the given fields applied
+    - Passwords cannot be read back; they are set when a user is created
+      or, with I(update_password=always), on every run
+    - In check mode the changes are computed and returned but not made
+options:
+    base_url:
+        description:
+            - Base URL of Jellyfin server (e.g., http://localhost:8096)
+        required: true
+        type: str
+    api_token:
+        description:
+            - API token for authentication
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authentication (alternative to api_token)
+        required: false
+        type: str
+    password:
+        description:
+            - Password for authentication (used with username)
+        required: false
+        type: str
+    users:
+        description:
+            - Desired users
+            - Each item has C(name) and optionally C(password), C(policy)
+              (dict of UserPolicy fields), C(configuration) (dict of
+              UserConfiguration fields) and C(state) (C(present) or
+              C(absent), default C(present))
+        required: true
+        type: list
+        elements: dict
+    update_password:
+        description:
+            - C(on_create) sets C(password) only for new users, C(always)
+              also resets it for existing users (reported as changed)
+        required: false
+        type: str
+        choices: [on_create, always]
+        default: on_create
+    purge:
+        description:
+            - Delete users that are not in I(users)
+            - Administrators and the user given in I(username) are never
+              purged; remove them with C(state=absent)
+        required: false
+        type: bool
+        default: false
+    parallel:
+        description:
+            - Connections used for the create/update/delete calls
+        required: false
+        type: int
+        default: 4
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: true
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Onboard family accounts
+  jellyfin_users:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    users:
+      - name: alice
+        password: "{{ vault_jellyfin_alice_password }}"
+        policy:
+          EnableRemoteAccess: true
+          EnableContentDeletion: false
+      - name: kids
+        password: "{{ vault_jellyfin_kids_password }}"
+        policy:
+          MaxParentalRating: 10
+          EnableAllFolders: false
+          EnabledFolders: ["{{ kids_library_id }}"]
+        configuration:
+          SubtitleMode: Always
+      - name: guest
+        state: absent
+  delegate_to: localhost
+
+- name: Show what would change
+  jellyfin_users:
+    base_url: "{{ jellyfin_url }}"
+    api_token: "{{ jellyfin_api_token }}"
+    users: "{{ jellyfin_users_desired }}"
+    purge: true
+  check_mode: true
+  register: user_plan
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+users:
+    description: Per-user action and the fields that changed, keyed by name
+    type: dict
+    returned: always
+    sample:
+        alice:
+            action: unchanged
+            changes: []
+        kids:
+            action: created
+            changes: ["Policy.MaxParentalRating", "Configuration.SubtitleMode"]
+created:
+    description: Names of created users
+    type: list
+    returned: always
+updated:
+    description: Names of users whose policy, configuration or password changed
+    type: list
+    returned: always
+deleted:
+    description: Names of deleted users
+    type: list
+    returned: always
+requests:
+    description: HTTP requests made across all connections
+    type: int
+    returned: always
+timings:
+    description: >-
+      Module-internal timings in milliseconds (auth_ms, http_ms summed over
+      the connections, wall_ms)
+    type: dict
+    returned: always
+"""
+
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.jellyfin_client import (
+    ClientPool,
+    JellyfinClient,
+    JellyfinError,
+    quote_path,
+)
+
+SECTIONS = (("policy", "Policy"), ("configuration", "Configuration"))
+
+
+def diff_fields(current, desired):
+    """Return the keys of desired whose values differ from current."""
+    current = current or {}
+    return sorted(
+        key for key, value in desired.items() if current.get(key) != value
+    )
+
+
+def plan_user(spec, user, update_password):
+    """Return the plan for one desired user (user is None if missing)."""
+    plan = {"name": spec["name"], "user": user, "changes": []}
+    if spec.get("state", "present") == "absent":
+        plan["action"] = "deleted" if user else "unchanged"
+        return plan
+
+    plan["sections"] = []
+    for option, key in SECTIONS:
+        desired = spec.get(option) or {}
+        fields = diff_fields((user or {}).get(key), desired)
+        if fields:
+            plan["sections"].append((option, key, fields))
+            plan["changes"].extend("%s.%s" % (key, f) for f in fields)
+    plan["set_password"] = bool(
+        user and update_password == "always" and "password" in spec
+    )
+    if plan["set_password"]:
+        plan["changes"].append("Password")
+
+    if user is None:
+        plan["action"] = "created"
+    elif plan["changes"]:
+        plan["action"] = "updated"
+    else:
+        plan["action"] = "unchanged"
+    return plan
+
+
+def apply_plan(client, plan, specs):
+    """Make the calls for one user; runs in a worker thread."""
+    spec = specs.get(plan["name"].lower(), {})
+    user = plan["user"]
+    try:
+        if plan["action"] == "deleted":
+            client.delete("/Users/%s" % quote_path(user["Id"]))
+            return None
+        if user is None:
+            user = client.post(
+                "/Users/New",
+                {"Name": spec["name"], "Password": spec.get("password") or ""},
+            )
+            if not isinstance(user, dict) or not user.get("Id"):
+                return "No user returned when creating %s" % spec["name"]
+        user_path = "/Users/%s" % quote_path(user["Id"])
+        for option, key, _ in plan["sections"]:
+            # A new user starts with the server defaults, which may
+            # already match.
+            if plan["user"] is None and not diff_fields(
+                user.get(key), spec[option]
+            ):
+                continue
+            body = dict(user.get(key) or {})
+            body.update(spec[option])
+            client.post("%s/%s" % (user_path, key), body)
+        if plan["set_password"]:
+            client.post(
+                user_path + "/Password",
+                {"NewPw": spec["password"], "ResetPassword": False},
+            )
+    except JellyfinError as e:
+        return str(e)
+    return None
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            api_token=dict(type="str", required=False, no_log=True),
+            username=dict(type="str", required=False),
+            password=dict(type="str", required=False, no_log=True),
+            users=dict(type="list", elements="dict", required=True),
+            update_password=dict(
+                type="str",
+                default="on_create",
+                choices=["on_create", "always"],
+                no_log=False,
+            ),
+            purge=dict(type="bool", default=False),
+            parallel=dict(type="int", default=4),
+            validate_certs=dict(type="bool", default=True),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["api_token", "username"]],
+        required_together=[["username", "password"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+
+    specs = {}
+    for spec in params["users"]:
+        name = spec.get("name")
+        if not name:
+            module.fail_json(msg="Each user needs a name")
+        if name.lower() in specs:
+            module.fail_json(msg="Duplicate user %s" % name)
+        if spec.get("state", "present") not in ("present", "absent"):
+            module.fail_json(
+                msg="Invalid state %s for user %s" % (spec["state"], name)
+            )
+        for option, _ in SECTIONS:
+            if not isinstance(spec.get(option) or {}, dict):
+                module.fail_json(
+                    msg="%s of user %s must be a dict" % (option, name)
+                )
+        specs[name.lower()] = spec
+
+    started = time.monotonic()
+    client = JellyfinClient(
+        params["base_url"],
+        api_token=params["api_token"],
+        username=params["username"],
+        password=params["password"],
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+    result = {"changed": False, "users": {}}
+
+    def fail(msg, status=None):
+        client.close()
+        timings = dict(client.timings)
+        timings["wall_ms"] = (time.monotonic() - started) * 1000
+        result.update(requests=client.requests, timings=timings)
+        module.fail_json(msg=msg, status_code=status, **result)
+
+    try:
+        current = client.get("/Users")
+    except JellyfinError as e:
+        fail(str(e), e.status)
+    if not isinstance(current, list):
+        fail("Unexpected /Users response: %s" % current)
+    existing = dict((u.get("Name", "").lower(), u) for u in current)
+
+    plans = [
+        plan_user(spec, existing.get(key), params["update_password"])
+        for key, spec in specs.items()
+    ]
+    if params["purge"]:
+        keep = (params["username"] or "").lower()
+        for key, user in sorted(existing.items()):
+            if (
+                key in specs
+                or key == keep
+                or (user.get("Policy") or {}).get("IsAdministrator")
+            ):
+                continue
+            plans.append(
+                {
+                    "name": user["Name"],
+                    "user": user,
+                    "action": "deleted",
+                    "changes": [],
+                }
+            )
+
+    pending = [plan for plan in plans if plan["action"] != "unchanged"]
+    outcomes = []
+    if pending and not module.check_mode:
+        pool = ClientPool(client, params["parallel"])
+        try:
+            outcomes = pool.map(
+                lambda c, plan: apply_plan(c, plan, specs), pending
+            )
+        except JellyfinError as e:
+            pool.close()
+            fail(str(e), e.status)
+        pool.close()
+    failed = dict(
+        (plan["name"], error)
+        for plan, error in zip(pending, outcomes)
+        if error
+    )
+
+    for plan in plans:
+        entry = {"action": plan["action"], "changes": plan["changes"]}
+        if plan["name"] in failed:
+            entry["failed"] = True
+        result["users"][plan["name"]] = entry
+    for action in ("created", "updated", "deleted"):
+        result[action] = sorted(
+            plan["name"]
+            for plan in plans
+            if plan["action"] == action and plan["name"] not in failed
+        )
+    result["changed"] = bool(
+        result["created"] or result["updated"] or result["deleted"]
+    )
+
+    if failed:
+        fail("; ".join("%s: %s" % item for item in sorted(failed.items())))
+    client.close()
+    result["requests"] = client.requests
+    result["timings"] = dict(client.timings)
+    result["timings"]["wall_ms"] = (time.monotonic() - started) * 1000
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: jellyfin_libraries
+short_description: Reconcile Jellyfin media libraries, their paths and options
+version_added: "1.1.0"
+description:
+    - Reads GET /Library/VirtualFolders once, indexes the libraries by
+      name and compares the collection type, paths and the given
+      LibraryOptions fields of every desired library locally
+    - Only the needed calls are made on one keep-alive connection,
+      POST /Library/VirtualFolders for missing libraries,
+      POST /Library/VirtualFolders/LibraryOptions when a given option
+      differs, POST and DELETE /Library/VirtualFolders/Paths for paths to
+      add or remove, and DELETE /Library/VirtualFolders for libraries with
+      C(state=absent) (or unlisted ones with I(purge))
+    - None of these calls starts a scan; when anything changed and
+      I(refresh) is set, a single POST /Library/Refresh is made at the end
+    - Jellyfin cannot change the collection type of a library. A type
+      mismatch is reported as a warning and left alone unless
+      I(recreate) is set, which deletes and re-creates the library (its
+      metadata is scanned again)
+    - In check mode the changes are computed and returned but not made
+options:
+    base_url:
+        description:
+            - Base URL of Jellyfin server (e.g., http://localhost:8096)
+        required: true
+        type: str
+    api_token:
+        description:
+            - API token for authentication
+        required: false
+        type: str
+    username:
+        description:
+            - Username for authentication (alternative to api_token)
+        required: false
+        type: str
+    password:
+        description:
+            - Password for authentication (used with username)
+        required: false
+        type: str
+    libraries:
+        description:
+            - Desired libraries
+            - Each item has C(name), C(type) (collection type such as
+              C(movies), C(tvshows), C(music); C(mixed) for none),
+              C(paths) and optionally C(options) (dict of LibraryOptions
+              fields), C(state) (C(present) or C(absent)) and
+              C(refresh_on_create) (set to false so that changes to this
+              library do not start the scan); other keys are ignored
+        required: true
+        type: list
+        elements: dict
+    purge:
+        description:
+            - Delete libraries that are not listed
+        required: false
+        type: bool
+        default: false
+    recreate:
+        description:
+            - Delete and re-create libraries whose collection type differs
+        required: false
+        type: bool
+        default: false
+    refresh:
+        description:
+            - Start one library scan after all changes were made, when a
+              library changed whose C(refresh_on_create) is not false
+        required: false
+        type: bool
+        default: true
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: true
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Configure media libraries
+  jellyfin_libraries:
+    base_url: "http://127.0.0.1:8096"
+    api_token: "{{ jellyfin_config_api_token }}"
+    libraries:
+      - name: Movies
+        type: movies
+        paths: [/media/movies, /media/movies-4k]
+        options:
+          EnableRealtimeMonitor: true
+          PreferredMetadataLanguage: en
+      - name: Music
+        type: music
+        paths: [/media/music]
+      - name: Old
+        state: absent
+  register: library_result
+"""
+
+RETURN = r"""
+libraries:
+    description: Per-library action and changes, keyed by name
+    type: dict
+    returned: always
+    sample:
+        Movies:
+            action: updated
+            add_paths: ["/media/movies-4k"]
+            remove_paths: []
+            options: ["EnableRealtimeMonitor"]
+        Music:
+            action: unchanged
+            add_paths: []
+            remove_paths: []
+            options: []
+created:
+    description: Names of created libraries
+    type: list
+    returned: always
+updated:
+    description: Names of libraries whose paths or options changed
+    type: list
+    returned: always
+deleted:
+    description: Names of deleted libraries
+    type: list
+    returned: always
+refreshed:
+    description: Whether a library scan was started
+    type: bool
+    returned: always
+requests:
+    description: HTTP requests made
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.jellyfin_client import JellyfinClient, JellyfinError
+
+
+def normalize_path(path):
+    return path.rstrip("/") or "/"
+
+
+def collection_type(value):
+    value = (value or "").lower()
+    return None if value in ("", "mixed") else value
+
+
+def plan_library(spec, current, recreate):
+    """Return the plan for one desired library (current is None if
+    missing)."""
+    plan = {
+        "name": spec["name"],
+        "add_paths": [],
+        "remove_paths": [],
+        "options": [],
+    }
+    if spec.get("state", "present") == "absent":
+        plan["action"] = "deleted" if current else "unchanged"
+        return plan
+
+    paths = [normalize_path(p) for p in spec.get("paths") or []]
+    options = spec.get("options") or {}
+    if current is not None and collection_type(
+        current.get("CollectionType")
+    ) != collection_type(spec.get("type")):
+        plan["type_mismatch"] = "%s != %s" % (
+            current.get("CollectionType") or "mixed",
+            spec.get("type") or "mixed",
+        )
+        if not recreate:
+            plan["action"] = "unchanged"
+            return plan
+        plan["recreate"] = True
+        current = None
+
+    if current is None:
+        plan["action"] = "created"
+        plan["add_paths"] = paths
+        plan["options"] = sorted(options)
+        return plan
+
+    existing = [normalize_path(p) for p in current.get("Locations") or []]
+    plan["add_paths"] = [p for p in paths if p not in existing]
+    plan["remove_paths"] = [p for p in existing if p not in paths]
+    current_options = current.get("LibraryOptions") or {}
+    plan["options"] = sorted(
+        key
+        for key, value in options.items()
+        if key != "PathInfos" and current_options.get(key) != value
+    )
+    changed = plan["add_paths"] or plan["remove_paths"] or plan["options"]
+    plan["action"] = "updated" if changed else "unchanged"
+    return plan
+
+
+def apply_plan(client, plan, spec, current):
+    name = plan["name"]
+    if plan["action"] == "deleted" or plan.get("recreate"):
+        client.delete(
+            "/Library/VirtualFolders",
+            {"name": name, "refreshLibrary": False},
+        )
+    if plan["action"] == "deleted":
+        return
+    if plan["action"] == "created":
+        options = dict(spec.get("options") or {})
+        options["PathInfos"] = [{"Path": p} for p in plan["add_paths"]]
+        client.post(
+            "/Library/VirtualFolders",
+            {"LibraryOptions": options},
+            {
+                "name": name,
+                "collectionType": collection_type(spec.get("type")),
+                "refreshLibrary": False,
+            },
+        )
+        return
+    # Options first: Jellyfin saves PathInfos along with them, so the
+    # path calls below must see the result.
+    if plan["options"]:
+        options = dict(current.get("LibraryOptions") or {})
+        options.update(spec["options"])
+        client.post(
+            "/Library/VirtualFolders/LibraryOptions",
+            {"Id": current.get("ItemId"), "LibraryOptions": options},
+        )
+    for path in plan["add_paths"]:
+        client.post(
+            "/Library/VirtualFolders/Paths",
+            {"Name": name, "PathInfo": {"Path": path}},
+            {"refreshLibrary": False},
+        )
+    for path in plan["remove_paths"]:
+        client.delete(
+            "/Library/VirtualFolders/Paths",
+            {"name": name, "path": path, "refreshLibrary": False},
+        )
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            api_token=dict(type="str", required=False, no_log=True),
+            username=dict(type="str", required=False),
+            password=dict(type="str", required=False, no_log=True),
+            libraries=dict(type="list", elements="dict", required=True),
+            purge=dict(type="bool", default=False),
+            recreate=dict(type="bool", default=False),
+            refresh=dict(type="bool", default=True),
+            validate_certs=dict(type="bool", default=True),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["api_token", "username"]],
+        required_together=[["username", "password"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+
+    specs = {}
+    for spec in params["libraries"]:
+        name = spec.get("name")
+        if not name:
+            module.fail_json(msg="Each library needs a name")
+        if name in specs:
+            module.fail_json(msg="Duplicate library %s" % name)
+        if spec.get("state", "present") not in ("present", "absent"):
+            module.fail_json(
+                msg="Invalid state %s for library %s" % (spec["state"], name)
+            )
+        if spec.get("state", "present") == "present" and not spec.get("paths"):
+            module.fail_json(msg="Library %s needs paths" % name)
+        if not isinstance(spec.get("options") or {}, dict):
+            module.fail_json(msg="options of library %s must be a dict" % name)
+        specs[name] = spec
+
+    client = JellyfinClient(
+        params["base_url"],
+        api_token=params["api_token"],
+        username=params["username"],
+        password=params["password"],
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+    result = {"changed": False, "libraries": {}, "refreshed": False}
+
+    def fail(msg, status=None):
+        client.close()
+        result.update(requests=client.requests, timings=client.timings)
+        module.fail_json(msg=msg, status_code=status, **result)
+
+    try:
+        folders = client.get("/Library/VirtualFolders")
+    except JellyfinError as e:
+        fail(str(e), e.status)
+    if not isinstance(folders, list):
+        fail("Unexpected /Library/VirtualFolders response: %s" % folders)
+    existing = dict((f.get("Name"), f) for f in folders)
+
+    plans = [
+        plan_library(spec, existing.get(name), params["recreate"])
+        for name, spec in specs.items()
+    ]
+    if params["purge"]:
+        plans.extend(
+            {
+                "name": name,
+                "action": "deleted",
+                "add_paths": [],
+                "remove_paths": [],
+                "options": [],
+            }
+            for name in sorted(existing)
+            if name not in specs
+        )
+
+    for plan in plans:
+        if plan.get("type_mismatch") and not plan.get("recreate"):
+            module.warn(
+                "Library '%s' has collection type %s; set recreate to "
+                "delete and re-create it"
+                % (plan["name"], plan["type_mismatch"])
+            )
+
+    pending = [plan for plan in plans if plan["action"] != "unchanged"]
+    done = []
+    try:
+        if not module.check_mode:
+            for plan in pending:
+                apply_plan(
+                    client,
+                    plan,
+                    specs.get(plan["name"], {}),
+                    existing.get(plan["name"]),
+                )
+                done.append(plan["name"])
+            if params["refresh"] and any(
+                specs.get(plan["name"], {}).get("refresh_on_create", True)
+                for plan in pending
+            ):
+                client.post("/Library/Refresh")
+                result["refreshed"] = True
+    except JellyfinError as e:
+        result["applied"] = done
+        fail("%s (applied: %s)" % (e, ", ".join(done) or "none"), e.status)
+
+    for plan in plans:
+        entry = dict(
+            (key, plan[key])
+            for key in ("action", "add_paths", "remove_paths", "options")
+        )
+        if plan.get("type_mismatch"):
+            entry["type_mismatch"] = plan["type_mismatch"]
+        result["libraries"][plan["name"]] = entry
+    for action in ("created", "updated", "deleted"):
+        result[action] = sorted(
+            p["name"] for p in plans if p["action"] == action
+        )
+    result["changed"] = bool(pending)
+
+    client.close()
+    result["requests"] = client.requests
+    result["timings"] = client.timings
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,595 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: sqlite_backup
+short_description: Consistent, incremental SQLite backups in a chunk store
+version_added: "1.1.0"
+description:
+    - Takes a consistent snapshot of a live SQLite database with the
+      online backup API (or C(VACUUM INTO)) into a local temporary file;
+      the source is opened read-only and SQLite's locking makes the
+      snapshot safe while the application keeps writing, unlike a copy of
+      the database file
+    - The snapshot is checked with C(PRAGMA quick_check), split into
+      fixed-size chunks aligned to the database pages and every chunk is
+      stored once, zlib-compressed, under its SHA-256; only chunks whose
+      pages changed since an earlier generation are written to I(dest)
+    - Every backup writes a small generation manifest (chunk hashes, page
+      size and count, SHA-256 of the whole snapshot); when the snapshot
+      is identical to the latest generation no new generation is made
+    - Generations beyond I(keep) are pruned and chunks no longer
+      referenced by any generation are deleted
+    - C(state=restore) rebuilds a generation into I(restore_to) and
+      verifies it against the recorded SHA-256
+    - The database must be reachable from the host the module runs on,
+      e.g. through the host path of a container's data volume; SQLite
+      locks work across the bind mount because host and container share
+      the kernel
+options:
+    src:
+        description:
+            - Path of the SQLite database to back up
+        required: false
+        type: path
+    dest:
+        description:
+            - Directory of the chunk store, e.g. on an NFS mount (created
+              if missing)
+        required: true
+        type: path
+    state:
+        description:
+            - C(backup) stores a snapshot of I(src), C(restore) writes a
+              stored generation to I(restore_to)
+        required: false
+        type: str
+        choices: ['backup', 'restore']
+        default: backup
+    method:
+        description:
+            - C(backup_api) copies the pages as they are, so unchanged
+              pages keep their chunk and little is written per run
+            - C(vacuum_into) writes a compacted copy (smaller, but pages
+              move, so more chunks change between runs)
+        required: false
+        type: str
+        choices: ['backup_api', 'vacuum_into']
+        default: backup_api
+    chunk_kb:
+        description:
+            - Chunk size in KiB; a multiple of the database page size keeps
+              one changed page within one chunk
+        required: false
+        type: int
+        default: 256
+    keep:
+        description:
+            - Number of generations to retain; 0 keeps all of them
+        required: false
+        type: int
+        default: 14
+    check:
+        description:
+            - Run C(PRAGMA quick_check) on the snapshot and fail instead of
+              storing a damaged copy
+        required: false
+        type: bool
+        default: true
+    force:
+        description:
+            - Record a generation even when nothing changed (backup), or
+              overwrite an existing I(restore_to) (restore)
+        required: false
+        type: bool
+        default: false
+    generation:
+        description:
+            - Generation to restore, by ID, or C(latest)
+        required: false
+        type: str
+        default: latest
+    restore_to:
+        description:
+            - File the restored database is written to
+        required: false
+        type: path
+    compression_level:
+        description:
+            - zlib level (1-9) for newly stored chunks
+        required: false
+        type: int
+        default: 6
+    tmpdir:
+        description:
+            - Directory for the temporary snapshot; the system default when
+              not set (keep it off the NFS mount)
+        required: false
+        type: path
+    timeout:
+        description:
+            - Seconds to wait for a lock held by a writer
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Back up the Koffan database to NFS
+  sqlite_backup:
+    src: /var/lib/docker/volumes/koffan-stack_koffan-data/_data/shopping.db
+    dest: /mnt/ssd_media/koffan
+    keep: 48
+
+- name: Restore the latest generation next to the live database
+  sqlite_backup:
+    dest: /mnt/ssd_media/koffan
+    state: restore
+    restore_to: /tmp/shopping.db
+"""
+
+RETURN = r"""
+generation:
+    description: ID of the generation written (backup) or restored
+    type: str
+    returned: success
+    sample: "20260301T020000Z"
+db_bytes:
+    description: Size of the snapshot
+    type: int
+    returned: success
+page_size:
+    description: Page size of the database
+    type: int
+    returned: state=backup
+chunks:
+    description: Number of chunks of the snapshot
+    type: int
+    returned: state=backup
+changed_chunks:
+    description: Chunks that differ from the previous generation
+    type: int
+    returned: state=backup
+new_chunks:
+    description: Chunks added to the store
+    type: int
+    returned: state=backup
+stored_bytes:
+    description: Compressed bytes added to the store
+    type: int
+    returned: state=backup
+generations:
+    description: Generation IDs retained after pruning, oldest first
+    type: list
+    returned: state=backup
+pruned:
+    description: Generation IDs removed by retention
+    type: list
+    returned: state=backup
+chunks_removed:
+    description: Unreferenced chunks deleted after pruning
+    type: int
+    returned: state=backup
+timings:
+    description: >-
+      Module-internal timings in milliseconds (snapshot_ms, check_ms,
+      store_ms or build_ms)
+    type: dict
+    returned: always
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zlib
+from urllib.parse import quote
+
+from ansible.module_utils.basic import AnsibleModule
+
+INDEX_VERSION = 1
+
+
+class BackupError(Exception):
+    pass
+
+
+class ChunkStore:
+    """Content-addressed chunk store with generation manifests.
+
+    Layout::
+
+        chunks/ab/<sha256>.z        zlib-compressed chunk
+        generations/<id>.json       chunk list of one snapshot
+        index.json                  generation IDs and sizes, oldest first
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = os.path.join(path, "chunks")
+        self.generations = os.path.join(path, "generations")
+        self.index_path = os.path.join(path, "index.json")
+
+    def ensure(self):
+        for directory in (self.path, self.chunks, self.generations):
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunks, digest[:2], digest + ".z")
+
+    def has_chunk(self, digest):
+        return os.path.exists(self.chunk_path(digest))
+
+    def put_chunk(self, digest, data, level):
+        """Store one chunk. Returns the number of bytes written."""
+        path = self.chunk_path(digest)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        compressed = zlib.compress(data, level)
+        self._write(path, compressed)
+        return len(compressed)
+
+    def read_chunk(self, digest):
+        with open(self.chunk_path(digest), "rb") as handle:
+            return zlib.decompress(handle.read())
+
+    def load_index(self):
+        try:
+            with open(self.index_path) as handle:
+                index = json.load(handle)
+        except (IOError, OSError, ValueError):
+            index = {}
+        index.setdefault("version", INDEX_VERSION)
+        index.setdefault("generations", [])
+        return index
+
+    def save_index(self, index):
+        self._write(self.index_path, _dump(index))
+
+    def load_generation(self, generation_id):
+        path = os.path.join(self.generations, generation_id + ".json")
+        with open(path) as handle:
+            return json.load(handle)
+
+    def save_generation(self, generation_id, manifest):
+        path = os.path.join(self.generations, generation_id + ".json")
+        self._write(path, _dump(manifest))
+
+    def delete_generation(self, generation_id):
+        path = os.path.join(self.generations, generation_id + ".json")
+        if os.path.exists(path):
+            os.unlink(path)
+
+    def collect_garbage(self, generation_ids):
+        """Delete chunks not referenced by the given generations."""
+        referenced = set()
+        for generation_id in generation_ids:
+            referenced.update(self.load_generation(generation_id)["chunks"])
+        removed = 0
+        for prefix in os.listdir(self.chunks):
+            directory = os.path.join(self.chunks, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith(".z") and name[:-2] not in referenced:
+                    os.unlink(os.path.join(directory, name))
+                    removed += 1
+        return removed
+
+    def _write(self, path, data):
+        # Write and rename, so an interrupted run never leaves a truncated
+        # chunk or manifest on the share.
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=".tmp-"
+        )
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.rename(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def _dump(data):
+    return json.dumps(data, indent=2, sort_keys=True).encode("utf-8")
+
+
+def take_snapshot(src, path, method, timeout):
+    """Write a consistent copy of src to path. Returns the page size."""
+    try:
+        source = sqlite3.connect(
+            "file:%s?mode=ro" % quote(src), uri=True, timeout=timeout
+        )
+        try:
+            if method == "vacuum_into":
+                source.execute("VACUUM INTO ?", (path,))
+            else:
+                target = sqlite3.connect(path)
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+        finally:
+            source.close()
+        snapshot = sqlite3.connect(path)
+        try:
+            # Store the snapshot as a single file without a WAL.
+            snapshot.execute("PRAGMA journal_mode=DELETE")
+            return snapshot.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            snapshot.close()
+    except sqlite3.Error as e:
+        raise BackupError("Snapshot of %s failed: %s" % (src, e))
+
+
+def quick_check(path):
+    connection = sqlite3.connect("file:%s?mode=ro" % quote(path), uri=True)
+    try:
+        rows = [row[0] for row in connection.execute("PRAGMA quick_check")]
+    finally:
+        connection.close()
+    if rows != ["ok"]:
+        raise BackupError(
+            "Snapshot failed quick_check: %s" % "; ".join(rows[:5])
+        )
+
+
+def read_chunks(path, size):
+    with open(path, "rb") as handle:
+        while True:
+            data = handle.read(size)
+            if not data:
+                break
+            yield data
+
+
+def new_generation_id(index):
+    base = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    existing = set(entry["id"] for entry in index["generations"])
+    generation_id = base
+    counter = 1
+    while generation_id in existing:
+        generation_id = "%s-%d" % (base, counter)
+        counter += 1
+    return generation_id
+
+
+def backup(module, store, result):
+    params = module.params
+    index = store.load_index()
+    previous = []
+    if index["generations"]:
+        latest = store.load_generation(index["generations"][-1]["id"])
+        previous = latest["chunks"]
+
+    tmpdir = tempfile.mkdtemp(prefix="sqlite-backup-", dir=params["tmpdir"])
+    try:
+        snapshot = os.path.join(tmpdir, os.path.basename(params["src"]))
+        started = time.monotonic()
+        page_size = take_snapshot(
+            params["src"], snapshot, params["method"], params["timeout"]
+        )
+        result["timings"]["snapshot_ms"] = (time.monotonic() - started) * 1000
+        result["page_size"] = page_size
+        chunk_size = params["chunk_kb"] * 1024
+        if chunk_size % page_size:
+            module.warn(
+                "chunk_kb %d is not a multiple of the page size %d; a "
+                "changed page can touch two chunks"
+                % (params["chunk_kb"], page_size)
+            )
+
+        if params["check"]:
+            started = time.monotonic()
+            quick_check(snapshot)
+            result["timings"]["check_ms"] = (time.monotonic() - started) * 1000
+
+        started = time.monotonic()
+        digest = hashlib.sha256()
+        chunks = []
+        seen = set()
+        new_chunks = 0
+        stored_bytes = 0
+        for data in read_chunks(snapshot, chunk_size):
+            digest.update(data)
+            chunk = hashlib.sha256(data).hexdigest()
+            if (
+                chunk not in seen
+                and not store.has_chunk(chunk)
+                and not module.check_mode
+            ):
+                stored_bytes += store.put_chunk(
+                    chunk, data, params["compression_level"]
+                )
+                new_chunks += 1
+            chunks.append(chunk)
+            seen.add(chunk)
+        result["timings"]["store_ms"] = (time.monotonic() - started) * 1000
+        result["db_bytes"] = os.path.getsize(snapshot)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    result["chunks"] = len(chunks)
+    result["changed_chunks"] = sum(
+        1
+        for position, chunk in enumerate(chunks)
+        if position >= len(previous) or previous[position] != chunk
+    )
+    result["new_chunks"] = new_chunks
+    result["stored_bytes"] = stored_bytes
+
+    if not previous or chunks != previous or params["force"]:
+        result["changed"] = True
+        generation_id = new_generation_id(index)
+        result["generation"] = generation_id
+        if not module.check_mode:
+            store.save_generation(
+                generation_id,
+                {
+                    "id": generation_id,
+                    "source": params["src"],
+                    "method": params["method"],
+                    "page_size": page_size,
+                    "chunk_size": chunk_size,
+                    "size": result["db_bytes"],
+                    "sha256": digest.hexdigest(),
+                    "chunks": chunks,
+                },
+            )
+            index["generations"].append(
+                {
+                    "id": generation_id,
+                    "created": int(time.time()),
+                    "size": result["db_bytes"],
+                    "new_chunks": new_chunks,
+                    "stored_bytes": stored_bytes,
+                }
+            )
+    else:
+        result["generation"] = index["generations"][-1]["id"]
+
+    pruned = []
+    if params["keep"] > 0 and len(index["generations"]) > params["keep"]:
+        pruned = index["generations"][: -params["keep"]]
+        index["generations"] = index["generations"][-params["keep"] :]
+    result["pruned"] = [entry["id"] for entry in pruned]
+    result["generations"] = [entry["id"] for entry in index["generations"]]
+    result["chunks_removed"] = 0
+    if pruned:
+        result["changed"] = True
+
+    if not module.check_mode and result["changed"]:
+        store.save_index(index)
+        for entry in pruned:
+            store.delete_generation(entry["id"])
+        if pruned:
+            result["chunks_removed"] = store.collect_garbage(
+                result["generations"]
+            )
+
+
+def restore(module, store, result):
+    params = module.params
+    index = store.load_index()
+    if not index["generations"]:
+        raise BackupError("No generations in %s" % store.path)
+    generation_id = params["generation"]
+    if generation_id == "latest":
+        generation_id = index["generations"][-1]["id"]
+    elif generation_id not in [e["id"] for e in index["generations"]]:
+        raise BackupError("Unknown generation %s" % generation_id)
+    manifest = store.load_generation(generation_id)
+    result["generation"] = generation_id
+    result["db_bytes"] = manifest["size"]
+
+    missing = [c for c in manifest["chunks"] if not store.has_chunk(c)]
+    if missing:
+        raise BackupError(
+            "Generation %s is missing %d chunks"
+            % (generation_id, len(missing))
+        )
+    target = params["restore_to"]
+    if os.path.exists(target) and not params["force"]:
+        raise BackupError("%s exists; set force to overwrite it" % target)
+
+    result["changed"] = True
+    if module.check_mode:
+        return
+
+    started = time.monotonic()
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as handle:
+            for chunk in manifest["chunks"]:
+                data = store.read_chunk(chunk)
+                digest.update(data)
+                handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        if digest.hexdigest() != manifest["sha256"]:
+            raise BackupError("Generation %s is corrupt" % generation_id)
+        os.rename(tmp_path, target)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    result["timings"]["build_ms"] = (time.monotonic() - started) * 1000
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            src=dict(type="path", required=False),
+            dest=dict(type="path", required=True),
+            state=dict(
+                type="str", default="backup", choices=["backup", "restore"]
+            ),
+            method=dict(
+                type="str",
+                default="backup_api",
+                choices=["backup_api", "vacuum_into"],
+            ),
+            chunk_kb=dict(type="int", default=256),
+            keep=dict(type="int", default=14),
+            check=dict(type="bool", default=True),
+            force=dict(type="bool", default=False),
+            generation=dict(type="str", default="latest"),
+            restore_to=dict(type="path", required=False),
+            compression_level=dict(type="int", default=6),
+            tmpdir=dict(type="path", required=False),
+            timeout=dict(type="int", default=30),
+        ),
+        required_if=[
+            ["state", "backup", ["src"]],
+            ["state", "restore", ["restore_to"]],
+        ],
+        supports_check_mode=True,
+    )
+    params = module.params
+
+    if not 1 <= params["compression_level"] <= 9:
+        module.fail_json(msg="compression_level must be between 1 and 9")
+    if params["chunk_kb"] < 1:
+        module.fail_json(msg="chunk_kb must be positive")
+    if params["state"] == "backup" and not os.path.isfile(params["src"]):
+        module.fail_json(msg="Database %s not found" % params["src"])
+
+    store = ChunkStore(params["dest"])
+    if not module.check_mode:
+        store.ensure()
+    result = {"changed": False, "timings": {}}
+
+    try:
+        if params["state"] == "backup":
+            backup(module, store, result)
+        else:
+            restore(module, store, result)
+    except (BackupError, IOError, OSError) as e:
+        module.fail_json(msg=str(e), **result)
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,10 @@ description:
     - Supports all HTTP methods (GET, POST, PUT, DELETE, PATCH)
     - Abstracts away the need to manually construct JSON request bodies
     - Compatible with Pi-hole API v6.0
+    - In check mode GET requests and sessions (C(/auth)) are sent as usual;
+      any other request is replaced by a GET of the same endpoint and the
+      module reports whether the request would change it (C(diff),
+      C(changed_keys)) without sending it
 options:
     base_url:
         description:
@@ -42,8 +46,21 @@ options:
         description:
             - API endpoint path (e.g., /auth, /config, /dns/blocking)
             - Should start with /
-        required: true
+            - Required unless I(desired_config) is used
+        required: false
         type: str
+    desired_config:
+        description:
+            - Desired (partial) Pi-hole configuration tree, e.g.
+              C({dns: {rateLimit: {count: 10000}}})
+            - The module GETs /config once, diffs it against this tree and
+              PATCHes only the keys that differ, or nothing at all
+            - Avoids restarting FTL or reloading the resolver when the
+              configuration is already in place
+            - Works in check mode (only the GET is sent)
+            - I(endpoint), I(method) and I(body) are ignored
+        required: false
+        type: dict
     method:
         description:
             - HTTP method to use
@@ -76,7 +93,7 @@ options:
             - Whether to validate SSL certificates
         required: false
         type: bool
-        default: false
+        default: true
     timeout:
         description:
             - Request timeout in seconds
@@ -119,6 +136,20 @@ EXAMPLES = r"""
           count: 10000
           interval: 60
 
+# Converge configuration; PATCHes only what differs
+- name: Ensure rate limit and cache size
+  pihole_api:
+    base_url: "http://192.168.1.12:8081/api"
+    session_id: "{{ pihole_session.response.session.sid }}"
+    desired_config:
+      dns:
+        rateLimit:
+          count: 10000
+          interval: 60
+        cache:
+          size: 10000
+  register: pihole_config_result
+
 # Get DNS blocking status
 - name: Check DNS blocking
   pihole_api:
@@ -183,17 +214,46 @@ msg:
     description: Message describing what happened
     type: str
     returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
 session_id:
     description: Session ID for future requests (only returned from POST /auth)
     type: str
     returned: when authenticating
+changed_keys:
+    description: Dotted paths of the configuration keys that differed
+    type: list
+    returned: when desired_config is used, and for writes in check mode
+    sample: ["dns.rateLimit.count"]
+diff:
+    description: Changed keys before and after (the PATCH body)
+    type: dict
+    returned: when desired_config is used, and for writes in check mode
 """
 
 import json
 import re
+import time
+from urllib.parse import unquote, urlencode
+
+from ansible.module_utils.api_diff import diff_config, plan_write
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.urls import fetch_url, url_argument_spec
-from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible.module_utils.http_transport import Connection, TransportError
+
+
+def coerce_config(cfg):
+    """Pi-hole /config expects unsigned integers for rateLimit fields.
+    Cast numeric strings to int to keep playbook variables flexible."""
+    dns = cfg.get("dns", {}) if isinstance(cfg, dict) else {}
+    rate_limit = dns.get("rateLimit", {}) if isinstance(dns, dict) else {}
+    if isinstance(rate_limit, dict):
+        for key in ("count", "interval"):
+            value = rate_limit.get(key)
+            if isinstance(value, str) and value.isdigit():
+                rate_limit[key] = int(value)
+    return cfg
 
 
 class PiHoleAPI:
@@ -209,11 +269,27 @@ class PiHoleAPI:
         self.headers = module.params.get("headers", {})
         self.validate_certs = module.params["validate_certs"]
         self.timeout = module.params["timeout"]
+        self.timings = {}
+        try:
+            self.conn = Connection(
+                self.base_url, self.timeout, self.validate_certs
+            )
+        except TransportError as e:
+            module.fail_json(msg=str(e))
+
+    def request(self, method, path, data=None, headers=None):
+        """Send one request over the kept-alive connection.
+
+        Returns (status, response headers, raw body); connection errors
+        fail the module.
+        """
+        try:
+            return self.conn.request(method, path, data, headers)
+        except TransportError as e:
+            self.module.fail_json(msg=str(e), timings=self.timings)
 
     def authenticate(self):
         """Authenticate with password to get session ID"""
-        auth_url = self.base_url + "/auth"
-
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
@@ -221,24 +297,21 @@ class PiHoleAPI:
 
         auth_body = {"password": self.password}
 
-        response, info = fetch_url(
-            self.module,
-            auth_url,
-            data=json.dumps(auth_body),
-            headers=headers,
-            method="POST",
-            timeout=self.timeout,
+        started = time.monotonic()
+        status, info, raw = self.request(
+            "POST", "/auth", json.dumps(auth_body), headers
         )
+        self.timings["auth_ms"] = (time.monotonic() - started) * 1000
 
-        if info["status"] not in [200, 201]:
+        if status not in [200, 201]:
             self.module.fail_json(
                 msg="Pi-hole authentication failed",
-                status_code=info["status"],
-                response=info.get("body", ""),
+                status_code=status,
+                response=raw.decode("utf-8", "replace"),
             )
 
         try:
-            result = json.loads(response.read())
+            result = json.loads(raw)
             session_data = result.get("session", {}) if isinstance(result, dict) else {}
             self.session_id = session_data.get("sid")
             if self.session_id:
@@ -248,7 +321,7 @@ class PiHoleAPI:
             result = {}
 
         # Fallback: extract sid from Set-Cookie header when body parsing does not expose it.
-        set_cookie = info.get("set-cookie") or info.get("Set-Cookie") or ""
+        set_cookie = info.get("set-cookie") or ""
         match = re.search(r"(?:^|;\s*)sid=([^;\s]+)", set_cookie)
         if match:
             self.session_id = match.group(1)
@@ -257,7 +330,7 @@ class PiHoleAPI:
         self.module.fail_json(
             msg="No session ID returned from authentication",
             response=result,
-            status_code=info.get("status"),
+            status_code=status,
         )
 
     def build_headers(self):
@@ -278,9 +351,9 @@ class PiHoleAPI:
 
         return headers
 
-    def build_url(self):
-        """Build the complete URL with query parameters"""
-        url = self.base_url + self.endpoint
+    def build_path(self):
+        """Build the endpoint path with query parameters"""
+        path = self.endpoint
 
         if self.query_params:
             # Filter out None values and convert booleans to lowercase strings
@@ -293,9 +366,69 @@ class PiHoleAPI:
                         clean_params[key] = value
 
             if clean_params:
-                url += "?" + urlencode(clean_params)
+                path += "?" + urlencode(clean_params)
+
+        return path
+
+    def send(self, method, endpoint, body=None):
+        """Send one authenticated JSON request; fail the module on errors."""
+        started = time.monotonic()
+        status, info, raw = self.request(
+            method,
+            endpoint,
+            json.dumps(body) if body is not None else None,
+            self.build_headers(),
+        )
+        self.timings["http_ms"] = self.timings.get("http_ms", 0) + (
+            time.monotonic() - started
+        ) * 1000
+        try:
+            data = json.loads(raw) if raw else {}
+        except ValueError:
+            data = raw.decode("utf-8", "replace")
+        if status >= 400:
+            self.module.fail_json(
+                msg="Pi-hole API %s %s failed with status %d: %s"
+                % (method, endpoint, status, data),
+                status_code=status,
+                response=data,
+                timings=self.timings,
+            )
+        return status, data
+
+    def apply_desired_config(self, desired):
+        """GET /config once and PATCH only the keys that differ"""
+        if not self.session_id:
+            self.authenticate()
 
-        return url
+        if list(desired.keys()) == ["config"]:
+            desired = desired["config"]
+        desired = coerce_config(desired)
+
+        status_code, current = self.send("GET", "/config")
+        current = current.get("config", current) if isinstance(current, dict) else {}
+        patch, before, changed_keys = diff_config(current, desired)
+
+        result = {
+            "changed": bool(patch),
+            "changed_keys": changed_keys,
+            "diff": {"before": before, "after": patch},
+            "status_code": status_code,
+            "response": {},
+            "timings": self.timings,
+        }
+        if not patch:
+            result["msg"] = "Configuration already up to date"
+            return result
+        if self.module.check_mode:
+            result["msg"] = "Would update %s" % ", ".join(changed_keys)
+            return result
+
+        status_code, response = self.send("PATCH", "/config", {"config": patch})
+        result["status_code"] = status_code
+        result["response"] = response
+        result["msg"] = "Updated %s" % ", ".join(changed_keys)
+        return result
 
     def make_request(self):
         """Make the API request"""
@@ -305,13 +438,16 @@ class PiHoleAPI:
                 self.module.fail_json(msg="Password required for authentication")
             
             session_id = self.authenticate()
-            
+
+            # Sessions are not configuration: check mode logs in as well,
+            # so the reads that follow can run.
             return {
                 "status_code": 200,
                 "response": {"session": {"sid": session_id}},
                 "session_id": session_id,
                 "msg": "Authentication successful",
-                "changed": True,
+                "changed": not self.module.check_mode,
+                "timings": self.timings,
             }
 
         # For other endpoints, ensure we have authentication
@@ -325,92 +461,169 @@ class PiHoleAPI:
                 )
 
         # Build request components
-        url = self.build_url()
+        path = self.build_path()
         headers = self.build_headers()
 
         # Prepare request data
         data = None
         if self.method in ["POST", "PUT", "PATCH"] and self.body:
-            # Pi-hole /config expects unsigned integers for rateLimit fields.
-            # Cast numeric strings to int to keep playbook variables flexible.
             if self.endpoint == "/config" and isinstance(self.body, dict):
-                cfg = self.body.get("config", {})
-                dns = cfg.get("dns", {}) if isinstance(cfg, dict) else {}
-                rate_limit = dns.get("rateLimit", {}) if isinstance(dns, dict) else {}
-                if isinstance(rate_limit, dict):
-                    for key in ("count", "interval"):
-                        value = rate_limit.get(key)
-                        if isinstance(value, str) and value.isdigit():
-                            rate_limit[key] = int(value)
+                coerce_config(self.body.get("config", {}))
             data = json.dumps(self.body)
 
-        # Make the request
-        response, info = fetch_url(
-            self.module,
-            url,
-            data=data,
-            headers=headers,
-            method=self.method,
-            timeout=self.timeout,
-        )
+        # Check mode reads the endpoint instead of writing to it. DELETE
+        # /auth still ends the session, or check runs would use up
+        # Pi-hole's session slots.
+        if (
+            self.module.check_mode
+            and self.method != "GET"
+            and self.endpoint != "/auth"
+        ):
+            return self.plan_request(path, headers)
 
-        # Parse response
-        status_code = info["status"]
+        # Make the request
+        started = time.monotonic()
+        status_code, _, body = self.request(self.method, path, data, headers)
+        self.timings["http_ms"] = (time.monotonic() - started) * 1000
 
         result = {
             "status_code": status_code,
             "response": {},
             "msg": "",
+            "timings": self.timings,
         }
 
-        # Read response body
-        if response:
+        # Parse response body
+        if body:
             try:
-                body = response.read()
-                if body:
-                    result["response"] = json.loads(body)
-                    # Pi-hole v6 may return /config payload nested under "config".
-                    # Flatten config keys for backward-compatible task access
-                    # (e.g., response.dns.rateLimit in existing playbooks).
-                    if (
-                        self.endpoint == "/config"
-                        and self.method == "GET"
-                        and isinstance(result["response"], dict)
-                    ):
-                        cfg = result["response"].get("config")
-                        if isinstance(cfg, dict):
-                            for key, value in cfg.items():
-                                if key not in result["response"]:
-                                    result["response"][key] = value
-            except Exception as e:
+                result["response"] = json.loads(body)
+            except ValueError:
                 # Some endpoints return non-JSON responses
-                result["response"] = body.decode("utf-8") if body else ""
+                result["response"] = body.decode("utf-8", "replace")
+            # Pi-hole v6 may return /config payload nested under "config".
+            # Flatten config keys for backward-compatible task access
+            # (e.g., response.dns.rateLimit in existing playbooks).
+            if (
+                self.endpoint == "/config"
+                and self.method == "GET"
+                and isinstance(result["response"], dict)
+            ):
+                cfg = result["response"].get("config")
+                if isinstance(cfg, dict):
+                    for key, value in cfg.items():
+                        if key not in result["response"]:
+                            result["response"][key] = value
 
         # Handle error responses
         if status_code >= 400:
             error_msg = "Pi-hole API request failed with status %d" % status_code
-            if "body" in info:
-                error_msg += ": %s" % info["body"]
-            elif result["response"]:
-                error_msg += ": %s" % str(result["response"])
+            if body:
+                error_msg += ": %s" % body.decode("utf-8", "replace")
             result["msg"] = error_msg
             result["failed"] = True
             return result
 
         # Success
         result["msg"] = "API request successful"
-        result["changed"] = self.method in ["POST", "PUT", "DELETE", "PATCH"]
+        result["changed"] = (
+            self.method in ["POST", "PUT", "DELETE", "PATCH"]
+            and not self.module.check_mode
+        )
 
         return result
 
+    def plan_request(self, path, headers):
+        """GET the endpoint a write would go to and diff the body against it"""
+        parts = self.endpoint.strip("/").split("/")
+        if parts[0] == "config" and len(parts) >= 3 and path == self.endpoint:
+            # Array items (dns/upstreams/<value>) have no GET of their
+            # own; look the value up in the array instead.
+            result = self.plan_array_item(parts, headers)
+            if result is not None:
+                return result
+
+        started = time.monotonic()
+        status_code, _, raw = self.request("GET", path, None, headers)
+        self.timings["http_ms"] = (time.monotonic() - started) * 1000
+        try:
+            current = json.loads(raw) if raw else {}
+        except ValueError:
+            current = None
+        # GET /config/<path> returns the subtree under its full path.
+        if parts[0] == "config" and len(parts) > 1 and isinstance(current, dict):
+            for key in ["config"] + [unquote(part) for part in parts[1:]]:
+                if isinstance(current, dict) and key in current:
+                    current = current[key]
+        # Items come back wrapped, e.g. GET /groups/<name> returns
+        # {"groups": [{...}], "took": ...}; compare the body to the item.
+        elif isinstance(current, dict) and isinstance(self.body, dict):
+            items = [v for v in current.values() if isinstance(v, list)]
+            if (
+                not any(key in current for key in self.body)
+                and len(items) == 1
+                and len(items[0]) == 1
+                and isinstance(items[0][0], dict)
+            ):
+                current = items[0][0]
+        result = plan_write(
+            self.method, self.endpoint, status_code, current, self.body
+        )
+        result["status_code"] = status_code
+        result["response"] = {}
+        result["timings"] = self.timings
+        return result
+
+    def plan_array_item(self, parts, headers):
+        """Predict a PUT/DELETE of one value of a config array, or None
+        when the parent is not an array"""
+        started = time.monotonic()
+        status_code, _, raw = self.request(
+            "GET", "/" + "/".join(parts[:-1]), None, headers
+        )
+        self.timings["http_ms"] = (time.monotonic() - started) * 1000
+        if status_code >= 400 or not raw:
+            return None
+        try:
+            node = json.loads(raw).get("config")
+        except (ValueError, AttributeError):
+            return None
+        keys = [unquote(part) for part in parts[1:-1]]
+        for key in keys:
+            node = node.get(key) if isinstance(node, dict) else None
+        if not isinstance(node, list):
+            return None
+
+        value = unquote(parts[-1])
+        present = value in node
+        changed = present if self.method == "DELETE" else not present
+        result = {
+            "changed": changed,
+            "changed_keys": [],
+            "diff": {"before": {}, "after": {}},
+            "msg": "%s is already %s"
+            % (self.endpoint, "present" if present else "absent"),
+            "status_code": status_code,
+            "response": {},
+            "timings": self.timings,
+        }
+        if changed:
+            before = node
+            after = [v for v in node if v != value] if present else node + [value]
+            for key in reversed(keys):
+                before, after = {key: before}, {key: after}
+            result["changed_keys"] = [".".join(keys)]
+            result["diff"] = {"before": before, "after": after}
+            result["msg"] = "Would %s %s" % (self.method, self.endpoint)
+        return result
+
 
 def main():
-    argument_spec = url_argument_spec()
-    argument_spec.update(
+    argument_spec = dict(
         base_url=dict(type="str", required=True),
         password=dict(type="str", required=False, no_log=True),
         session_id=dict(type="str", required=False, no_log=True),
-        endpoint=dict(type="str", required=True),
+        endpoint=dict(type="str", required=False),
+        desired_config=dict(type="dict", required=False),
         method=dict(
             type="str",
             default="GET",
@@ -419,19 +632,24 @@ def main():
         query_params=dict(type="dict", default={}),
         body=dict(type="dict", default={}),
         headers=dict(type="dict", default={}),
+        validate_certs=dict(type="bool", default=True),
         timeout=dict(type="int", default=30),
     )
 
     module = AnsibleModule(
         argument_spec=argument_spec,
-        required_one_of=[["password", "session_id"]],
+        required_one_of=[
+            ["password", "session_id"],
+            ["endpoint", "desired_config"],
+        ],
         supports_check_mode=True,
     )
 
-    if module.check_mode:
-        module.exit_json(changed=False)
-
     api = PiHoleAPI(module)
+    if module.params["desired_config"] is not None:
+        result = api.apply_desired_config(module.params["desired_config"])
+        module.exit_json(**result)
+
     result = api.make_request()
 
     if result.get("failed"):
@@ -0,0 +1,328 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: pihole_domains
+short_description: Declaratively sync Pi-hole allow/deny domains
+version_added: "1.1.0"
+description:
+    - Reconciles the Pi-hole v6 domain lists (allow/deny, exact/regex)
+      against a full desired set
+    - Reads the current domains with a single GET /domains and diffs them
+      locally, keyed by (domain, type, kind)
+    - Removes extra domains with one POST /domains:batchDelete
+    - Adds missing domains with one POST per (type, kind, comment, groups,
+      enabled) combination, since the API accepts an array of domains
+    - Domains whose comment, groups or enabled flag differ are updated
+      with PUT /domains/{type}/{kind}/{domain}
+    - All requests share one keep-alive connection; a no-op run costs a
+      single GET (plus login/logout when a password is used)
+options:
+    base_url:
+        description:
+            - Base URL of the Pi-hole API (e.g., http://192.168.1.12:8081/api)
+        required: true
+        type: str
+    password:
+        description:
+            - Pi-hole web password, used to create (and afterwards delete)
+              a session
+        required: false
+        type: str
+    session_id:
+        description:
+            - Existing session ID from previous authentication
+        required: false
+        type: str
+    domains:
+        description:
+            - Desired domains
+            - Each item is a dict with C(domain) (required), C(type)
+              (C(allow) or C(deny), default C(deny)), C(kind) (C(exact) or
+              C(regex), default C(exact)), C(comment), C(groups) (default
+              C([0])) and C(enabled) (default C(true))
+        required: true
+        type: list
+        elements: dict
+    purge:
+        description:
+            - Remove domains that are not in I(domains)
+            - Only the type/kind combinations listed in I(purge_scope) are
+              purged
+            - Off by default, so an empty I(domains) list cannot delete
+              every domain
+        required: false
+        type: bool
+        default: false
+    purge_scope:
+        description:
+            - C(type/kind) pairs that I(purge) applies to
+        required: false
+        type: list
+        elements: str
+        default: ['allow/exact', 'allow/regex', 'deny/exact', 'deny/regex']
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Sync allow and deny lists, removing anything else
+  pihole_domains:
+    base_url: "http://192.168.1.12:8081/api"
+    password: "{{ vault_pihole_admin_password }}"
+    purge: true
+    domains:
+      - domain: "example.com"
+        type: allow
+        comment: "Needed by the TV"
+      - domain: "(\\.|^)tracker\\.example$"
+        type: deny
+        kind: regex
+      - domain: "ads.example.net"
+        type: deny
+
+- name: Only manage the exact deny list, leave everything else alone
+  pihole_domains:
+    base_url: "http://192.168.1.12:8081/api"
+    session_id: "{{ pihole_session_id }}"
+    domains: "{{ pihole_blocked_domains }}"
+    purge: true
+    purge_scope:
+      - deny/exact
+"""
+
+RETURN = r"""
+added:
+    description: Domains added, as C(type/kind/domain)
+    type: list
+    returned: always
+removed:
+    description: Domains removed, as C(type/kind/domain)
+    type: list
+    returned: always
+updated:
+    description: Domains whose comment, groups or enabled flag changed
+    type: list
+    returned: always
+current:
+    description: Number of domains Pi-hole had before the sync
+    type: int
+    returned: always
+requests:
+    description: HTTP requests made (including login/logout)
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.pihole_client import (
+    PiHoleClient,
+    PiHoleError,
+    quote_path,
+)
+
+TYPES = ("allow", "deny")
+KINDS = ("exact", "regex")
+
+
+def normalize(item, module):
+    """Return (key, settings) for a desired domain entry."""
+    domain = item.get("domain")
+    type_ = item.get("type", "deny")
+    kind = item.get("kind", "exact")
+    if not domain:
+        module.fail_json(msg="Every entry needs a domain: %r" % item)
+    if type_ not in TYPES or kind not in KINDS:
+        module.fail_json(
+            msg="Invalid type/kind %s/%s for %s" % (type_, kind, domain)
+        )
+    if kind == "exact":
+        # Pi-hole stores exact domains lower-cased.
+        domain = domain.strip().lower()
+    settings = {
+        "comment": item.get("comment") or "",
+        "groups": sorted(int(g) for g in item.get("groups", [0])),
+        "enabled": module.boolean(item.get("enabled", True)),
+    }
+    return (domain, type_, kind), settings
+
+
+def current_settings(entry):
+    return {
+        "comment": entry.get("comment") or "",
+        "groups": sorted(entry.get("groups") or []),
+        "enabled": bool(entry.get("enabled", True)),
+    }
+
+
+def label(key):
+    domain, type_, kind = key
+    return "%s/%s/%s" % (type_, kind, domain)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            password=dict(type="str", required=False, no_log=True),
+            session_id=dict(type="str", required=False, no_log=True),
+            domains=dict(type="list", elements="dict", required=True),
+            purge=dict(type="bool", default=False),
+            purge_scope=dict(
+                type="list",
+                elements="str",
+                default=[
+                    "allow/exact",
+                    "allow/regex",
+                    "deny/exact",
+                    "deny/regex",
+                ],
+            ),
+            validate_certs=dict(type="bool", default=False),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["password", "session_id"]],
+        supports_check_mode=True,
+    )
+
+    desired = {}
+    for item in module.params["domains"]:
+        key, settings = normalize(item, module)
+        desired[key] = settings
+    purge_scope = set(
+        tuple(scope.split("/", 1)) for scope in module.params["purge_scope"]
+    )
+
+    client = PiHoleClient(
+        module.params["base_url"],
+        password=module.params["password"],
+        session_id=module.params["session_id"],
+        timeout=module.params["timeout"],
+        validate_certs=module.params["validate_certs"],
+    )
+    result = {"changed": False, "added": [], "removed": [], "updated": []}
+
+    try:
+        existing = {}
+        for entry in client.get("/domains").get("domains", []):
+            key = (entry["domain"], entry["type"], entry["kind"])
+            existing[key] = current_settings(entry)
+        result["current"] = len(existing)
+
+        to_add = set(desired) - set(existing)
+        to_remove = set()
+        if module.params["purge"]:
+            to_remove = set(
+                key
+                for key in set(existing) - set(desired)
+                if (key[1], key[2]) in purge_scope
+            )
+        to_update = set(
+            key
+            for key in set(desired) & set(existing)
+            if desired[key] != existing[key]
+        )
+
+        result["added"] = sorted(label(key) for key in to_add)
+        result["removed"] = sorted(label(key) for key in to_remove)
+        result["updated"] = sorted(label(key) for key in to_update)
+        result["changed"] = bool(to_add or to_remove or to_update)
+
+        if result["changed"] and not module.check_mode:
+            if to_remove:
+                client.post(
+                    "/domains:batchDelete",
+                    [
+                        {"item": domain, "type": type_, "kind": kind}
+                        for domain, type_, kind in sorted(to_remove)
+                    ],
+                )
+
+            # One request per distinct combination of settings.
+            batches = {}
+            for key in sorted(to_add):
+                domain, type_, kind = key
+                settings = desired[key]
+                batch_key = (
+                    type_,
+                    kind,
+                    settings["comment"],
+                    tuple(settings["groups"]),
+                    settings["enabled"],
+                )
+                batches.setdefault(batch_key, []).append(domain)
+            errors = []
+            for batch_key, names in sorted(batches.items()):
+                type_, kind, comment, groups, enabled = batch_key
+                response = client.post(
+                    "/domains/%s/%s" % (type_, kind),
+                    {
+                        "domain": names,
+                        "comment": comment,
+                        "groups": list(groups),
+                        "enabled": enabled,
+                    },
+                )
+                processed = (
+                    response.get("processed") or {}
+                    if isinstance(response, dict)
+                    else {}
+                )
+                errors.extend(processed.get("errors") or [])
+
+            for key in sorted(to_update):
+                domain, type_, kind = key
+                client.put(
+                    "/domains/%s/%s/%s" % (type_, kind, quote_path(domain)),
+                    dict(desired[key], type=type_, kind=kind),
+                )
+
+            if errors:
+                result["errors"] = errors
+                result["msg"] = "Pi-hole rejected %d domain(s)" % len(errors)
+                client.close()
+                result["requests"] = client.requests
+                result["timings"] = client.timings
+                module.fail_json(**result)
+    except PiHoleError as e:
+        client.close()
+        result.update(
+            msg=str(e),
+            status_code=e.status,
+            requests=client.requests,
+            timings=client.timings,
+        )
+        module.fail_json(**result)
+
+    client.close()
+    result["requests"] = client.requests
+    result["timings"] = client.timings
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: pihole_log_tail
+short_description: Fetch only the new lines of a Pi-hole log since the last run
+version_added: "1.1.0"
+description:
+    - Reads GET /logs/{dnsmasq,ftl,webserver} with the C(nextID) cursor
+      saved by the previous run, so each run transfers only lines
+      written since then
+    - The cursor is stored per Pi-hole host and log in I(state_dir),
+      one small JSON file each, so different logs and hosts can be
+      tailed in parallel
+    - New lines are appended to I(dest), which is rotated
+      (C(dest.1) ... C(dest.N)) when it would grow beyond I(max_bytes)
+    - Only lines matching I(regexp) are returned; all new lines are
+      still appended to I(dest)
+    - When FTL restarted (its PID changed or the cursor went backwards)
+      the cursor is reset and the whole buffer is read again. Lines that
+      were dropped from FTL's in-memory buffer before they could be read
+      are counted in C(lost)
+    - In check mode lines are fetched and returned but neither I(dest)
+      nor the cursor is written
+options:
+    base_url:
+        description:
+            - Base URL of the Pi-hole API (e.g., http://192.168.1.12:8081/api)
+        required: true
+        type: str
+    password:
+        description:
+            - Pi-hole web password, used to create (and afterwards delete)
+              a session
+        required: false
+        type: str
+    session_id:
+        description:
+            - Existing session ID from previous authentication
+        required: false
+        type: str
+    log:
+        description:
+            - Which log to tail
+        required: false
+        type: str
+        choices: [dnsmasq, ftl, webserver]
+        default: dnsmasq
+    state_dir:
+        description:
+            - Directory holding the cursor files
+        required: false
+        type: path
+        default: ~/.cache/pihole-logs
+    dest:
+        description:
+            - File the new lines are appended to
+            - Defaults to C(<state_dir>/<host>_<port>-<log>.log)
+        required: false
+        type: path
+    max_bytes:
+        description:
+            - Rotate I(dest) before it grows beyond this size; 0 disables
+              rotation
+        required: false
+        type: int
+        default: 10485760
+    backups:
+        description:
+            - Rotated files to keep
+        required: false
+        type: int
+        default: 5
+    regexp:
+        description:
+            - Only return lines whose message matches this regular
+              expression (searched, not anchored)
+        required: false
+        type: str
+    max_lines:
+        description:
+            - Return at most this many (newest) matching lines
+        required: false
+        type: int
+        default: 1000
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Collect new dnsmasq log lines
+  pihole_log_tail:
+    base_url: "http://192.168.1.12:8081/api"
+    password: "{{ vault_pihole_admin_password }}"
+    log: dnsmasq
+  delegate_to: localhost
+
+- name: Return only new FTL warnings
+  pihole_log_tail:
+    base_url: "http://192.168.1.12:8081/api"
+    session_id: "{{ pihole_session_id }}"
+    log: ftl
+    regexp: "WARNING|ERROR"
+  register: ftl_warnings
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+lines:
+    description: New lines matching I(regexp), oldest first
+    type: list
+    returned: always
+    sample:
+        - timestamp: 1760000000.123
+          prio: "WARNING"
+          message: "Long-term load (15min avg) larger than number of processors"
+new_lines:
+    description: Lines read since the previous run
+    type: int
+    returned: always
+matched:
+    description: New lines matching I(regexp) (before I(max_lines))
+    type: int
+    returned: always
+lost:
+    description: Lines dropped from FTL's buffer before they were read
+    type: int
+    returned: always
+next_id:
+    description: Cursor for the next run
+    type: int
+    returned: always
+reset:
+    description: Whether the cursor was reset because FTL restarted
+    type: bool
+    returned: always
+rotated:
+    description: Whether I(dest) was rotated
+    type: bool
+    returned: always
+dest:
+    description: File the lines were appended to
+    type: str
+    returned: always
+requests:
+    description: HTTP requests made (including login/logout)
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+
+from urllib.parse import urlsplit
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.pihole_client import PiHoleClient, PiHoleError
+
+
+def host_key(base_url):
+    parts = urlsplit(base_url)
+    key = "%s_%s" % (parts.hostname, parts.port or parts.scheme)
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+
+
+def load_cursor(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_cursor(path, cursor):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(cursor, handle)
+    os.replace(tmp, path)
+
+
+def format_line(entry):
+    stamp = time.strftime(
+        "%Y-%m-%d %H:%M:%S", time.localtime(entry.get("timestamp") or 0)
+    )
+    prio = entry.get("prio")
+    message = entry.get("message") or ""
+    if prio:
+        return "%s %s: %s\n" % (stamp, prio, message)
+    return "%s %s\n" % (stamp, message)
+
+
+def rotate(dest, backups):
+    """Shift dest -> dest.1 -> ... -> dest.<backups>."""
+    if backups < 1:
+        os.remove(dest)
+        return
+    for index in range(backups - 1, 0, -1):
+        older = "%s.%d" % (dest, index)
+        if os.path.exists(older):
+            os.replace(older, "%s.%d" % (dest, index + 1))
+    os.replace(dest, dest + ".1")
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            password=dict(type="str", required=False, no_log=True),
+            session_id=dict(type="str", required=False, no_log=True),
+            log=dict(
+                type="str",
+                default="dnsmasq",
+                choices=["dnsmasq", "ftl", "webserver"],
+            ),
+            state_dir=dict(type="path", default="~/.cache/pihole-logs"),
+            dest=dict(type="path", required=False),
+            max_bytes=dict(type="int", default=10485760),
+            backups=dict(type="int", default=5),
+            regexp=dict(type="str", required=False),
+            max_lines=dict(type="int", default=1000),
+            validate_certs=dict(type="bool", default=False),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["password", "session_id"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+
+    pattern = None
+    if params["regexp"]:
+        try:
+            pattern = re.compile(params["regexp"])
+        except re.error as e:
+            module.fail_json(msg="Invalid regexp: %s" % e)
+
+    state_dir = params["state_dir"]
+    name = "%s-%s" % (host_key(params["base_url"]), params["log"])
+    cursor_path = os.path.join(state_dir, name + ".json")
+    dest = params["dest"] or os.path.join(state_dir, name + ".log")
+    if not module.check_mode:
+        for directory in (state_dir, os.path.dirname(dest)):
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+
+    cursor = load_cursor(cursor_path)
+    client = PiHoleClient(
+        params["base_url"],
+        password=params["password"],
+        session_id=params["session_id"],
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+    result = {"changed": False, "dest": dest, "reset": False, "lost": 0}
+
+    try:
+        endpoint = "/logs/%s" % params["log"]
+        next_id = int(cursor.get("next_id") or 0)
+        response = client.get(endpoint, {"nextID": next_id})
+        pid = response.get("pid")
+        if next_id and (
+            (cursor.get("pid") is not None and pid != cursor.get("pid"))
+            or int(response.get("nextID") or 0) < next_id
+        ):
+            # FTL restarted and its line IDs start over: read it all.
+            result["reset"] = True
+            next_id = 0
+            response = client.get(endpoint, {"nextID": 0})
+            pid = response.get("pid")
+    except PiHoleError as e:
+        client.close()
+        result.update(
+            msg=str(e),
+            status_code=e.status,
+            requests=client.requests,
+            timings=client.timings,
+        )
+        module.fail_json(**result)
+    client.close()
+
+    entries = response.get("log") or []
+    new_next_id = int(response.get("nextID") or next_id + len(entries))
+    result["lost"] = max(0, new_next_id - next_id - len(entries))
+    result["new_lines"] = len(entries)
+    result["next_id"] = new_next_id
+    result["rotated"] = False
+
+    if pattern is not None:
+        entries = [
+            e for e in entries if pattern.search(e.get("message") or "")
+        ]
+    result["matched"] = len(entries)
+    result["lines"] = (
+        entries[-params["max_lines"] :] if params["max_lines"] else []
+    )
+    result["changed"] = result["new_lines"] > 0
+
+    if not module.check_mode:
+        data = "".join(
+            format_line(e) for e in response.get("log") or []
+        ).encode("utf-8")
+        if data:
+            try:
+                size = os.path.getsize(dest)
+            except OSError:
+                size = 0
+            if (
+                params["max_bytes"]
+                and size
+                and size + len(data) > params["max_bytes"]
+            ):
+                rotate(dest, params["backups"])
+                result["rotated"] = True
+            with open(dest, "ab") as handle:
+                handle.write(data)
+        state = {"next_id": new_next_id, "pid": pid}
+        if state != cursor:
+            save_cursor(cursor_path, state)
+
+    result["requests"] = client.requests
+    result["timings"] = client.timings
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: pihole_query_rates
+short_description: Measure per-client and per-domain query rates from the Pi-hole query log
+version_added: "1.1.0"
+description:
+    - Streams GET /queries page by page (newest first, pinned with the
+      C(cursor) of the first page) and computes, in a single pass, the
+      peak number of queries each client and domain sent inside any
+      sliding window of the configured lengths
+    - Pages are processed and discarded as they arrive. Each window is
+      counted in at most 60 buckets per client or domain (one-second
+      buckets for windows up to a minute), and at most I(max_keys)
+      clients and domains are tracked; when that limit is reached the
+      least active half is dropped, so memory stays bounded however
+      many queries are analyzed
+    - The window of C(dns.rateLimit.interval) seconds is always
+      measured. Clients whose peak reaches C(dns.rateLimit.count) are
+      reported in C(flagged); as FTL counts fixed intervals rather than
+      a sliding window, the peak is an upper bound of what FTL sees
+    - Suggests C(FTLCONF_dns_rateLimit_count) and
+      C(FTLCONF_dns_rateLimit_interval) values covering the busiest
+      client not listed in I(ignore_clients), times I(headroom)
+    - Read-only; never reports a change
+options:
+    base_url:
+        description:
+            - Base URL of the Pi-hole API (e.g., http://192.168.1.12:8081/api)
+        required: true
+        type: str
+    password:
+        description:
+            - Pi-hole web password, used to create (and afterwards delete)
+              a session
+        required: false
+        type: str
+    session_id:
+        description:
+            - Existing session ID from previous authentication
+        required: false
+        type: str
+    since:
+        description:
+            - Analyze queries from the last this many seconds
+        required: false
+        type: int
+        default: 3600
+    windows:
+        description:
+            - Additional sliding window lengths in seconds to report peaks
+              for; the rate limit interval is always included
+        required: false
+        type: list
+        elements: int
+        default: []
+    rate_limit_count:
+        description:
+            - Rate limit to test against; read from C(dns.rateLimit) when
+              omitted
+        required: false
+        type: int
+    rate_limit_interval:
+        description:
+            - Rate limit interval in seconds; read from C(dns.rateLimit)
+              when omitted
+        required: false
+        type: int
+    ignore_clients:
+        description:
+            - Client IPs left out of the suggested limit (known noisy
+              clients that should stay rate-limited)
+        required: false
+        type: list
+        elements: str
+        default: []
+    headroom:
+        description:
+            - Factor applied to the busiest client's peak for the suggested
+              count
+        required: false
+        type: float
+        default: 1.5
+    top:
+        description:
+            - Number of clients and domains returned, busiest first
+        required: false
+        type: int
+        default: 10
+    page_size:
+        description:
+            - Queries requested per GET /queries page
+        required: false
+        type: int
+        default: 1000
+    max_queries:
+        description:
+            - Stop after this many queries (newest first)
+        required: false
+        type: int
+        default: 500000
+    max_keys:
+        description:
+            - Most clients and most domains tracked at once
+        required: false
+        type: int
+        default: 5000
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Find clients that would trip the rate limit in the last hour
+  pihole_query_rates:
+    base_url: "http://192.168.1.12:8081/api"
+    password: "{{ vault_pihole_admin_password }}"
+    since: 3600
+  register: rates
+  delegate_to: localhost
+
+- name: Compare 1 s, 1 min and 10 min peaks, ignoring a known noisy client
+  pihole_query_rates:
+    base_url: "http://192.168.1.12:8081/api"
+    session_id: "{{ pihole_session_id }}"
+    since: 86400
+    windows: [1, 60, 600]
+    ignore_clients: ["10.0.0.2"]
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+rate_limit:
+    description: Rate limit the peaks were compared with
+    type: dict
+    returned: always
+    sample: {"count": 1000, "interval": 60}
+windows:
+    description: Window lengths measured, in seconds
+    type: list
+    returned: always
+    sample: [1, 60]
+clients:
+    description: Busiest clients by peak within the rate limit interval
+    type: list
+    returned: always
+    sample:
+        - client: "10.0.0.2"
+          queries: 18000
+          peaks: {"1": 6, "60": 300}
+          would_trip: true
+domains:
+    description: Busiest domains by peak within the rate limit interval
+    type: list
+    returned: always
+    sample:
+        - domain: "telemetry.example.net"
+          queries: 18000
+          peaks: {"1": 6, "60": 300}
+flagged:
+    description: Clients whose peak reached the rate limit count
+    type: list
+    returned: always
+    sample: ["10.0.0.2"]
+suggested:
+    description: Suggested rate limit and the matching FTLCONF_ variables
+    type: dict
+    returned: always
+    sample:
+        count: 500
+        interval: 60
+        env:
+            FTLCONF_dns_rateLimit_count: "500"
+            FTLCONF_dns_rateLimit_interval: "60"
+analyzed:
+    description: >-
+        What was analyzed and the analyzer's own throughput (queries,
+        pages, oldest/newest timestamp, seconds, queries_per_second,
+        truncated when max_queries was reached, evicted keys)
+    type: dict
+    returned: always
+requests:
+    description: HTTP requests made (including login/logout)
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
+"""
+
+import math
+import time
+from collections import deque
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.pihole_client import PiHoleClient, PiHoleError
+
+BUCKETS_PER_WINDOW = 60
+
+
+class SlidingPeak:
+    """Largest number of events inside any ``window``-second span.
+
+    Events must arrive newest first. They are counted in buckets of
+    ``window / 60`` seconds (at least one second), so the peak is exact
+    to within one bucket and at most 60 buckets are held.
+    """
+
+    __slots__ = ("width", "span", "buckets", "current", "peak")
+
+    def __init__(self, window):
+        self.width = max(1.0, float(window) / BUCKETS_PER_WINDOW)
+        self.span = max(1, int(round(window / self.width)))
+        self.buckets = deque()
+        self.current = 0
+        self.peak = 0
+
+    def add(self, timestamp):
+        bucket = int(timestamp // self.width)
+        buckets = self.buckets
+        # Slightly out-of-order (newer) entries join the oldest bucket.
+        if buckets and bucket >= buckets[-1][0]:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([bucket, 1])
+            while buckets[0][0] - bucket >= self.span:
+                self.current -= buckets.popleft()[1]
+        self.current += 1
+        if self.current > self.peak:
+            self.peak = self.current
+
+
+class Tracker:
+    """Per-key totals and sliding peaks for at most ``max_keys`` keys."""
+
+    def __init__(self, windows, max_keys):
+        self.windows = windows
+        self.max_keys = max_keys
+        self.keys = {}
+        self.evicted = 0
+
+    def add(self, key, timestamp):
+        entry = self.keys.get(key)
+        if entry is None:
+            if len(self.keys) >= self.max_keys:
+                self._evict()
+            entry = self.keys[key] = [0] + [
+                SlidingPeak(w) for w in self.windows
+            ]
+        entry[0] += 1
+        for peak in entry[1:]:
+            peak.add(timestamp)
+
+    def _evict(self):
+        # Drop the least active half; they can come back, undercounted.
+        ranked = sorted(self.keys, key=lambda k: self.keys[k][0])
+        for key in ranked[: len(ranked) // 2]:
+            del self.keys[key]
+            self.evicted += 1
+
+    def peak(self, key, index):
+        return self.keys[key][1 + index].peak
+
+    def report(self, name, index, top):
+        """The ``top`` keys by peak in window ``index``."""
+        ranked = sorted(
+            self.keys, key=lambda k: (-self.peak(k, index), -self.keys[k][0])
+        )
+        return [
+            {
+                name: key,
+                "queries": self.keys[key][0],
+                "peaks": dict(
+                    (str(w), self.peak(key, i))
+                    for i, w in enumerate(self.windows)
+                ),
+            }
+            for key in ranked[:top]
+        ]
+
+
+def round_up(value):
+    """Round up to two significant digits (1851 -> 1900, 45 -> 50)."""
+    value = int(math.ceil(value))
+    step = 10 ** max(1, len(str(value)) - 2)
+    return max(step, -(-value // step) * step)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            password=dict(type="str", required=False, no_log=True),
+            session_id=dict(type="str", required=False, no_log=True),
+            since=dict(type="int", default=3600),
+            windows=dict(type="list", elements="int", default=[]),
+            rate_limit_count=dict(type="int", required=False),
+            rate_limit_interval=dict(type="int", required=False),
+            ignore_clients=dict(type="list", elements="str", default=[]),
+            headroom=dict(type="float", default=1.5),
+            top=dict(type="int", default=10),
+            page_size=dict(type="int", default=1000),
+            max_queries=dict(type="int", default=500000),
+            max_keys=dict(type="int", default=5000),
+            validate_certs=dict(type="bool", default=False),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["password", "session_id"]],
+        supports_check_mode=True,
+    )
+    params = module.params
+    if [w for w in params["windows"] if w < 1]:
+        module.fail_json(msg="windows must be positive numbers of seconds")
+
+    client = PiHoleClient(
+        params["base_url"],
+        password=params["password"],
+        session_id=params["session_id"],
+        timeout=params["timeout"],
+        validate_certs=params["validate_certs"],
+    )
+    result = {"changed": False}
+
+    try:
+        limit = {
+            "count": params["rate_limit_count"],
+            "interval": params["rate_limit_interval"],
+        }
+        if limit["count"] is None or limit["interval"] is None:
+            response = client.get("/config/dns/rateLimit")
+            current = response.get("config", {}).get("dns", {})
+            current = current.get("rateLimit", {})
+            for key in ("count", "interval"):
+                if limit[key] is None:
+                    limit[key] = int(current.get(key) or 0)
+        if limit["interval"] < 1:
+            client.close()
+            module.fail_json(
+                msg="dns.rateLimit.interval is 0; pass rate_limit_interval",
+                requests=client.requests,
+            )
+
+        windows = sorted(set(params["windows"]) | set([limit["interval"]]))
+        interval_index = windows.index(limit["interval"])
+        clients = Tracker(windows, params["max_keys"])
+        domains = Tracker(windows, params["max_keys"])
+
+        started = time.monotonic()
+        until = time.time()
+        query = {
+            "from": int(until - params["since"]),
+            "until": int(math.ceil(until)),
+            "length": params["page_size"],
+        }
+        analyzed = {"queries": 0, "pages": 0, "newest": None, "oldest": None}
+        truncated = False
+        while True:
+            response = client.get(
+                "/queries", dict(query, start=analyzed["queries"])
+            )
+            page = response.get("queries") or []
+            analyzed["pages"] += 1
+            if "cursor" not in query and response.get("cursor") is not None:
+                # Pin the page offsets to the first page's newest query.
+                query["cursor"] = response["cursor"]
+            for item in page:
+                timestamp = float(item.get("time") or 0)
+                client_ip = (item.get("client") or {}).get("ip") or "unknown"
+                clients.add(client_ip, timestamp)
+                domains.add(item.get("domain") or "", timestamp)
+                if analyzed["newest"] is None:
+                    analyzed["newest"] = timestamp
+                analyzed["oldest"] = timestamp
+            analyzed["queries"] += len(page)
+            if len(page) < params["page_size"]:
+                break
+            if analyzed["queries"] >= params["max_queries"]:
+                truncated = True
+                break
+
+        seconds = time.monotonic() - started
+        analyzed.update(
+            seconds=round(seconds, 3),
+            queries_per_second=(
+                int(analyzed["queries"] / seconds) if seconds else 0
+            ),
+            truncated=truncated,
+            evicted={"clients": clients.evicted, "domains": domains.evicted},
+        )
+
+        flagged = sorted(
+            key
+            for key in clients.keys
+            if limit["count"]
+            and clients.peak(key, interval_index) >= limit["count"]
+        )
+        busiest = max(
+            [
+                clients.peak(key, interval_index)
+                for key in clients.keys
+                if key not in params["ignore_clients"]
+            ]
+            or [0]
+        )
+        suggested_count = (
+            round_up(busiest * params["headroom"])
+            if busiest
+            else limit["count"]
+        )
+
+        top_clients = clients.report("client", interval_index, params["top"])
+        for entry in top_clients:
+            entry["would_trip"] = entry["client"] in flagged
+
+        result.update(
+            rate_limit=limit,
+            windows=windows,
+            clients=top_clients,
+            domains=domains.report("domain", interval_index, params["top"]),
+            flagged=flagged,
+            suggested={
+                "count": suggested_count,
+                "interval": limit["interval"],
+                "env": {
+                    "FTLCONF_dns_rateLimit_count": str(suggested_count),
+                    "FTLCONF_dns_rateLimit_interval": str(limit["interval"]),
+                },
+            },
+            analyzed=analyzed,
+        )
+    except PiHoleError as e:
+        client.close()
+        result.update(
+            msg=str(e),
+            status_code=e.status,
+            requests=client.requests,
+            timings=client.timings,
+        )
+        module.fail_json(**result)
+
+    client.close()
+    result["requests"] = client.requests
+    result["timings"] = client.timings
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
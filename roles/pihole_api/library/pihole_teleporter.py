@@ -0,0 +1,543 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: pihole_teleporter
+short_description: Incremental Pi-hole teleporter backups in a chunk store
+version_added: "1.1.0"
+description:
+    - Backs up the Pi-hole v6 teleporter archive into a content-addressed
+      store and restores it from there
+    - The archive from GET /teleporter is streamed to a temporary file,
+      split into its member files and each member is stored once,
+      zlib-compressed, under its SHA-256; members that are already in the
+      store are not compressed or written again
+    - Every backup writes a small snapshot manifest (member names, hashes
+      and zip metadata); when no member changed since the latest snapshot
+      no new snapshot is made
+    - Snapshots beyond I(keep) are pruned and objects no longer referenced
+      by any snapshot are deleted
+    - Restore rebuilds the archive from the store into a temporary file
+      and streams it to POST /teleporter; neither direction holds the
+      archive in memory
+options:
+    base_url:
+        description:
+            - Base URL of the Pi-hole API (e.g., http://192.168.1.12:8081/api)
+        required: true
+        type: str
+    password:
+        description:
+            - Pi-hole web password, used to create (and afterwards delete)
+              a session
+        required: false
+        type: str
+    session_id:
+        description:
+            - Existing session ID from previous authentication
+        required: false
+        type: str
+    state:
+        description:
+            - C(backup) stores the current archive, C(restore) imports a
+              stored snapshot into Pi-hole
+        required: false
+        type: str
+        choices: ['backup', 'restore']
+        default: backup
+    dest:
+        description:
+            - Directory of the chunk store (created if missing)
+        required: true
+        type: path
+    keep:
+        description:
+            - Number of snapshots to retain; 0 keeps all of them
+        required: false
+        type: int
+        default: 14
+    snapshot:
+        description:
+            - Snapshot to restore, by ID, or C(latest)
+        required: false
+        type: str
+        default: latest
+    force:
+        description:
+            - Record a snapshot even when no member changed
+        required: false
+        type: bool
+        default: false
+    compression_level:
+        description:
+            - zlib level (1-9) for newly stored objects
+        required: false
+        type: int
+        default: 6
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 120
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Back up Pi-hole into the local chunk store
+  pihole_teleporter:
+    base_url: "http://192.168.1.12:8081/api"
+    password: "{{ vault_pihole_admin_password }}"
+    dest: "~/.local/share/pihole-teleporter"
+    keep: 30
+  delegate_to: localhost
+
+- name: Restore the latest snapshot
+  pihole_teleporter:
+    base_url: "http://192.168.1.12:8081/api"
+    session_id: "{{ pihole_session_id }}"
+    dest: "~/.local/share/pihole-teleporter"
+    state: restore
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+snapshot:
+    description: ID of the snapshot written (backup) or imported (restore)
+    type: str
+    returned: success
+    sample: "20260301T020000Z"
+changed_files:
+    description: Archive members added or changed since the previous snapshot
+    type: list
+    returned: state=backup
+new_objects:
+    description: Number of objects added to the store
+    type: int
+    returned: state=backup
+stored_bytes:
+    description: Compressed bytes added to the store
+    type: int
+    returned: state=backup
+archive_bytes:
+    description: Size of the teleporter archive
+    type: int
+    returned: success
+snapshots:
+    description: Snapshot IDs retained after pruning, oldest first
+    type: list
+    returned: state=backup
+pruned:
+    description: Snapshot IDs removed by retention
+    type: list
+    returned: state=backup
+objects_removed:
+    description: Unreferenced objects deleted after pruning
+    type: int
+    returned: state=backup
+requests:
+    description: HTTP requests made (including login/logout)
+    type: int
+    returned: always
+timings:
+    description: >-
+      Module-internal timings in milliseconds (auth_ms, http_ms, store_ms
+      or build_ms)
+    type: dict
+    returned: always
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+import zlib
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.pihole_client import (
+    CHUNK_SIZE,
+    PiHoleClient,
+    PiHoleError,
+)
+
+INDEX_VERSION = 1
+
+
+class ChunkStore:
+    """Content-addressed object store with snapshot manifests.
+
+    Layout::
+
+        objects/ab/<sha256>.z   zlib-compressed member content
+        snapshots/<id>.json     member list of one archive
+        index.json              snapshot IDs and sizes, oldest first
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.objects = os.path.join(path, "objects")
+        self.snapshots = os.path.join(path, "snapshots")
+        self.index_path = os.path.join(path, "index.json")
+
+    def ensure(self):
+        for directory in (self.path, self.objects, self.snapshots):
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest + ".z")
+
+    def has_object(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put_object(self, digest, chunks, level):
+        """Compress chunks into the object for digest. Returns the number
+        of bytes written."""
+        path = self.object_path(digest)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                compressor = zlib.compressobj(level)
+                for chunk in chunks:
+                    data = compressor.compress(chunk)
+                    handle.write(data)
+                    written += len(data)
+                data = compressor.flush()
+                handle.write(data)
+                written += len(data)
+            os.rename(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return written
+
+    def read_object(self, digest):
+        """Yield the decompressed content of an object in chunks."""
+        decompressor = zlib.decompressobj()
+        with open(self.object_path(digest), "rb") as handle:
+            while True:
+                chunk = handle.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = decompressor.decompress(chunk)
+                if data:
+                    yield data
+        data = decompressor.flush()
+        if data:
+            yield data
+
+    def load_index(self):
+        try:
+            with open(self.index_path) as handle:
+                index = json.load(handle)
+        except (IOError, OSError, ValueError):
+            index = {}
+        index.setdefault("version", INDEX_VERSION)
+        index.setdefault("snapshots", [])
+        return index
+
+    def save_index(self, index):
+        self._write_json(self.index_path, index)
+
+    def load_snapshot(self, snapshot_id):
+        path = os.path.join(self.snapshots, snapshot_id + ".json")
+        with open(path) as handle:
+            return json.load(handle)
+
+    def save_snapshot(self, snapshot_id, manifest):
+        path = os.path.join(self.snapshots, snapshot_id + ".json")
+        self._write_json(path, manifest)
+
+    def delete_snapshot(self, snapshot_id):
+        path = os.path.join(self.snapshots, snapshot_id + ".json")
+        if os.path.exists(path):
+            os.unlink(path)
+
+    def collect_garbage(self, snapshot_ids):
+        """Delete objects not referenced by the given snapshots."""
+        referenced = set()
+        for snapshot_id in snapshot_ids:
+            for member in self.load_snapshot(snapshot_id)["members"]:
+                referenced.add(member["sha256"])
+        removed = 0
+        for prefix in os.listdir(self.objects):
+            directory = os.path.join(self.objects, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith(".z") and name[:-2] not in referenced:
+                    os.unlink(os.path.join(directory, name))
+                    removed += 1
+        return removed
+
+    def _write_json(self, path, data):
+        directory = os.path.dirname(path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(data, handle, indent=2, sort_keys=True)
+        os.rename(tmp_path, path)
+
+
+def read_member(archive, info):
+    with archive.open(info) as handle:
+        while True:
+            chunk = handle.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def hash_chunks(chunks):
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def new_snapshot_id(index):
+    base = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    existing = set(entry["id"] for entry in index["snapshots"])
+    snapshot_id = base
+    counter = 1
+    while snapshot_id in existing:
+        snapshot_id = "%s-%d" % (base, counter)
+        counter += 1
+    return snapshot_id
+
+
+def backup(module, client, store, result):
+    params = module.params
+    index = store.load_index()
+    previous = {}
+    if index["snapshots"]:
+        latest = store.load_snapshot(index["snapshots"][-1]["id"])
+        previous = dict((m["name"], m["sha256"]) for m in latest["members"])
+
+    # A check run against a new dest has no store directory to spool into.
+    spool_dir = store.path if os.path.isdir(store.path) else None
+    with tempfile.TemporaryFile(dir=spool_dir) as archive_file:
+        client.download("/teleporter", archive_file)
+        result["archive_bytes"] = archive_file.tell()
+        archive_file.seek(0)
+
+        started = time.monotonic()
+        try:
+            archive = zipfile.ZipFile(archive_file)
+        except zipfile.BadZipfile as e:
+            raise PiHoleError("Teleporter export is not a zip archive: %s" % e)
+
+        members = []
+        new_objects = 0
+        stored_bytes = 0
+        with archive:
+            for info in archive.infolist():
+                if info.filename.endswith("/"):
+                    continue
+                digest, size = hash_chunks(read_member(archive, info))
+                if not store.has_object(digest) and not module.check_mode:
+                    stored_bytes += store.put_object(
+                        digest,
+                        read_member(archive, info),
+                        params["compression_level"],
+                    )
+                    new_objects += 1
+                members.append(
+                    {
+                        "name": info.filename,
+                        "sha256": digest,
+                        "size": size,
+                        "date_time": list(info.date_time),
+                        "external_attr": info.external_attr,
+                    }
+                )
+        result["timings"]["store_ms"] = (time.monotonic() - started) * 1000
+
+    current = dict((m["name"], m["sha256"]) for m in members)
+    result["changed_files"] = sorted(
+        name
+        for name, digest in current.items()
+        if previous.get(name) != digest
+    )
+    result["removed_files"] = sorted(set(previous) - set(current))
+    result["new_objects"] = new_objects
+    result["stored_bytes"] = stored_bytes
+
+    if not previous or current != previous or params["force"]:
+        result["changed"] = True
+        snapshot_id = new_snapshot_id(index)
+        result["snapshot"] = snapshot_id
+        if not module.check_mode:
+            store.save_snapshot(
+                snapshot_id, {"id": snapshot_id, "members": members}
+            )
+            index["snapshots"].append(
+                {
+                    "id": snapshot_id,
+                    "created": int(time.time()),
+                    "members": len(members),
+                    "archive_bytes": result["archive_bytes"],
+                    "stored_bytes": stored_bytes,
+                }
+            )
+    else:
+        result["snapshot"] = index["snapshots"][-1]["id"]
+
+    pruned = []
+    if params["keep"] > 0 and len(index["snapshots"]) > params["keep"]:
+        pruned = index["snapshots"][: -params["keep"]]
+        index["snapshots"] = index["snapshots"][-params["keep"] :]
+    result["pruned"] = [entry["id"] for entry in pruned]
+    result["snapshots"] = [entry["id"] for entry in index["snapshots"]]
+    result["objects_removed"] = 0
+    if pruned:
+        result["changed"] = True
+
+    if not module.check_mode and (result["changed"] or pruned):
+        store.save_index(index)
+        for entry in pruned:
+            store.delete_snapshot(entry["id"])
+        if pruned:
+            result["objects_removed"] = store.collect_garbage(
+                result["snapshots"]
+            )
+
+
+def restore(module, client, store, result):
+    index = store.load_index()
+    if not index["snapshots"]:
+        raise PiHoleError("No snapshots in %s" % store.path)
+    snapshot_id = module.params["snapshot"]
+    if snapshot_id == "latest":
+        snapshot_id = index["snapshots"][-1]["id"]
+    elif snapshot_id not in [entry["id"] for entry in index["snapshots"]]:
+        raise PiHoleError("Unknown snapshot %s" % snapshot_id)
+    manifest = store.load_snapshot(snapshot_id)
+    result["snapshot"] = snapshot_id
+
+    missing = [
+        m["name"]
+        for m in manifest["members"]
+        if not store.has_object(m["sha256"])
+    ]
+    if missing:
+        raise PiHoleError(
+            "Snapshot %s is missing objects for %s"
+            % (snapshot_id, ", ".join(missing))
+        )
+
+    result["changed"] = True
+    if module.check_mode:
+        return
+
+    with tempfile.TemporaryFile(dir=store.path) as archive_file:
+        started = time.monotonic()
+        with zipfile.ZipFile(archive_file, "w", zipfile.ZIP_DEFLATED) as out:
+            for member in manifest["members"]:
+                info = zipfile.ZipInfo(
+                    member["name"], tuple(member["date_time"])
+                )
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = member["external_attr"]
+                digest = hashlib.sha256()
+                with out.open(info, "w", force_zip64=True) as handle:
+                    for chunk in store.read_object(member["sha256"]):
+                        digest.update(chunk)
+                        handle.write(chunk)
+                if digest.hexdigest() != member["sha256"]:
+                    raise PiHoleError(
+                        "Object for %s is corrupt" % member["name"]
+                    )
+        result["archive_bytes"] = archive_file.tell()
+        result["timings"]["build_ms"] = (time.monotonic() - started) * 1000
+
+        result["response"] = client.upload(
+            "/teleporter",
+            "file",
+            "pihole-teleporter-%s.zip" % snapshot_id,
+            archive_file,
+            "application/zip",
+        )
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            password=dict(type="str", required=False, no_log=True),
+            session_id=dict(type="str", required=False, no_log=True),
+            state=dict(
+                type="str", default="backup", choices=["backup", "restore"]
+            ),
+            dest=dict(type="path", required=True),
+            keep=dict(type="int", default=14),
+            snapshot=dict(type="str", default="latest"),
+            force=dict(type="bool", default=False),
+            compression_level=dict(type="int", default=6),
+            validate_certs=dict(type="bool", default=False),
+            timeout=dict(type="int", default=120),
+        ),
+        required_one_of=[["password", "session_id"]],
+        supports_check_mode=True,
+    )
+
+    if not 1 <= module.params["compression_level"] <= 9:
+        module.fail_json(msg="compression_level must be between 1 and 9")
+
+    store = ChunkStore(module.params["dest"])
+    if not module.check_mode:
+        store.ensure()
+
+    client = PiHoleClient(
+        module.params["base_url"],
+        password=module.params["password"],
+        session_id=module.params["session_id"],
+        timeout=module.params["timeout"],
+        validate_certs=module.params["validate_certs"],
+    )
+    result = {"changed": False, "timings": {}}
+
+    try:
+        if module.params["state"] == "backup":
+            backup(module, client, store, result)
+        else:
+            restore(module, client, store, result)
+    except PiHoleError as e:
+        client.close()
+        result["timings"].update(client.timings)
+        result.update(
+            msg=str(e), status_code=e.status, requests=client.requests
+        )
+        module.fail_json(**result)
+
+    client.close()
+    result["requests"] = client.requests
+    result["timings"].update(client.timings)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
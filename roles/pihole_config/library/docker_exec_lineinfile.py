@@ -106,6 +106,10 @@ msg:
   returned: always
   type: str
   sample: "Line added to file"
+diff:
+  description: File content before and after (with --diff, also in check mode)
+  returned: when the file changed or would change
+  type: dict
 backup_file:
   description: Path to backup file if backup was requested
   returned: when backup=true and file was changed
@@ -113,6 +117,7 @@ backup_file:
   sample: "/tmp/misc.dnsmasq_lines.backup.20240216120000"
 """
 
+import datetime
 import re
 import subprocess
 from ansible.module_utils.basic import AnsibleModule
@@ -158,8 +163,6 @@ def write_file(container_id, path, content):
 
 def create_backup(container_id, path):
     """Create a backup of the file."""
-    import datetime
-
     timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
     backup_path = f"{path}.backup.{timestamp}"
     rc, stdout, stderr = docker_exec(container_id, f"cp {path} {backup_path}")
@@ -180,6 +183,33 @@ def line_present(lines, line, regexp=None):
         return line in [ln.rstrip("\n") for ln in lines], None
 
 
+def file_diff(path, before, after):
+    """Before/after file content in the format of Ansible's --diff."""
+    return {
+        "before": before,
+        "after": after,
+        "before_header": path,
+        "after_header": path,
+    }
+
+
+def apply_change(container_id, path, content, new_content, backup, check_mode):
+    """Write new_content unless in check mode; return a partial result."""
+    result = {"changed": True, "diff": file_diff(path, content, new_content)}
+    if check_mode:
+        return result
+
+    # Create backup if requested
+    if backup:
+        backup_file = create_backup(container_id, path)
+        if backup_file:
+            result["backup_file"] = backup_file
+
+    if not write_file(container_id, path, new_content):
+        return {"changed": False, "msg": f"Failed to update file {path}"}
+    return result
+
+
 def ensure_line_present(
     container_id, path, line, regexp, create, backup, check_mode
 ):
@@ -195,14 +225,10 @@ def ensure_line_present(
             return result
 
         # Create new file with the line
-        if not check_mode:
-            success = write_file(container_id, path, line + "\n")
-            if not success:
-                result["msg"] = f"Failed to create file {path}"
-                return result
-
-        result["changed"] = True
-        result["msg"] = "File created with line"
+        result = apply_change(
+            container_id, path, "", line + "\n", False, check_mode
+        )
+        result.setdefault("msg", "File created with line")
         return result
 
     # Read existing content
@@ -213,60 +239,33 @@ def ensure_line_present(
     present, matching_line = line_present(lines, line, regexp)
 
     if present:
-        # Line already exists
-        if regexp and matching_line != line:
-            # Line matches regexp but is different - replace it
-            if not check_mode:
-                # Create backup if requested
-                if backup:
-                    backup_file = create_backup(container_id, path)
-                    if backup_file:
-                        result["backup_file"] = backup_file
-
-                # Replace the matching line
-                new_lines = []
-                for existing_line in lines:
-                    if regexp and re.match(regexp, existing_line.rstrip("\n")):
-                        new_lines.append(line + "\n")
-                    else:
-                        new_lines.append(existing_line)
-
-                new_content = "".join(new_lines)
-                success = write_file(container_id, path, new_content)
-                if not success:
-                    result["msg"] = f"Failed to update file {path}"
-                    return result
-
-            result["changed"] = True
-            result["msg"] = "Line replaced (regexp matched)"
-            return result
-        else:
+        if not regexp or matching_line == line:
             # Exact line already present
-            result["changed"] = False
             result["msg"] = "Line already present"
             return result
 
-    # Line not present - add it
-    if not check_mode:
-        # Create backup if requested
-        if backup:
-            backup_file = create_backup(container_id, path)
-            if backup_file:
-                result["backup_file"] = backup_file
-
-        # Add the line
-        new_content = content
-        if not content.endswith("\n") and content:
-            new_content += "\n"
-        new_content += line + "\n"
-
-        success = write_file(container_id, path, new_content)
-        if not success:
-            result["msg"] = f"Failed to update file {path}"
-            return result
+        # Line matches regexp but is different - replace it
+        new_lines = []
+        for existing_line in lines:
+            if re.match(regexp, existing_line.rstrip("\n")):
+                new_lines.append(line + "\n")
+            else:
+                new_lines.append(existing_line)
+        result = apply_change(
+            container_id, path, content, "".join(new_lines), backup, check_mode
+        )
+        result.setdefault("msg", "Line replaced (regexp matched)")
+        return result
 
-    result["changed"] = True
-    result["msg"] = "Line added to file"
+    # Line not present - add it
+    new_content = content
+    if not content.endswith("\n") and content:
+        new_content += "\n"
+    new_content += line + "\n"
+    result = apply_change(
+        container_id, path, content, new_content, backup, check_mode
+    )
+    result.setdefault("msg", "Line added to file")
     return result
 
 
@@ -289,29 +288,22 @@ def ensure_line_absent(container_id, path, line, regexp, check_mode):
     present, _ = line_present(lines, line, regexp)
 
     if not present:
-        result["changed"] = False
         result["msg"] = "Line already absent"
         return result
 
     # Remove the line
-    if not check_mode:
-        new_lines = []
-        for existing_line in lines:
-            if regexp:
-                if not re.match(regexp, existing_line.rstrip("\n")):
-                    new_lines.append(existing_line)
-            else:
-                if existing_line.rstrip("\n") != line:
-                    new_lines.append(existing_line)
-
-        new_content = "".join(new_lines)
-        success = write_file(container_id, path, new_content)
-        if not success:
-            result["msg"] = f"Failed to update file {path}"
-            return result
-
-    result["changed"] = True
-    result["msg"] = "Line removed from file"
+    new_lines = []
+    for existing_line in lines:
+        if regexp:
+            if not re.match(regexp, existing_line.rstrip("\n")):
+                new_lines.append(existing_line)
+        else:
+            if existing_line.rstrip("\n") != line:
+                new_lines.append(existing_line)
+    result = apply_change(
+        container_id, path, content, "".join(new_lines), False, check_mode
+    )
+    result.setdefault("msg", "Line removed from file")
     return result
 
 
@@ -363,6 +355,8 @@ def run_module():
                 container_id, path, line, regexp, module.check_mode
             )
 
+        if not module._diff:
+            result.pop("diff", None)
         module.exit_json(**result)
 
     except Exception as e:
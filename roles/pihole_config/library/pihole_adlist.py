@@ -9,6 +9,7 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import subprocess
+import time
 from ansible.module_utils.basic import AnsibleModule
 
 DOCUMENTATION = r'''
@@ -156,7 +157,6 @@ def check_adlist_exists(container_id, url):
 
 def add_adlist(container_id, url, comment, enabled):
     """Add a new adlist to the database"""
-    import time
     timestamp = int(time.time())
     enabled_val = 1 if enabled else 0
     
@@ -178,7 +178,6 @@ VALUES ('{url_escaped}', {enabled_val}, '{comment_escaped}', {timestamp}, {times
 
 def update_adlist(container_id, adlist_id, comment, enabled):
     """Update an existing adlist"""
-    import time
     timestamp = int(time.time())
     enabled_val = 1 if enabled else 0
     
@@ -0,0 +1,451 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import os
+import tempfile
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.adlist_sources import (
+    conditional_requests,
+    fetch_many,
+    iter_domain_file,
+    list_key,
+    load_state,
+    merge_with_owners,
+    refresh_list,
+    save_state,
+    write_domain_file,
+)
+
+DOCUMENTATION = r"""
+---
+module: pihole_adlist_cache
+short_description: Keep deduplicated local copies of Pi-hole adlists
+description:
+    - Downloads adlists concurrently with conditional requests and stores
+      them as normalized, sorted domain files Pi-hole can read through
+      C(file://) URLs, so C(pihole -g) no longer downloads anything
+    - Domains listed by several adlists are written only once, to the
+      first list (in configured order) that contains them
+    - Reports per-list overlap so redundant lists can be dropped
+    - Lists that fail to download keep their previous local copy
+    - C(file://) sources are supported, which allows running the module
+      offline against fixture files
+version_added: "1.1.0"
+options:
+    adlists:
+        description:
+            - Adlists to mirror, in the same format as
+              C(pihole_config_adlists)
+        required: true
+        type: list
+        elements: dict
+    dest:
+        description:
+            - Directory on the managed node the local copies are written to
+            - Must be mounted into the Pi-hole container
+        required: true
+        type: path
+    container_dir:
+        description:
+            - Path of I(dest) inside the Pi-hole container, used to build the
+              returned C(file://) URLs
+            - Defaults to I(dest)
+        required: false
+        type: str
+    layout:
+        description:
+            - C(per_list) writes one file per adlist so Pi-hole keeps
+              per-list statistics
+            - C(combined) writes a single file holding the union of all lists
+        required: false
+        type: str
+        choices: ['per_list', 'combined']
+        default: per_list
+    workers:
+        description:
+            - Number of lists downloaded concurrently
+        required: false
+        type: int
+        default: 8
+    timeout:
+        description:
+            - Download timeout per list in seconds
+        required: false
+        type: int
+        default: 30
+    validate_certs:
+        description:
+            - Verify TLS certificates when downloading lists
+        required: false
+        type: bool
+        default: true
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Mirror adlists next to the Pi-hole configuration
+  pihole_adlist_cache:
+    adlists: "{{ pihole_config_adlists }}"
+    dest: /opt/pihole/etc-pihole/adlists
+    container_dir: /etc/pihole/adlists
+  register: adlist_cache
+
+- name: Point Pi-hole at the local copies
+  pihole_adlist:
+    container_id: "{{ pihole_container_id }}"
+    url: "{{ item.url }}"
+    comment: "{{ item.comment }}"
+  loop: "{{ adlist_cache.adlists }}"
+
+# Offline, against fixture files
+- name: Build a combined list from fixtures
+  pihole_adlist_cache:
+    adlists:
+      - url: "file:///srv/fixtures/hosts-a.txt"
+      - url: "file:///srv/fixtures/hosts-b.txt"
+    dest: /tmp/adlists
+    layout: combined
+"""
+
+RETURN = r"""
+changed:
+    description: Whether any local copy was (or would be) rewritten
+    type: bool
+    returned: always
+adlists:
+    description: >-
+        Adlists to configure in Pi-hole. C(url) is the C(file://) URL
+        inside the container, C(fetch_url) the same file on the managed
+        node (accepted by M(pihole_gravity)) and C(source) the original URL
+    type: list
+    returned: always
+domains:
+    description: Unique domains across all lists
+    type: int
+    returned: always
+duplicates:
+    description: Domain entries dropped because another list had them
+    type: int
+    returned: always
+redundant:
+    description: URLs of lists whose every domain is also in another list
+    type: list
+    returned: always
+lists:
+    description: Per-list fetch and overlap results
+    type: list
+    returned: always
+    contains:
+        url:
+            description: Original adlist URL
+            type: str
+        status:
+            description: >-
+                C(not_modified), C(unchanged), C(modified), C(stale) or
+                C(error)
+            type: str
+        domains:
+            description: Domains in the list after normalization
+            type: int
+        unique:
+            description: Domains no other list contains
+            type: int
+        kept:
+            description: Domains written to this list's local copy
+            type: int
+timings:
+    description: download_ms (wall clock), parse_ms and merge_ms
+    type: dict
+    returned: always
+"""
+
+COMBINED_NAME = "combined.txt"
+
+
+def output_name(url):
+    return list_key(url) + ".txt"
+
+
+class OutputFile:
+    """Sorted domain file written to a temp path and swapped in only if
+    its content differs from the existing file."""
+
+    def __init__(self, path, tmp_dir):
+        self.path = path
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=".tmp-")
+        self.handle = os.fdopen(fd, "w")
+        self.digest = hashlib.sha256()
+
+    def add(self, domain):
+        line = domain + "\n"
+        self.handle.write(line)
+        self.digest.update(line.encode("utf-8"))
+
+    def finish(self, check_mode):
+        """Close the file and return True if the destination changed."""
+        self.handle.close()
+        changed = self.digest.hexdigest() != file_digest(self.path)
+        if changed and not check_mode:
+            os.chmod(self.tmp_path, 0o644)
+            os.rename(self.tmp_path, self.path)
+        else:
+            os.unlink(self.tmp_path)
+        return changed
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    except (IOError, OSError):
+        return None
+    return digest.hexdigest()
+
+
+def write_outputs(module, dest, tmp_dir, entries, sources, layout):
+    """Merge the lists and write the local copies.
+
+    Returns (changed, stats, total) where stats maps each url to its
+    domains/unique/kept counts and total is the number of unique domains.
+    """
+    stats = dict(
+        (entry["url"], {"domains": 0, "unique": 0, "kept": 0})
+        for entry in entries
+    )
+    if layout == "combined":
+        combined = OutputFile(os.path.join(dest, COMBINED_NAME), tmp_dir)
+        outputs = [combined] * len(entries)
+    else:
+        outputs = [
+            OutputFile(os.path.join(dest, output_name(entry["url"])), tmp_dir)
+            for entry in entries
+        ]
+
+    total = 0
+    for domain, owners in merge_with_owners(sources):
+        total += 1
+        for index in owners:
+            stats[entries[index]["url"]]["domains"] += 1
+        if len(owners) == 1:
+            stats[entries[owners[0]]["url"]]["unique"] += 1
+        stats[entries[owners[0]]["url"]]["kept"] += 1
+        outputs[owners[0]].add(domain)
+
+    changed = False
+    for output in set(outputs):
+        changed = output.finish(module.check_mode) or changed
+    return changed, stats, total
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            adlists=dict(type="list", elements="dict", required=True),
+            dest=dict(type="path", required=True),
+            container_dir=dict(type="str"),
+            layout=dict(
+                type="str",
+                default="per_list",
+                choices=["per_list", "combined"],
+            ),
+            workers=dict(type="int", default=8),
+            timeout=dict(type="int", default=30),
+            validate_certs=dict(type="bool", default=True),
+        ),
+        supports_check_mode=True,
+    )
+
+    dest = module.params["dest"]
+    container_dir = (module.params["container_dir"] or dest).rstrip("/")
+    layout = module.params["layout"]
+    lists_dir = os.path.join(dest, ".lists")
+    state_path = os.path.join(dest, ".state.json")
+    if not module.check_mode:
+        try:
+            os.makedirs(lists_dir, mode=0o755, exist_ok=True)
+        except OSError as e:
+            module.fail_json(msg="Failed to create %s: %s" % (lists_dir, e))
+
+    state = load_state(state_path)
+    known_lists = state.get("lists", {})
+
+    entries = []
+    seen = set()
+    for adlist in module.params["adlists"]:
+        url = adlist.get("url")
+        if not url:
+            module.fail_json(msg="Every adlist needs a url: %r" % adlist)
+        if not module.boolean(adlist.get("enabled", True)) or url in seen:
+            continue
+        seen.add(url)
+        entries.append({"url": url, "comment": adlist.get("comment") or url})
+
+    def domain_path(url):
+        return os.path.join(lists_dir, list_key(url) + ".domains")
+
+    timings = {"download_ms": 0, "parse_ms": 0, "merge_ms": 0}
+    started = time.time()
+    fetched = fetch_many(
+        conditional_requests(
+            [entry["url"] for entry in entries], known_lists, domain_path
+        ),
+        workers=module.params["workers"],
+        timeout=module.params["timeout"],
+        validate_certs=module.params["validate_certs"],
+    )
+    timings["download_ms"] = int((time.time() - started) * 1000)
+
+    reports = []
+    new_lists = {}
+    available = []
+    sources = []
+    modified = False
+    for entry in entries:
+        url = entry["url"]
+        report, record, domains = refresh_list(
+            url, fetched[url], known_lists.get(url, {}), domain_path(url)
+        )
+        timings["parse_ms"] += report["parse_ms"]
+        reports.append(report)
+        if report["status"] == "error":
+            module.warn(report["error"])
+            continue
+        if report["status"] == "stale":
+            module.warn("%s; using cached copy" % report["error"])
+        new_lists[url] = record
+        available.append(entry)
+        if domains is None:
+            sources.append(iter_domain_file(domain_path(url)))
+            continue
+        modified = True
+        if module.check_mode:
+            sources.append(iter(sorted(domains)))
+        else:
+            write_domain_file(domain_path(url), domains)
+            sources.append(iter_domain_file(domain_path(url)))
+
+    if layout == "combined":
+        expected = set([COMBINED_NAME]) if available else set()
+    else:
+        expected = set(output_name(entry["url"]) for entry in available)
+
+    previous = state.get("outputs", {})
+    outputs_present = all(
+        os.path.exists(os.path.join(dest, name)) for name in expected
+    )
+    if not available:
+        changed, stats, total = False, {}, 0
+    elif (
+        not modified
+        and outputs_present
+        and previous.get("layout") == layout
+        and previous.get("lists") == [entry["url"] for entry in available]
+    ):
+        # Same lists, same order, same content: the copies are current.
+        changed = False
+        stats = previous.get("stats", {})
+        total = previous.get("domains", 0)
+    else:
+        tmp_dir = lists_dir if not module.check_mode else None
+        started = time.time()
+        try:
+            changed, stats, total = write_outputs(
+                module, dest, tmp_dir, available, sources, layout
+            )
+        except (IOError, OSError) as e:
+            module.fail_json(msg="Failed to write adlist copies: %s" % e)
+        timings["merge_ms"] = int((time.time() - started) * 1000)
+
+    stale_outputs = []
+    if os.path.isdir(dest):
+        for name in os.listdir(dest):
+            if name.endswith(".txt") and name not in expected:
+                stale_outputs.append(os.path.join(dest, name))
+    if stale_outputs:
+        changed = True
+        if not module.check_mode:
+            for path in stale_outputs:
+                os.unlink(path)
+
+    if not module.check_mode:
+        keep = set(list_key(url) + ".domains" for url in new_lists)
+        for name in os.listdir(lists_dir):
+            if name.endswith(".domains") and name not in keep:
+                os.unlink(os.path.join(lists_dir, name))
+        save_state(
+            state_path,
+            {
+                "version": 1,
+                "lists": new_lists,
+                "outputs": {
+                    "layout": layout,
+                    "lists": [entry["url"] for entry in available],
+                    "stats": stats,
+                    "domains": total,
+                },
+            },
+        )
+
+    if layout == "combined":
+        adlists = []
+        if available:
+            adlists.append(
+                {
+                    "url": "file://%s/%s" % (container_dir, COMBINED_NAME),
+                    "fetch_url": "file://%s/%s" % (dest, COMBINED_NAME),
+                    "comment": "Combined adlist cache (%d lists)"
+                    % len(available),
+                    "enabled": True,
+                    "source": [entry["url"] for entry in available],
+                }
+            )
+    else:
+        adlists = [
+            {
+                "url": "file://%s/%s"
+                % (container_dir, output_name(entry["url"])),
+                "fetch_url": "file://%s/%s"
+                % (dest, output_name(entry["url"])),
+                "comment": entry["comment"],
+                "enabled": True,
+                "source": entry["url"],
+            }
+            for entry in available
+        ]
+
+    for report in reports:
+        report.update(stats.get(report["url"], {}))
+    listed = sum(stats.get(url, {}).get("domains", 0) for url in new_lists)
+
+    module.exit_json(
+        changed=changed,
+        adlists=adlists,
+        domains=total,
+        duplicates=listed - total,
+        redundant=[
+            url
+            for url in new_lists
+            if stats.get(url, {}).get("domains")
+            and not stats[url].get("unique")
+        ],
+        lists=reports,
+        timings=timings,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: pihole_dns_records
+short_description: Sync Pi-hole local DNS and CNAME records through the API
+version_added: "1.1.0"
+description:
+    - Manages the Pi-hole v6 C(dns.hosts) and C(dns.cnameRecords) settings
+      as sets, so only records that were added or removed are written
+    - Reads both arrays with a single GET /config/dns and diffs them
+      locally; nothing is written (and DNS is not reloaded) when they
+      already match
+    - A single changed record is applied with the per-element endpoint
+      (PUT or DELETE /config/dns/{hosts,cnameRecords}/{value}); several
+      changes are applied together with one PATCH /config containing
+      only the arrays that changed
+    - Records not listed are kept unless I(purge) is set; an array whose
+      option (I(hosts) or I(cnames)) is not passed is left untouched
+options:
+    base_url:
+        description:
+            - Base URL of the Pi-hole API (e.g., http://192.168.1.12:8081/api)
+        required: true
+        type: str
+    password:
+        description:
+            - Pi-hole web password, used to create (and afterwards delete)
+              a session
+        required: false
+        type: str
+    session_id:
+        description:
+            - Existing session ID from previous authentication
+        required: false
+        type: str
+    hosts:
+        description:
+            - Desired local DNS records
+            - Each item is a dict with C(ip) and C(hostname)
+            - When omitted, C(dns.hosts) is neither changed nor purged
+        required: false
+        type: list
+        elements: dict
+    cnames:
+        description:
+            - Desired CNAME records
+            - Each item is a dict with C(domain), C(target) and an optional
+              C(ttl)
+            - When omitted, C(dns.cnameRecords) is neither changed nor purged
+        required: false
+        type: list
+        elements: dict
+    purge:
+        description:
+            - Remove records that are not in I(hosts) or I(cnames), for
+              the options that are passed
+        required: false
+        type: bool
+        default: true
+    validate_certs:
+        description:
+            - Whether to validate SSL certificates
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Request timeout in seconds
+        required: false
+        type: int
+        default: 30
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Sync local DNS records
+  pihole_dns_records:
+    base_url: "http://192.168.1.12:8081/api"
+    password: "{{ vault_pihole_admin_password }}"
+    hosts:
+      - ip: "192.168.1.10"
+        hostname: "pihole.local"
+      - ip: "192.168.1.10"
+        hostname: "portainer.local"
+    cnames:
+      - domain: "jellyfin.local"
+        target: "lenovo.local"
+  delegate_to: localhost
+
+- name: Add records without touching existing ones
+  pihole_dns_records:
+    base_url: "http://192.168.1.12:8081/api"
+    session_id: "{{ pihole_session_id }}"
+    hosts: "{{ extra_hosts }}"
+    purge: false
+  delegate_to: localhost
+"""
+
+RETURN = r"""
+hosts:
+    description: Added and removed C(dns.hosts) entries
+    type: dict
+    returned: always
+    sample: {"added": ["192.168.1.10 pihole.local"], "removed": []}
+cnames:
+    description: Added and removed C(dns.cnameRecords) entries
+    type: dict
+    returned: always
+    sample: {"added": [], "removed": ["old.local,lenovo.local"]}
+method:
+    description: How changes were written (C(none), C(element) or C(patch))
+    type: str
+    returned: always
+requests:
+    description: HTTP requests made (including login/logout)
+    type: int
+    returned: always
+timings:
+    description: Module-internal timings in milliseconds (auth_ms, http_ms)
+    type: dict
+    returned: always
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.pihole_client import (
+    PiHoleClient,
+    PiHoleError,
+    quote_path,
+)
+
+# Module option -> dns.* config key
+RECORD_KEYS = (("hosts", "hosts"), ("cnames", "cnameRecords"))
+
+
+def host_entry(item, module):
+    ip = str(item.get("ip") or "").strip()
+    hostname = str(item.get("hostname") or "").strip().lower()
+    if not ip or not hostname:
+        module.fail_json(msg="Host records need ip and hostname: %r" % item)
+    return "%s %s" % (ip, hostname)
+
+
+def cname_entry(item, module):
+    domain = str(item.get("domain") or "").strip().lower()
+    target = str(item.get("target") or "").strip().lower()
+    if not domain or not target:
+        module.fail_json(msg="CNAME records need domain and target: %r" % item)
+    entry = "%s,%s" % (domain, target)
+    if item.get("ttl") is not None:
+        entry += ",%d" % int(item["ttl"])
+    return entry
+
+
+def canonical(entry, key):
+    """Normalize an entry read from Pi-hole so it compares equal to the
+    form built from module options."""
+    if key == "hosts":
+        fields = entry.split()
+        return " ".join(fields[:1] + [f.lower() for f in fields[1:]])
+    parts = [p.strip() for p in entry.split(",")]
+    return ",".join([p.lower() for p in parts[:2]] + parts[2:])
+
+
+def plan(current, desired, purge):
+    """Return (new list, added, removed) for one dns.* array.
+
+    Existing entries keep their order; new ones are appended in the
+    order they were requested.
+    """
+    wanted = set(desired)
+    seen = set()
+    kept = []
+    removed = []
+    for entry in current:
+        if entry in wanted or not purge:
+            if entry not in seen:
+                kept.append(entry)
+                seen.add(entry)
+        else:
+            removed.append(entry)
+    added = []
+    for entry in desired:
+        if entry not in seen:
+            added.append(entry)
+            seen.add(entry)
+    return kept + added, added, removed
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            base_url=dict(type="str", required=True),
+            password=dict(type="str", required=False, no_log=True),
+            session_id=dict(type="str", required=False, no_log=True),
+            hosts=dict(type="list", elements="dict"),
+            cnames=dict(type="list", elements="dict"),
+            purge=dict(type="bool", default=True),
+            validate_certs=dict(type="bool", default=False),
+            timeout=dict(type="int", default=30),
+        ),
+        required_one_of=[["password", "session_id"]],
+        supports_check_mode=True,
+    )
+
+    # Arrays whose option is not passed are left as they are.
+    desired = {}
+    if module.params["hosts"] is not None:
+        desired["hosts"] = [
+            host_entry(item, module) for item in module.params["hosts"]
+        ]
+    if module.params["cnames"] is not None:
+        desired["cnameRecords"] = [
+            cname_entry(item, module) for item in module.params["cnames"]
+        ]
+
+    client = PiHoleClient(
+        module.params["base_url"],
+        password=module.params["password"],
+        session_id=module.params["session_id"],
+        timeout=module.params["timeout"],
+        validate_certs=module.params["validate_certs"],
+    )
+    result = {"changed": False, "method": "none"}
+
+    try:
+        response = client.get("/config/dns")
+        dns = response.get("config", {}).get("dns", {})
+
+        patch = {}
+        operations = []
+        for option, key in RECORD_KEYS:
+            result[option] = {"added": [], "removed": []}
+            if key not in desired:
+                continue
+            current = [canonical(e, key) for e in dns.get(key) or []]
+            new, added, removed = plan(
+                current, desired[key], module.params["purge"]
+            )
+            result[option] = {"added": added, "removed": removed}
+            if added or removed:
+                patch[key] = new
+                operations.extend(("DELETE", key, e) for e in removed)
+                operations.extend(("PUT", key, e) for e in added)
+
+        result["changed"] = bool(operations)
+        if len(operations) == 1:
+            result["method"] = "element"
+        elif operations:
+            result["method"] = "patch"
+
+        if operations and not module.check_mode:
+            if len(operations) == 1:
+                method, key, entry = operations[0]
+                client.request(
+                    method, "/config/dns/%s/%s" % (key, quote_path(entry))
+                )
+            else:
+                client.patch("/config", {"config": {"dns": patch}})
+    except PiHoleError as e:
+        client.close()
+        result.update(
+            msg=str(e),
+            status_code=e.status,
+            requests=client.requests,
+            timings=client.timings,
+        )
+        module.fail_json(**result)
+
+    client.close()
+    result["requests"] = client.requests
+    result["timings"] = client.timings
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import subprocess
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.adlist_sources import (
+    conditional_requests,
+    domain_set_digest,
+    fetch_many,
+    iter_domain_file,
+    list_key,
+    load_state,
+    refresh_list,
+    save_state,
+    write_domain_file,
+)
+
+DOCUMENTATION = r"""
+---
+module: pihole_gravity
+short_description: Rebuild Pi-hole gravity only when blocked domains change
+description:
+    - Downloads every enabled adlist concurrently with conditional
+      requests (ETag and Last-Modified) and records a content hash per list
+    - Normalizes each list to its set of domains and hashes the union of
+      all lists
+    - Runs C(pihole -g) inside the container only when that union differs
+      from the one the last rebuild was made from
+    - Comment, header and ordering changes in a list, as well as adlist
+      comment edits in the inventory, never trigger a rebuild
+    - Pi-hole itself has no per-list refresh, so when a rebuild is needed
+      it is a full one; this module decides whether one is needed at all
+version_added: "1.1.0"
+options:
+    container_id:
+        description:
+            - Docker container ID or name where Pi-hole is running
+        required: true
+        type: str
+    adlists:
+        description:
+            - Adlists Pi-hole is configured with, in the same format as
+              C(pihole_config_adlists)
+            - Only C(url), C(enabled) and C(fetch_url) are used; when
+              C(fetch_url) is set (as returned by M(pihole_adlist_cache))
+              the list is read from there instead of C(url)
+        required: true
+        type: list
+        elements: dict
+    state_dir:
+        description:
+            - Directory on the managed node holding per-list validators,
+              normalized domain files and the digest of the last rebuild
+        required: false
+        type: path
+        default: ~/.cache/pihole-gravity
+    force:
+        description:
+            - Rebuild gravity even if the domain set is unchanged
+        required: false
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Download timeout per list in seconds
+        required: false
+        type: int
+        default: 30
+    workers:
+        description:
+            - Number of lists downloaded concurrently
+        required: false
+        type: int
+        default: 8
+    validate_certs:
+        description:
+            - Verify TLS certificates when downloading lists
+        required: false
+        type: bool
+        default: true
+    gravity_command:
+        description:
+            - Command run inside the container to rebuild gravity
+        required: false
+        type: str
+        default: pihole -g
+author:
+    - Homelab Ansible
+"""
+
+EXAMPLES = r"""
+- name: Update Pi-hole gravity if the blocked domains changed
+  pihole_gravity:
+    container_id: "{{ pihole_container_id }}"
+    adlists: "{{ pihole_config_adlists }}"
+  register: gravity_update
+
+- name: Force a rebuild
+  pihole_gravity:
+    container_id: "{{ pihole_container_id }}"
+    adlists: "{{ pihole_config_adlists }}"
+    force: true
+"""
+
+RETURN = r"""
+changed:
+    description: Whether gravity was (or in check mode would be) rebuilt
+    type: bool
+    returned: always
+rebuilt:
+    description: Whether the gravity command was actually run
+    type: bool
+    returned: always
+reason:
+    description: Why gravity was or was not rebuilt
+    type: str
+    returned: always
+digest:
+    description: SHA-256 of the sorted union of all enabled lists
+    type: str
+    returned: always
+domains:
+    description: Number of unique domains across all enabled lists
+    type: int
+    returned: always
+lists:
+    description: Per-list fetch results
+    type: list
+    returned: always
+    contains:
+        url:
+            description: Adlist URL
+            type: str
+        status:
+            description: >-
+                C(not_modified) (HTTP 304), C(unchanged) (same content
+                hash), C(modified), C(stale) (download failed, cached
+                copy used) or C(error) (download failed, no cached copy)
+            type: str
+        domains:
+            description: Number of domains in the list
+            type: int
+        bytes:
+            description: Bytes downloaded
+            type: int
+        download_ms:
+            description: Time spent downloading the list
+            type: int
+        parse_ms:
+            description: Time spent normalizing the list
+            type: int
+timings:
+    description: >-
+        download_ms (wall clock for all lists), parse_ms, merge_ms
+        (hashing the union) and
+        gravity_ms (rebuild) in milliseconds
+    type: dict
+    returned: always
+stdout:
+    description: Output of the gravity command
+    type: str
+    returned: when gravity was rebuilt
+"""
+
+
+def run_docker_exec(container_id, command):
+    """Execute a command inside the Docker container"""
+    try:
+        result = subprocess.run(
+            ["docker", "exec", container_id, "bash", "-c", command],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip(), None
+    except subprocess.CalledProcessError as e:
+        return None, (e.stderr or e.stdout or str(e)).strip()
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            container_id=dict(type="str", required=True),
+            adlists=dict(type="list", elements="dict", required=True),
+            state_dir=dict(type="path", default="~/.cache/pihole-gravity"),
+            force=dict(type="bool", default=False),
+            timeout=dict(type="int", default=30),
+            workers=dict(type="int", default=8),
+            validate_certs=dict(type="bool", default=True),
+            gravity_command=dict(type="str", default="pihole -g"),
+        ),
+        supports_check_mode=True,
+    )
+
+    state_dir = module.params["state_dir"]
+    lists_dir = os.path.join(state_dir, "lists")
+    state_path = os.path.join(state_dir, "state.json")
+    if not module.check_mode:
+        try:
+            os.makedirs(lists_dir, mode=0o755, exist_ok=True)
+        except OSError as e:
+            module.fail_json(msg="Failed to create %s: %s" % (lists_dir, e))
+
+    state = load_state(state_path)
+    known_lists = state.get("lists", {})
+    gravity = state.get("gravity", {})
+    union = state.get("union", {})
+
+    urls = []
+    for adlist in module.params["adlists"]:
+        url = adlist.get("fetch_url") or adlist.get("url")
+        if not url:
+            module.fail_json(msg="Every adlist needs a url: %r" % adlist)
+        if module.boolean(adlist.get("enabled", True)) and url not in urls:
+            urls.append(url)
+
+    def domain_path(url):
+        return os.path.join(lists_dir, list_key(url) + ".domains")
+
+    timings = {"download_ms": 0, "parse_ms": 0, "merge_ms": 0}
+    started = time.time()
+    fetched = fetch_many(
+        conditional_requests(urls, known_lists, domain_path),
+        workers=module.params["workers"],
+        timeout=module.params["timeout"],
+        validate_certs=module.params["validate_certs"],
+    )
+    timings["download_ms"] = int((time.time() - started) * 1000)
+
+    reports = []
+    new_lists = {}
+    sources = []
+    modified = False
+    for url in urls:
+        report, record, domains = refresh_list(
+            url, fetched[url], known_lists.get(url, {}), domain_path(url)
+        )
+        timings["parse_ms"] += report["parse_ms"]
+        reports.append(report)
+        if report["status"] == "error":
+            module.warn(report["error"])
+            continue
+        if report["status"] == "stale":
+            module.warn("%s; using cached copy" % report["error"])
+        new_lists[url] = record
+        if domains is None:
+            sources.append((iter_domain_file, domain_path(url)))
+            continue
+        modified = True
+        if module.check_mode:
+            sources.append((iter, sorted(domains)))
+        else:
+            write_domain_file(domain_path(url), domains)
+            sources.append((iter_domain_file, domain_path(url)))
+
+    if (
+        not modified
+        and union.get("digest")
+        and union.get("lists") == sorted(new_lists)
+    ):
+        # Same lists with the same content as last run: the union is too.
+        digest, total = union["digest"], union.get("domains", 0)
+    else:
+        started = time.time()
+        digest, total = domain_set_digest(
+            opener(source) for opener, source in sources
+        )
+        timings["merge_ms"] = int((time.time() - started) * 1000)
+    union = {"digest": digest, "domains": total, "lists": sorted(new_lists)}
+
+    if module.params["force"]:
+        reason = "Rebuild forced"
+    elif not gravity.get("digest"):
+        reason = "No previous rebuild recorded"
+    elif gravity["digest"] != digest:
+        reason = "Blocked domain set changed (%d -> %d domains)" % (
+            gravity.get("domains", 0),
+            total,
+        )
+    else:
+        reason = None
+
+    result = {
+        "changed": reason is not None,
+        "rebuilt": False,
+        "reason": reason or "Blocked domain set unchanged",
+        "digest": digest,
+        "domains": total,
+        "lists": reports,
+        "timings": timings,
+    }
+
+    error = None
+    if reason is not None and not module.check_mode:
+        started = time.time()
+        stdout, error = run_docker_exec(
+            module.params["container_id"], module.params["gravity_command"]
+        )
+        timings["gravity_ms"] = int((time.time() - started) * 1000)
+        if error is None:
+            result["rebuilt"] = True
+            result["stdout"] = stdout
+            gravity = {
+                "digest": digest,
+                "domains": total,
+                "lists": union["lists"],
+                "updated": int(time.time()),
+            }
+
+    if not module.check_mode:
+        # Drop domain files of lists that are no longer configured.
+        keep = set(list_key(url) + ".domains" for url in new_lists)
+        for name in os.listdir(lists_dir):
+            if name.endswith(".domains") and name not in keep:
+                os.unlink(os.path.join(lists_dir, name))
+        # A failed rebuild keeps the previous gravity digest, so the next
+        # run sees the difference and retries.
+        save_state(
+            state_path,
+            {
+                "version": 1,
+                "lists": new_lists,
+                "union": union,
+                "gravity": gravity,
+            },
+        )
+
+    if error is not None:
+        result["msg"] = "Gravity update failed: %s" % error
+        module.fail_json(**result)
+
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Check the import cost of the custom modules against a startup budget.
+
+Usage (from the repository root, with ansible-core installed):
+    python3 tools/import_budget.py                  # all modules
+    python3 tools/import_budget.py pihole_api       # only some
+    python3 tools/import_budget.py -v --runs 9      # show the heaviest imports
+
+Every module is imported from its file in a fresh interpreter after
+ansible.module_utils.basic, which all of them need and which is not
+counted. What is measured is the module's own cost: its top-level imports
+(standard library and module_utils) plus running the module body. The
+best of --runs runs is compared with the budget (--budget-ms, BUDGETS for
+per-module exceptions). For modules over budget, or with -v, one more run
+under ``python -X importtime`` lists the imports that cost the most.
+
+Exits non-zero when a module is over its budget.
+"""
+
+import argparse
+import glob
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = 10.0
+
+# Modules whose work needs a heavier standard library module at import
+# time; keep this list short.
+BUDGETS = {
+    # zipfile, to unpack and rebuild Teleporter archives.
+    "pihole_teleporter": 15.0,
+}
+
+# Runs in the child interpreter; argv: repository root, module file.
+PROBE = r"""
+import importlib.util, sys, time
+import ansible.module_utils
+ansible.module_utils.__path__.append(sys.argv[1] + "/module_utils")
+import ansible.module_utils.basic
+sys.stderr.write("import-budget-start\n")
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("import_budget_probe", sys.argv[2])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+sys.stdout.write("%.3f\n" % ((time.perf_counter() - started) * 1000))
+"""
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def module_files(names):
+    paths = sorted(
+        glob.glob(os.path.join(REPO_ROOT, "library", "*.py"))
+        + glob.glob(os.path.join(REPO_ROOT, "roles", "*", "library", "*.py"))
+    )
+    modules = dict(
+        (os.path.splitext(os.path.basename(path))[0], path) for path in paths
+    )
+    if not names:
+        return modules
+    unknown = [name for name in names if name not in modules]
+    if unknown:
+        raise SystemExit("Unknown module(s): %s" % ", ".join(unknown))
+    return dict((name, modules[name]) for name in names)
+
+
+def probe(path, importtime=False):
+    """Import one module file in a fresh interpreter.
+
+    Returns (milliseconds, stderr lines after the start marker).
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE, REPO_ROOT, path]
+    proc = subprocess.run(
+        command,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        universal_newlines=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    lines = proc.stderr.splitlines()
+    if "import-budget-start" in lines:
+        lines = lines[lines.index("import-budget-start") + 1 :]
+    return float(proc.stdout.strip().splitlines()[-1]), lines
+
+
+def heaviest(lines, count):
+    """Top-level imports after the marker, by cumulative microseconds."""
+    imports = []
+    for line in lines:
+        match = IMPORTTIME_RE.match(line)
+        if match and not match.group(3):
+            imports.append((int(match.group(2)), match.group(4)))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("modules", nargs="*", help="Module names to check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Import budget per module without a BUDGETS entry",
+    )
+    parser.add_argument(
+        "--top", type=int, default=5, help="Imports listed per module"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    over = []
+    print("%-30s %10s %10s" % ("module", "import ms", "budget ms"))
+    print("-" * 52)
+    for name, path in sorted(module_files(args.modules).items()):
+        budget = BUDGETS.get(name, args.budget_ms)
+        try:
+            best = min(probe(path)[0] for _ in range(args.runs))
+        except RuntimeError as e:
+            print("%-30s %10s %10.1f  %s" % (name, "error", budget, e))
+            over.append(name)
+            continue
+        failed = best > budget
+        print(
+            "%-30s %10.1f %10.1f%s"
+            % (name, best, budget, "  OVER BUDGET" if failed else "")
+        )
+        if failed:
+            over.append(name)
+        if failed or args.verbose:
+            for micros, imported in heaviest(probe(path, True)[1], args.top):
+                print("    %8.1f ms  %s" % (micros / 1000.0, imported))
+        sys.stdout.flush()
+
+    print()
+    if over:
+        print("Over budget: %s" % ", ".join(over))
+        return 1
+    print("All modules within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Persistent module worker, started on a target by the homelab_worker
+action plugin (action_plugins/homelab_worker.py).
+
+Usage (normally only by the plugin's bootstrap):
+    python3 module_worker.py SOCKET IDLE_SECONDS
+
+The worker listens on a Unix socket in a directory only its user can
+enter. Each request carries the client's environment and working
+directory, the module's fully qualified name, its JSON parameters and the
+base64 module_utils zip of the AnsiballZ payload. The worker keeps every
+zip it has seen on sys.path and the module and its imports loaded, then
+forks a child per request that runs the module exactly like the AnsiballZ
+wrapper would (basic._ANSIBLE_ARGS plus runpy as __main__), with fds 0-2
+redirected, and answers with ``b"<rc> <len stdout> <len stderr>\\n"``
+followed by both streams.
+
+A zip that ships a different version of an already imported file cannot
+be served from this process: the worker then answers ``restart`` and
+exits, so the plugin starts a fresh one. The worker
+also exits after IDLE_SECONDS without a request.
+"""
+
+import atexit
+import base64
+import hashlib
+import importlib
+import io
+import json
+import os
+import runpy
+import signal
+import socket
+import sys
+import tempfile
+import traceback
+import zipfile
+
+MAX_REQUEST = 256 * 1024 * 1024
+
+
+class Worker:
+    def __init__(self, socket_path, idle):
+        self.socket_path = socket_path
+        self.directory = os.path.dirname(socket_path)
+        self.zip_dir = os.path.join(self.directory, "zips")
+        self.idle = idle
+        self.inode = None
+        self.loaded = {}
+        self.entries = {}
+
+    def serve(self):
+        if not os.path.isdir(self.zip_dir):
+            os.mkdir(self.zip_dir, 0o700)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.inode = os.stat(self.socket_path).st_ino
+        server.listen(16)
+        server.settimeout(self.idle)
+        with open(self.socket_path + ".pid", "w") as handle:
+            handle.write("%d\n" % os.getpid())
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    return
+                try:
+                    if not self.handle(conn):
+                        return
+                finally:
+                    conn.close()
+        finally:
+            server.close()
+            self.cleanup()
+
+    def cleanup(self):
+        # A replacement worker may already own the socket path.
+        try:
+            if os.stat(self.socket_path).st_ino == self.inode:
+                os.unlink(self.socket_path)
+                os.unlink(self.socket_path + ".pid")
+        except OSError:
+            pass
+        for name in os.listdir(self.zip_dir):
+            try:
+                os.unlink(os.path.join(self.zip_dir, name))
+            except OSError:
+                pass
+
+    def handle(self, conn):
+        """Serve one request; return False when the worker must exit."""
+        conn.settimeout(60)
+        try:
+            client, job, zipdata = read_request(conn)
+            if not self.load(job["sha1"], zipdata, job["fqn"]):
+                conn.sendall(b"restart\n")
+                return False
+        except (OSError, ValueError, KeyError, zipfile.BadZipfile) as e:
+            respond(conn, 1, b"", ("module worker: %s\n" % e).encode())
+            return True
+        if os.fork() == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                run_job(conn, client, job, self.loaded[job["sha1"]])
+                code = 0
+            finally:
+                os._exit(code)
+        return True
+
+    def load(self, sha1, zipdata, fqn):
+        """Put the zip on the import path and preload the module."""
+        if sha1 in self.loaded:
+            return True
+        path = os.path.join(self.zip_dir, sha1 + ".zip")
+        if hashlib.sha1(zipdata).hexdigest() != sha1:
+            raise ValueError("zip checksum mismatch")
+        data = base64.b64decode(zipdata)
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            entries = dict((i.filename, i.CRC) for i in archive.infolist())
+        for name, crc in entries.items():
+            if self.entries.get(name, crc) != crc:
+                return False
+        with open(path, "wb") as handle:
+            handle.write(data)
+        self.entries.update(entries)
+        self.loaded[sha1] = path
+
+        if "ansible" not in sys.modules:
+            sys.path.insert(0, path)
+        else:
+            # Later zips add module_utils the first one did not have.
+            for name, module in list(sys.modules.items()):
+                if name.split(".")[0] != "ansible":
+                    continue
+                prefix = name.replace(".", "/") + "/"
+                search = getattr(module, "__path__", None)
+                if search is not None and any(
+                    entry.startswith(prefix) for entry in entries
+                ):
+                    search.append(os.path.join(path, prefix.rstrip("/")))
+        try:
+            importlib.import_module("ansible.module_utils.basic")
+            importlib.import_module(fqn)
+        except Exception:
+            # The child runs the module anyway and reports the error.
+            pass
+        sys.modules.pop(fqn, None)
+        return True
+
+
+def read_request(conn):
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(1024 * 1024)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > MAX_REQUEST:
+            raise ValueError("request too large")
+    data = b"".join(chunks)
+    client_line, job_line, zipdata = data.split(b"\n", 2)
+    return json.loads(client_line), json.loads(job_line), zipdata.strip()
+
+
+def respond(conn, rc, stdout, stderr):
+    conn.sendall(b"%d %d %d\n" % (rc, len(stdout), len(stderr)))
+    conn.sendall(stdout)
+    conn.sendall(stderr)
+
+
+def run_job(conn, client, job, modlib_path):
+    """Run one module in this (forked) process and send the result."""
+    os.environ.clear()
+    os.environ.update(client["env"])
+    try:
+        os.chdir(client["cwd"])
+    except OSError:
+        os.chdir(os.path.expanduser("~"))
+    out = tempfile.TemporaryFile()
+    err = tempfile.TemporaryFile()
+    null = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null, 0)
+    os.dup2(out.fileno(), 1)
+    os.dup2(err.fileno(), 2)
+
+    rc = 0
+    try:
+        from ansible.module_utils import basic
+
+        basic._ANSIBLE_ARGS = job["params"].encode("utf-8")
+        sys.argv = [job["fqn"]]
+        runpy.run_module(
+            mod_name=job["fqn"],
+            init_globals=dict(
+                _module_fqn=job["fqn"], _modlib_path=modlib_path
+            ),
+            run_name="__main__",
+            alter_sys=True,
+        )
+        print(
+            '{"msg": "New-style module did not handle its own exit", '
+            '"failed": true}'
+        )
+        rc = 1
+    except SystemExit as e:
+        if e.code is None:
+            rc = 0
+        elif isinstance(e.code, int):
+            rc = e.code
+        else:
+            sys.stderr.write("%s\n" % e.code)
+            rc = 1
+    except BaseException:
+        traceback.print_exc()
+        rc = 1
+    try:
+        atexit._run_exitfuncs()
+    except Exception:
+        traceback.print_exc()
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    out.seek(0)
+    err.seek(0)
+    respond(conn, rc, out.read(), err.read())
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.stderr.write(__doc__)
+        return 2
+    socket_path = os.path.abspath(sys.argv[1])
+    directory = os.path.dirname(socket_path)
+    info = os.lstat(directory)
+    if info.st_uid != os.geteuid() or info.st_mode & 0o077:
+        sys.stderr.write("%s must be private to this user\n" % directory)
+        return 1
+    Worker(socket_path, float(sys.argv[2])).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
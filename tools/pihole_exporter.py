@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Serve Pi-hole v6 statistics in the Prometheus text format.
+
+One PiHoleClient session is kept for the lifetime of the process (it is
+renewed automatically when FTL expires it) and /stats/* is polled on a
+fixed interval. Scrapes are answered from the output rendered after the
+last poll, so any number of Prometheus servers or dashboards can scrape
+without adding load on Pi-hole. The top client/domain lists change
+slowly and are only refreshed every ``--slow-every`` polls; their
+last response is cached in between.
+
+Usage:
+    PIHOLE_PASSWORD=... python3 tools/pihole_exporter.py \\
+        --url http://192.168.1.10:8081/api [--port 9617] [--interval 15]
+    python3 tools/pihole_exporter.py --url ... --once   # print and exit
+
+Every option can also be set through the environment variable shown in
+``--help``. Only the standard library, module_utils/pihole_client.py and
+module_utils/http_transport.py are needed; when deployed the three files
+sit in the same directory.
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [HERE, os.path.join(os.path.dirname(HERE), "module_utils")]
+
+from pihole_client import PiHoleClient, PiHoleError  # noqa: E402
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+log = logging.getLogger("pihole_exporter")
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def number(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class Metrics:
+    """Accumulates samples and renders them grouped by metric family."""
+
+    def __init__(self):
+        self.lines = []
+
+    def add(self, name, help_text, kind, samples):
+        """Add one family; ``samples`` is a list of (labels, value).
+        Samples whose value is missing are skipped."""
+        samples = [(labels, v) for labels, v in samples if v is not None]
+        if not samples:
+            return
+        self.lines.append("# HELP %s %s" % (name, help_text))
+        self.lines.append("# TYPE %s %s" % (name, kind))
+        for labels, value in samples:
+            label_text = ""
+            if labels:
+                label_text = "{%s}" % ",".join(
+                    '%s="%s"' % (k, escape(v)) for k, v in labels
+                )
+            self.lines.append("%s%s %s" % (name, label_text, number(value)))
+
+    def gauge(self, name, help_text, value):
+        self.add(name, help_text, "gauge", [((), value)])
+
+    def render(self):
+        return ("\n".join(self.lines) + "\n").encode("utf-8")
+
+
+def add_stats(metrics, cache):
+    """Translate cached /stats/* responses into metric families."""
+    summary = cache.get("summary") or {}
+    queries = summary.get("queries") or {}
+    metrics.add(
+        "pihole_queries",
+        "DNS queries in the last 24 hours by outcome.",
+        "gauge",
+        [
+            ((("outcome", key),), queries.get(key))
+            for key in ("total", "blocked", "forwarded", "cached")
+        ],
+    )
+    metrics.gauge(
+        "pihole_queries_blocked_ratio",
+        "Share of queries blocked in the last 24 hours (0-1).",
+        (
+            queries["percent_blocked"] / 100.0
+            if queries.get("percent_blocked") is not None
+            else None
+        ),
+    )
+    metrics.gauge(
+        "pihole_unique_domains",
+        "Unique domains queried in the last 24 hours.",
+        queries.get("unique_domains"),
+    )
+    metrics.gauge(
+        "pihole_query_frequency",
+        "Queries per second over the last minutes.",
+        queries.get("frequency"),
+    )
+    for key, name, label in (
+        ("types", "pihole_query_types", "type"),
+        ("status", "pihole_query_status", "status"),
+        ("replies", "pihole_query_replies", "reply"),
+    ):
+        values = queries.get(key) or {}
+        metrics.add(
+            name,
+            "Queries in the last 24 hours by %s." % label,
+            "gauge",
+            [(((label, k),), values[k]) for k in sorted(values)],
+        )
+
+    clients = summary.get("clients") or {}
+    metrics.add(
+        "pihole_clients",
+        "Clients seen in the last 24 hours.",
+        "gauge",
+        [((("state", k),), clients.get(k)) for k in ("active", "total")],
+    )
+    gravity = summary.get("gravity") or {}
+    metrics.gauge(
+        "pihole_gravity_domains",
+        "Domains on the gravity blocklist.",
+        gravity.get("domains_being_blocked"),
+    )
+    metrics.gauge(
+        "pihole_gravity_last_update_timestamp_seconds",
+        "Unix time of the last gravity update.",
+        gravity.get("last_update"),
+    )
+
+    upstreams = (cache.get("upstreams") or {}).get("upstreams") or []
+    labelled = []
+    for item in upstreams:
+        labels = (
+            ("upstream", "%s#%s" % (item.get("ip"), item.get("port"))),
+            ("name", item.get("name") or ""),
+        )
+        labelled.append((labels, item))
+    metrics.add(
+        "pihole_upstream_queries",
+        "Queries sent to each upstream in the last 24 hours.",
+        "gauge",
+        [(labels, item.get("count")) for labels, item in labelled],
+    )
+    metrics.add(
+        "pihole_upstream_response_seconds",
+        "Average upstream response time.",
+        "gauge",
+        [
+            (labels, (item.get("statistics") or {}).get("response"))
+            for labels, item in labelled
+        ],
+    )
+
+    clients = (cache.get("top_clients") or {}).get("clients") or []
+    metrics.add(
+        "pihole_top_client_queries",
+        "Queries by the most active clients.",
+        "gauge",
+        [
+            (
+                (("client", c.get("ip")), ("name", c.get("name") or "")),
+                c.get("count"),
+            )
+            for c in clients
+        ],
+    )
+    for key, name, what in (
+        ("top_domains", "pihole_top_domain_queries", "permitted"),
+        ("top_blocked", "pihole_top_blocked_domain_queries", "blocked"),
+    ):
+        domains = (cache.get(key) or {}).get("domains") or []
+        metrics.add(
+            name,
+            "Queries for the most frequently %s domains." % what,
+            "gauge",
+            [
+                ((("domain", d.get("domain")),), d.get("count"))
+                for d in domains
+            ],
+        )
+
+
+class Collector:
+    """Polls Pi-hole with one client and keeps the rendered metrics."""
+
+    def __init__(self, client, top=10, slow_every=4):
+        self.client = client
+        # (cache key, path, params, refresh every N polls)
+        self.endpoints = (
+            ("summary", "/stats/summary", None, 1),
+            ("upstreams", "/stats/upstreams", None, 1),
+            ("top_clients", "/stats/top_clients", {"count": top}, slow_every),
+            ("top_domains", "/stats/top_domains", {"count": top}, slow_every),
+            (
+                "top_blocked",
+                "/stats/top_domains",
+                {"count": top, "blocked": True},
+                slow_every,
+            ),
+        )
+        self.cache = {}
+        self.polls = 0
+        self.errors = 0
+        self.logins = 0
+        self.up = False
+        self.last_success = None
+        self.last_duration = None
+        self.body = b""
+        self.body_gzip = b""
+
+    def poll(self):
+        """Refresh due endpoints and re-render; returns True on success.
+
+        On failure the previous responses stay cached and are still
+        served, with ``pihole_up`` set to 0.
+        """
+        started = time.monotonic()
+        session = self.client.session_id
+        self.up = True
+        for key, path, params, every in self.endpoints:
+            if key in self.cache and self.polls % every:
+                continue
+            try:
+                self.cache[key] = self.client.get(path, params)
+            except PiHoleError as e:
+                log.warning("poll failed: %s", e)
+                self.errors += 1
+                self.up = False
+                break
+        if self.client.session_id and self.client.session_id != session:
+            self.logins += 1
+        self.polls += 1
+        self.last_duration = time.monotonic() - started
+        if self.up:
+            self.last_success = time.time()
+        self.render()
+        return self.up
+
+    def render(self):
+        metrics = Metrics()
+        metrics.gauge(
+            "pihole_up", "Whether the last poll of Pi-hole succeeded.", self.up
+        )
+        add_stats(metrics, self.cache)
+        for name, help_text, value in (
+            ("polls", "Polls of the Pi-hole API.", self.polls),
+            ("poll_errors", "Polls that failed.", self.errors),
+            ("logins", "API sessions created.", self.logins),
+            (
+                "api_requests",
+                "HTTP requests sent to Pi-hole.",
+                self.client.requests,
+            ),
+        ):
+            metrics.add(
+                "pihole_exporter_%s_total" % name,
+                help_text,
+                "counter",
+                [((), value)],
+            )
+        metrics.gauge(
+            "pihole_exporter_poll_duration_seconds",
+            "Duration of the last poll.",
+            self.last_duration,
+        )
+        metrics.gauge(
+            "pihole_exporter_last_success_timestamp_seconds",
+            "Unix time of the last successful poll.",
+            self.last_success,
+        )
+        body = metrics.render()
+        body_gzip = gzip.compress(body, compresslevel=5)
+        # Handlers read both attributes without a lock; publish the pair
+        # at once so a scrape never mixes two polls.
+        self.body, self.body_gzip = body, body_gzip
+
+
+def make_handler(collector):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                body, body_gzip = collector.body, collector.body_gzip
+                headers = {"Content-Type": CONTENT_TYPE}
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = body_gzip
+                    headers["Content-Encoding"] = "gzip"
+                self._reply(200, body, headers)
+            elif path == "/healthz":
+                if collector.up:
+                    self._reply(200, b"ok\n")
+                else:
+                    self._reply(503, b"pihole unreachable\n")
+            else:
+                self._reply(404, b"see /metrics\n")
+
+        def _reply(self, status, body, headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if not headers:
+                self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            log.debug(format, *args)
+
+    return Handler
+
+
+def env(name, default=None):
+    return os.environ.get(name, default)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--url",
+        default=env("PIHOLE_API_URL", "http://pihole/api"),
+        help="Pi-hole API base URL incl. /api (PIHOLE_API_URL)",
+    )
+    parser.add_argument(
+        "--password-file",
+        default=env("PIHOLE_PASSWORD_FILE"),
+        help="File holding the web password (PIHOLE_PASSWORD_FILE); "
+        "otherwise PIHOLE_PASSWORD is used",
+    )
+    parser.add_argument(
+        "--listen",
+        default=env("EXPORTER_LISTEN", "0.0.0.0"),
+        help="Address to serve /metrics on (EXPORTER_LISTEN)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(env("EXPORTER_PORT", 9617)),
+        help="Port to serve /metrics on (EXPORTER_PORT)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(env("EXPORTER_INTERVAL", 15)),
+        help="Seconds between polls (EXPORTER_INTERVAL)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=int(env("EXPORTER_TOP", 10)),
+        help="Entries in the top client/domain lists (EXPORTER_TOP)",
+    )
+    parser.add_argument(
+        "--slow-every",
+        type=int,
+        default=int(env("EXPORTER_SLOW_EVERY", 4)),
+        help="Refresh the top lists every N polls (EXPORTER_SLOW_EVERY)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=float(env("EXPORTER_TIMEOUT", 10)),
+        help="HTTP timeout towards Pi-hole (EXPORTER_TIMEOUT)",
+    )
+    parser.add_argument(
+        "--validate-certs",
+        action="store_true",
+        default=env("EXPORTER_VALIDATE_CERTS", "") in ("1", "true", "yes"),
+        help="Verify TLS certificates (EXPORTER_VALIDATE_CERTS)",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Poll once, print the metrics and exit",
+    )
+    parser.add_argument("--verbose", "-v", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    password = env("PIHOLE_PASSWORD")
+    if args.password_file:
+        with open(args.password_file) as handle:
+            password = handle.read().strip()
+    if not password:
+        print(
+            "PIHOLE_PASSWORD or --password-file is required", file=sys.stderr
+        )
+        return 2
+
+    client = PiHoleClient(
+        args.url,
+        password=password,
+        timeout=args.timeout,
+        validate_certs=args.validate_certs,
+    )
+    collector = Collector(client, args.top, max(1, args.slow_every))
+
+    if args.once:
+        ok = collector.poll()
+        client.close()
+        sys.stdout.write(collector.body.decode("utf-8"))
+        return 0 if ok else 1
+
+    server = ThreadingHTTPServer(
+        (args.listen, args.port), make_handler(collector)
+    )
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info(
+        "serving http://%s:%d/metrics, polling %s every %ss",
+        args.listen,
+        server.server_address[1],
+        args.url,
+        args.interval,
+    )
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    try:
+        while not stop.is_set():
+            started = time.monotonic()
+            collector.poll()
+            stop.wait(max(0.0, args.interval - (time.monotonic() - started)))
+    finally:
+        server.shutdown()
+        # Log out so the session does not hold one of FTL's slots.
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
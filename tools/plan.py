@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Print one consolidated plan of what a deploy would change.
+
+Usage (from the repository root):
+    python3 tools/plan.py --ask-vault-pass        # all areas
+    python3 tools/plan.py pihole npm --diff       # some areas, with diffs
+    python3 tools/plan.py -- -e refresh_facts=true
+
+Runs plan.yml (--check --diff) once per area, all areas at the same
+time, with the homelab_plan callback writing each run's changes to
+.cache/plan/<area>.json; the output of every run is kept next to it in
+<area>.log. Remaining arguments (after --) go to every ansible-playbook.
+With --ask-vault-pass the password is asked once and handed to the runs
+in a private temporary file.
+
+Exits 0 when nothing would change, 2 when something would (or might:
+tasks that cannot run in check mode) change and 1 when an area failed.
+"""
+
+import argparse
+import getpass
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AREAS = ("pihole", "jellyfin", "npm", "stacks")
+
+MARKS = {"change": "~", "unknown": "?", "failed": "!"}
+
+
+def ansible_playbook():
+    """ansible-playbook from this interpreter's environment, else PATH."""
+    local = os.path.join(os.path.dirname(sys.executable), "ansible-playbook")
+    return local if os.path.exists(local) else "ansible-playbook"
+
+
+def start(area, out_dir, extra):
+    output = os.path.join(out_dir, area + ".json")
+    if os.path.exists(output):
+        os.unlink(output)
+    env = dict(os.environ)
+    env["ANSIBLE_CALLBACKS_ENABLED"] = "homelab_plan"
+    env["HOMELAB_PLAN_OUTPUT"] = output
+    command = [
+        ansible_playbook(),
+        "plan.yml",
+        "--check",
+        "--diff",
+        "-e",
+        json.dumps({"plan_areas": [area]}),
+    ] + extra
+    log = open(os.path.join(out_dir, area + ".log"), "w")
+    proc = subprocess.Popen(
+        command,
+        cwd=REPO_ROOT,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    log.close()
+    return proc, output
+
+
+def tail(path, lines=5):
+    try:
+        with open(path) as handle:
+            return handle.read().splitlines()[-lines:]
+    except OSError:
+        return []
+
+
+def run(areas, out_dir, extra):
+    """Run all areas concurrently; return {area: (rc, seconds, plan)}."""
+    started = time.monotonic()
+    running = dict((area, start(area, out_dir, extra)) for area in areas)
+    results = {}
+    for area, (proc, output) in running.items():
+        rc = proc.wait()
+        plan = None
+        try:
+            with open(output) as handle:
+                plan = json.load(handle)
+        except (OSError, ValueError):
+            pass
+        results[area] = (rc, time.monotonic() - started, plan)
+    return results
+
+
+def report(area, rc, seconds, plan, out_dir, show_diff):
+    """Print one area; return its entries' statuses."""
+    entries = plan["entries"] if plan else []
+    statuses = [entry["status"] for entry in entries]
+    if plan is None:
+        summary = "did not finish (exit %d)" % rc
+        statuses.append("failed")
+    elif not plan.get("check_mode"):
+        summary = "not run in check mode"
+        statuses.append("failed")
+    elif not entries:
+        summary = "no changes"
+    else:
+        summary = ", ".join(
+            "%d %s" % (statuses.count(kind), label)
+            for kind, label in (
+                ("change", "to change"),
+                ("unknown", "unpredictable"),
+                ("failed", "failed"),
+            )
+            if kind in statuses
+        )
+    if plan is not None:
+        seconds = plan.get("duration", seconds)
+    print("%-9s %6.1fs  %s" % (area, seconds, summary))
+
+    for entry in entries:
+        item = " [%s]" % entry["item"] if entry["item"] else ""
+        print(
+            "  %s %s: %s%s"
+            % (MARKS[entry["status"]], entry["host"], entry["task"], item)
+        )
+        detail = entry["msg"]
+        if entry["status"] == "unknown":
+            detail = "%s cannot run in check mode; would run" % (
+                entry["action"]
+            )
+        elif entry["changed_keys"]:
+            detail = ", ".join(entry["changed_keys"])
+        if detail:
+            print("      %s" % detail.splitlines()[0])
+        if show_diff and entry["diff"]:
+            for line in entry["diff"].rstrip("\n").splitlines():
+                print("      %s" % line)
+    if plan is None or "failed" in statuses:
+        log = os.path.join(out_dir, area + ".log")
+        print("      see %s" % os.path.relpath(log, REPO_ROOT))
+        if plan is None:
+            for line in tail(log):
+                print("      | %s" % line)
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "areas",
+        nargs="*",
+        metavar="area",
+        help="Areas to plan (%s; default: all)" % ", ".join(AREAS),
+    )
+    parser.add_argument(
+        "--diff", action="store_true", help="Show the diff of each change"
+    )
+    parser.add_argument("--ask-vault-pass", action="store_true")
+    parser.add_argument(
+        "--out-dir",
+        default=os.path.join(REPO_ROOT, ".cache", "plan"),
+        help="Directory for the per-area JSON plans and logs",
+    )
+    argv = sys.argv[1:]
+    extra = []
+    if "--" in argv:
+        extra = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+    args = parser.parse_args(argv)
+    unknown = [area for area in args.areas if area not in AREAS]
+    if unknown:
+        parser.error("unknown area(s): %s" % ", ".join(unknown))
+    areas = [area for area in AREAS if area in args.areas] or list(AREAS)
+    if not os.path.isdir(args.out_dir):
+        os.makedirs(args.out_dir)
+
+    password_file = None
+    if args.ask_vault_pass:
+        password = getpass.getpass("Vault password: ")
+        fd, password_file = tempfile.mkstemp(prefix="plan-vault-")
+        with os.fdopen(fd, "w") as handle:
+            handle.write(password + "\n")
+        extra += ["--vault-password-file", password_file]
+    try:
+        started = time.monotonic()
+        results = run(areas, args.out_dir, extra)
+        elapsed = time.monotonic() - started
+    finally:
+        if password_file:
+            os.unlink(password_file)
+
+    print("Plan for %s (%.1fs)" % (", ".join(areas), elapsed))
+    print()
+    statuses = []
+    for area in areas:
+        rc, seconds, plan = results[area]
+        statuses += report(area, rc, seconds, plan, args.out_dir, args.diff)
+    print()
+    print(
+        "%d to change, %d unpredictable, %d failed"
+        % (
+            statuses.count("change"),
+            statuses.count("unknown"),
+            statuses.count("failed"),
+        )
+    )
+    if "failed" in statuses:
+        return 1
+    if statuses:
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
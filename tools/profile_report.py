@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2026, Homelab Ansible
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Report slow tasks and regressions from the homelab_profile database.
+
+Usage:
+    python3 tools/profile_report.py [--db .cache/profile.sqlite] [--top 15]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+
+
+def latest_run(conn, playbook=None):
+    query = "SELECT id, playbook, started, duration, failed FROM runs"
+    params = ()
+    if playbook:
+        query += " WHERE playbook = ?"
+        params = (playbook,)
+    return conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+
+
+def baseline_runs(conn, run_id, playbook, count):
+    rows = conn.execute(
+        "SELECT id FROM runs WHERE playbook = ? AND id < ? AND failed = 0 "
+        "ORDER BY id DESC LIMIT ?",
+        (playbook, run_id, count),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def task_durations(conn, run_ids):
+    """Return {(role, task): [max duration across hosts per run]}."""
+    if not run_ids:
+        return {}
+    marks = ",".join("?" * len(run_ids))
+    rows = conn.execute(
+        "SELECT run_id, role, task, MAX(duration) FROM task_timings "
+        "WHERE run_id IN (%s) AND status != 'skipped' "
+        "GROUP BY run_id, role, task" % marks,
+        run_ids,
+    ).fetchall()
+    result = {}
+    for _, role, task, duration in rows:
+        result.setdefault((role, task), []).append(duration)
+    return result
+
+
+def module_latency(conn, run_ids):
+    """Return {(action, metric): average ms per call} across run_ids."""
+    if not run_ids:
+        return {}
+    marks = ",".join("?" * len(run_ids))
+    rows = conn.execute(
+        "SELECT action, metric, SUM(total_ms), SUM(calls) FROM module_timings "
+        "WHERE run_id IN (%s) GROUP BY action, metric" % marks,
+        run_ids,
+    ).fetchall()
+    return {
+        (action, metric): total / calls
+        for action, metric, total, calls in rows
+        if calls
+    }
+
+
+def label(role, task):
+    return "%s : %s" % (role, task) if role else task
+
+
+def print_table(title, header, rows):
+    print()
+    print(title)
+    print("=" * len(title))
+    if not rows:
+        print("  (none)")
+        return
+    widths = [
+        max(len(str(col)) for col in column) for column in zip(header, *rows)
+    ]
+    fmt = "  " + "  ".join("{:<%d}" % w for w in widths)
+    print(fmt.format(*header))
+    for row in rows:
+        print(fmt.format(*[str(col) for col in row]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=".cache/profile.sqlite")
+    parser.add_argument("--playbook", help="Limit report to one playbook")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--baseline-runs",
+        type=int,
+        default=5,
+        help="Number of earlier successful runs to compare against",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Relative slowdown that counts as a regression",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=1.0,
+        help="Ignore regressions smaller than this many seconds",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(
+            "No profile data at %s. Enable the homelab_profile callback "
+            "and run a playbook first." % args.db
+        )
+        return 1
+
+    conn = sqlite3.connect(args.db)
+    run = latest_run(conn, args.playbook)
+    if run is None:
+        print("No runs recorded in %s" % args.db)
+        return 1
+    run_id, playbook, _, duration, failed = run
+    baseline = baseline_runs(conn, run_id, playbook, args.baseline_runs)
+
+    print(
+        "Run %d of %s: %.1fs%s (baseline: %d earlier runs)"
+        % (
+            run_id,
+            playbook,
+            duration,
+            " [FAILED]" if failed else "",
+            len(baseline),
+        )
+    )
+
+    current = task_durations(conn, [run_id])
+    slowest = sorted(current.items(), key=lambda kv: kv[1][0], reverse=True)
+    print_table(
+        "Slowest tasks",
+        ("seconds", "task"),
+        [
+            ("%.2f" % durations[0], label(*key))
+            for key, durations in slowest[: args.top]
+        ],
+    )
+
+    roles = conn.execute(
+        "SELECT role, SUM(duration), COUNT(*) FROM task_timings "
+        "WHERE run_id = ? GROUP BY role ORDER BY SUM(duration) DESC",
+        (run_id,),
+    ).fetchall()
+    print_table(
+        "Time per role (summed across hosts)",
+        ("seconds", "tasks", "role"),
+        [
+            ("%.2f" % total, count, role or "(play)")
+            for role, total, count in roles
+        ],
+    )
+
+    history = task_durations(conn, baseline)
+    regressions = []
+    for key, durations in current.items():
+        previous = history.get(key)
+        if not previous:
+            continue
+        median = statistics.median(previous)
+        delta = durations[0] - median
+        if delta >= args.min_delta and durations[0] > median * (
+            1 + args.threshold
+        ):
+            regressions.append((delta, durations[0], median, key))
+    regressions.sort(reverse=True)
+    print_table(
+        "Regressions vs. median of baseline",
+        ("now", "before", "delta", "task"),
+        [
+            ("%.2f" % now, "%.2f" % before, "+%.2f" % delta, label(*key))
+            for delta, now, before, key in regressions[: args.top]
+        ],
+    )
+
+    latency_now = module_latency(conn, [run_id])
+    latency_before = module_latency(conn, baseline)
+    print_table(
+        "Module-internal timings (avg ms per call)",
+        ("now", "before", "metric", "module"),
+        [
+            (
+                "%.1f" % value,
+                "%.1f" % latency_before[key] if key in latency_before else "-",
+                key[1],
+                key[0],
+            )
+            for key, value in sorted(latency_now.items())
+        ],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())